@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -6,6 +7,76 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     DATABASE_URL: str
 
+    # Run a dummy input through every registry component at startup
+    MODEL_WARMUP: bool = True
+
+    # Video decoding limits for /api/video/translate
+    VIDEO_FRAME_STRIDE: int = 1
+    VIDEO_MAX_FRAMES: Optional[int] = None
+    VIDEO_MAX_SECONDS: Optional[float] = 30.0
+    VIDEO_MAX_SIDE: Optional[int] = 640
+    # "image" detects every frame from scratch, "video" tracks hands across frames
+    VIDEO_RUNNING_MODE: str = "image"
+
+    # Per-request upload budgets. Scratch files are only used when OpenCV
+    # can not decode from the upload buffer directly.
+    VIDEO_MAX_UPLOAD_BYTES: int = 100 * 1024 * 1024
+    VIDEO_MAX_SCRATCH_BYTES: int = 100 * 1024 * 1024
+    VIDEO_SCRATCH_DIR: Optional[str] = None
+
+    # Micro-batching of /process-image/ predictions
+    STATIC_BATCH_WINDOW_MS: float = 5.0
+    STATIC_BATCH_MAX_SIZE: int = 32
+    # Images per /process-images/ request
+    BATCH_MAX_IMAGES: int = 32
+
+    # HandLandmarker instances per shared detector, defaults to the number of cores
+    DETECTOR_POOL_SIZE: Optional[int] = None
+
+    # WebSocket live translation: frames kept per session, how often to
+    # predict, and when to evict idle sessions
+    LIVE_WINDOW_FRAMES: int = 90
+    LIVE_PREDICT_EVERY: int = 5
+    LIVE_IDLE_SECONDS: float = 30.0
+    LIVE_MAX_SESSIONS: int = 32
+    LIVE_MAX_FRAME_BYTES: int = 2 * 1024 * 1024
+
+    # Executors for blocking work. Requests beyond workers + queue get a 503.
+    # CPU_POOL_WORKERS defaults to the number of cores, PROCESS_POOL_WORKERS=0
+    # keeps video extraction on the thread pool.
+    CPU_POOL_WORKERS: Optional[int] = None
+    CPU_POOL_MAX_QUEUE: int = 32
+    PROCESS_POOL_WORKERS: int = 0
+    PROCESS_POOL_MAX_QUEUE: int = 8
+
+    # Runtime of the static and video classifiers: "keras", "tflite" or "onnx".
+    # tflite and onnx load the files written by tools/export_models.py next to the .keras models,
+    # their runtimes are listed in requirements-inference.txt.
+    INFERENCE_BACKEND: str = "keras"
+    INFERENCE_QUANTIZED: bool = False
+    INFERENCE_THREADS: Optional[int] = None
+    # Call Keras models through a compiled tf.function instead of model.predict
+    KERAS_DIRECT_CALL: bool = True
+
+    # Spoken labels. The sign vocabulary is persisted under AUDIO_CACHE_DIR,
+    # AUDIO_PRECOMPUTE synthesizes all of it at startup instead of on first use.
+    AUDIO_CACHE_DIR: Optional[str] = "audio_cache"
+    AUDIO_PRECOMPUTE: bool = False
+    AUDIO_FREE_TEXT_CACHE_SIZE: int = 256
+    # TTS runs in a separate process, see app/services/tts_worker.py. In production
+    # run one shared worker (python -m app.services.tts_worker) and set its address,
+    # "host:port" or a socket path, and a TTS_WORKER_AUTHKEY shared with it. Without
+    # an address every API worker starts its own on first use, for development only.
+    TTS_WORKER_ADDRESS: Optional[str] = None
+    TTS_WORKER_AUTHKEY: Optional[str] = None
+    TTS_BATCH_MAX_SIZE: int = 8
+    TTS_BATCH_WINDOW_MS: float = 10.0
+    TTS_TIMEOUT_SECONDS: float = 120.0
+
+    # Limits of the landmark-only endpoints (/process-landmarks/, /api/video/translate-landmarks)
+    LANDMARK_MAX_HANDS: int = 64
+    LANDMARK_MAX_FRAMES: int = 900
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,178 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Tuple
+
+import mediapipe as mp
+import numpy as np
+from mediapipe.tasks.python import vision
+
+
+class DetectorPool:
+    """
+    Fixed-size pool of HandLandmarker instances with checkout/return semantics.
+
+    A HandLandmarker must not run concurrent detect calls, so every caller
+    checks one out for the duration of a call and returns it afterwards.
+    Time spent waiting for a free detector is recorded to help size the pool.
+    """
+
+    def __init__(self, options: vision.HandLandmarkerOptions, size: int = None, wait_window: int = 1000):
+        """
+        Args:
+            options: HandLandmarkerOptions used for every detector.
+            size: number of detectors, defaults to the number of cores.
+            wait_window: how many recent wait times to keep for percentiles.
+        """
+        self.size = max(1, size or os.cpu_count() or 1)
+        self._idle = queue.LifoQueue()
+        self._detectors = []
+        for _ in range(self.size):
+            detector = vision.HandLandmarker.create_from_options(options)
+            self._detectors.append(detector)
+            self._idle.put(detector)
+
+        self._stats_lock = threading.Lock()
+        self._recent_waits = deque(maxlen=wait_window)
+        self.checkouts = 0
+        self.contended = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    @contextmanager
+    def checkout(self):
+        """
+        Borrows a detector, blocking until one is free, and returns it on exit.
+        """
+        start = time.perf_counter()
+        detector = self._idle.get()
+        wait = time.perf_counter() - start
+
+        with self._stats_lock:
+            self.checkouts += 1
+            self.contended += wait > 1e-4
+            self.total_wait_seconds += wait
+            self.max_wait_seconds = max(self.max_wait_seconds, wait)
+            self._recent_waits.append(wait)
+
+        try:
+            yield detector
+        finally:
+            self._idle.put(detector)
+
+    def detect(self, mp_image):
+        with self.checkout() as detector:
+            return detector.detect(mp_image)
+
+    def close(self):
+        for detector in self._detectors:
+            detector.close()
+
+    def describe(self) -> dict:
+        with self._stats_lock:
+            recent_ms = np.array(self._recent_waits) * 1000
+            checkouts = self.checkouts
+            return {
+                "size": self.size,
+                "idle": self._idle.qsize(),
+                "checkouts": checkouts,
+                "contended": self.contended,
+                "mean_wait_ms": round(self.total_wait_seconds * 1000 / checkouts, 3) if checkouts else 0.0,
+                "p95_wait_ms": round(float(np.percentile(recent_ms, 95)), 3) if len(recent_ms) else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class VideoLandmarkerPool:
+    """
+    Reusable VIDEO mode HandLandmarkers, so a clip does not pay for a model load.
+
+    Unlike DetectorPool it never blocks: acquire() creates a landmarker when
+    none is idle, e.g. while live sessions hold them all, and release() keeps
+    at most max_idle. A VIDEO landmarker remembers the hands it tracked and
+    the last timestamp it saw, so release() feeds it blank frames until it
+    tracks nothing, and the next clip continues after its last timestamp.
+    """
+
+    # Frames of a released landmarker skip ahead by this much, a new clip is not a continuation
+    CLIP_GAP_MS = 1000
+    RESET_FRAMES = 3
+
+    def __init__(self, options: vision.HandLandmarkerOptions, max_idle: int = None):
+        """
+        Args:
+            options: HandLandmarkerOptions in VIDEO running mode.
+            max_idle: landmarkers kept for reuse, defaults to the number of cores.
+        """
+        self.options = options
+        self.max_idle = max(1, max_idle or os.cpu_count() or 1)
+        self._idle = []
+        self._lock = threading.Lock()
+        self._blank = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.zeros((64, 64, 3), dtype=np.uint8))
+
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.create_seconds = 0.0
+
+    def acquire(self) -> Tuple[vision.HandLandmarker, int]:
+        """
+        Returns an idle or new landmarker and the first timestamp it accepts.
+        """
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                return self._idle.pop()
+
+        start = time.perf_counter()
+        landmarker = vision.HandLandmarker.create_from_options(self.options)
+        with self._lock:
+            self.created += 1
+            self.create_seconds += time.perf_counter() - start
+        return landmarker, 0
+
+    def release(self, landmarker: vision.HandLandmarker, last_timestamp_ms: int):
+        """
+        Takes a landmarker back once its clip ended, clearing its tracking state.
+        """
+        with self._lock:
+            keep = len(self._idle) < self.max_idle
+        timestamp_ms = max(0, last_timestamp_ms) + self.CLIP_GAP_MS
+        if keep:
+            keep = False
+            try:
+                for _ in range(self.RESET_FRAMES):
+                    cleared = not landmarker.detect_for_video(self._blank, timestamp_ms).hand_landmarks
+                    timestamp_ms += 1
+                    if cleared:
+                        keep = True
+                        break
+            except Exception:
+                keep = False
+
+        with self._lock:
+            if keep and len(self._idle) < self.max_idle:
+                self._idle.append((landmarker, timestamp_ms + self.CLIP_GAP_MS))
+                return
+            self.discarded += 1
+        landmarker.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for landmarker, _ in idle:
+            landmarker.close()
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "max_idle": self.max_idle,
+                "idle": len(self._idle),
+                "created": self.created,
+                "reused": self.reused,
+                "discarded": self.discarded,
+                "mean_create_ms": round(self.create_seconds * 1000 / self.created, 3) if self.created else 0.0,
+            }
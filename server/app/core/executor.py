@@ -0,0 +1,150 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+
+
+class ExecutorSaturated(Exception):
+    """
+    Raised when an executor already holds as much work as it is allowed to queue.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"The {name} executor is saturated")
+        self.name = name
+
+
+class BoundedExecutor:
+    """
+    Runs blocking work off the asyncio event loop with a cap on queued jobs.
+
+    Work beyond max_workers + max_queue is rejected immediately with
+    ExecutorSaturated instead of waiting, so an overloaded worker answers
+    quickly rather than letting latency grow without bound.
+    """
+
+    def __init__(self, name: str, pool: Executor, max_workers: int, max_queue: int):
+        """
+        Args:
+            name: used in errors and metrics.
+            pool: the underlying thread or process pool.
+            max_workers: number of workers of the pool.
+            max_queue: how many jobs may wait for a free worker.
+        """
+        self.name = name
+        self.pool = pool
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        # Only touched from the event loop thread, no lock needed
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    @classmethod
+    def threads(cls, name: str, max_workers: int = None, max_queue: int = 32) -> "BoundedExecutor":
+        max_workers = max_workers or os.cpu_count() or 1
+        pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        return cls(name, pool, max_workers, max_queue)
+
+    @classmethod
+    def processes(cls, name: str, max_workers: int, max_queue: int = 8, initializer=None) -> "BoundedExecutor":
+        # Forking a process that already loaded TensorFlow is unsafe, always spawn
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=initializer,
+        )
+        return cls(name, pool, max_workers, max_queue)
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Runs fn(*args, **kwargs) on the pool and waits for its result.
+
+        Raises:
+            ExecutorSaturated: if the queue is full.
+        """
+        if self.in_flight >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturated(self.name)
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.pool, partial(fn, *args, **kwargs))
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        return result
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def describe(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queued": max(0, self.in_flight - self.max_workers),
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
+
+class Executors:
+    """
+    The executors of one API worker: a thread pool for GIL-releasing work
+    (OpenCV decode, MediaPipe detection, Keras inference) and an optional
+    process pool for the Python-heavy video landmark extraction.
+    """
+
+    def __init__(
+        self,
+        cpu_workers: int = None,
+        cpu_max_queue: int = 32,
+        process_workers: int = 0,
+        process_max_queue: int = 8,
+        process_initializer=None,
+    ):
+        self.cpu = BoundedExecutor.threads("cpu", cpu_workers, cpu_max_queue)
+        self.process = None
+        if process_workers > 0:
+            self.process = BoundedExecutor.processes(
+                "process", process_workers, process_max_queue, process_initializer
+            )
+
+    def shutdown(self):
+        self.cpu.shutdown()
+        if self.process is not None:
+            self.process.shutdown()
+
+    def describe(self) -> dict:
+        return {
+            "cpu": self.cpu.describe(),
+            "process": self.process.describe() if self.process is not None else None,
+        }
+
+
+def get_executors(connection: HTTPConnection) -> Executors:
+    return connection.app.state.executors
+
+
+def get_cpu_executor(executors: Executors = Depends(get_executors)) -> BoundedExecutor:
+    return executors.cpu
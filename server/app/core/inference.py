@@ -0,0 +1,208 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Optional
+
+import numpy as np
+
+BACKENDS = ("keras", "tflite", "onnx")
+# Optional runtimes are listed in requirements-inference.txt
+OPTIONAL_REQUIREMENTS = "requirements-inference.txt"
+
+
+class InferenceBackend(ABC):
+    """
+    A loaded classifier that maps a float32 input batch to class probabilities.
+
+    The runtime of every backend is imported when the backend is created, so
+    a worker serving TFLite or ONNX models never imports full TensorFlow.
+    """
+
+    name = None
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @abstractmethod
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Returns the (N, num_classes) probabilities of a float32 (N, ...) batch.
+        """
+
+    def warmup(self):
+        """
+        Runs one dummy call, so the first request does not pay for lazy initialization.
+        """
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "path": os.path.basename(self.path)}
+
+
+class KerasBackend(InferenceBackend):
+    """
+    Runs a .keras model. With direct_call the model is called through a
+    tf.function traced once for its input shape with a variable batch size,
+    e.g. (None, 21, 2) or (None, 6, 132). This skips the data adapter and
+    callback loop model.predict sets up on every call, which dominate the
+    latency of single samples on these small models.
+    """
+
+    name = "keras"
+
+    def __init__(self, path: str, num_threads: Optional[int] = None, direct_call: bool = True):
+        super().__init__(path)
+        import tensorflow as tf
+        if num_threads:
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+            except RuntimeError:
+                # Only possible before TensorFlow runs its first op
+                pass
+        self.model = tf.keras.models.load_model(path)
+        self.direct_call = direct_call
+
+        input_shape = (None, *self.model.inputs[0].shape[1:])
+        self.input_signature = tf.TensorSpec(input_shape, tf.float32)
+        self._call = tf.function(
+            lambda batch: self.model(batch, training=False),
+            input_signature=[self.input_signature],
+        )
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        if self.direct_call:
+            return self._call(np.asarray(batch, dtype=np.float32)).numpy()
+        return self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+    def warmup(self):
+        # Traces the tf.function, later calls of any batch size reuse the graph
+        self.predict(np.zeros((1, *self.input_signature.shape[1:]), dtype=np.float32))
+
+    def describe(self) -> dict:
+        return {**super().describe(), "direct_call": self.direct_call, "input_shape": str(self.input_signature.shape)}
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Runs a .tflite model with the standalone tflite_runtime interpreter when it
+    is installed, falling back to the one bundled with TensorFlow.
+    Quantized int8 inputs and outputs are converted with their scale and zero point.
+    """
+
+    name = "tflite"
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        super().__init__(path)
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            try:
+                import tensorflow as tf
+            except ImportError as exc:
+                raise ImportError(
+                    f"The tflite backend needs tflite-runtime or tensorflow, install {OPTIONAL_REQUIREMENTS}"
+                ) from exc
+            Interpreter = tf.lite.Interpreter
+        self.interpreter = Interpreter(model_path=path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self.input["shape"][0])
+        self._sample_shape = tuple(self.input["shape"][1:])
+        # An interpreter holds its tensors, it can only run one call at a time
+        self._lock = threading.Lock()
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if len(batch) != self._batch_size:
+                self.interpreter.resize_tensor_input(self.input["index"], batch.shape)
+                self.interpreter.allocate_tensors()
+                self.input = self.interpreter.get_input_details()[0]
+                self.output = self.interpreter.get_output_details()[0]
+                self._batch_size = len(batch)
+
+            self.interpreter.set_tensor(self.input["index"], self._quantize(batch, self.input))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self.output["index"]), self.output)
+
+    def warmup(self):
+        self.predict(np.zeros((1, *self._sample_shape), dtype=np.float32))
+
+    @staticmethod
+    def _quantize(batch: np.ndarray, details: dict) -> np.ndarray:
+        dtype = details["dtype"]
+        if np.issubdtype(dtype, np.floating):
+            return batch.astype(dtype, copy=False)
+        scale, zero_point = details["quantization"]
+        info = np.iinfo(dtype)
+        return np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+
+    @staticmethod
+    def _dequantize(values: np.ndarray, details: dict) -> np.ndarray:
+        if np.issubdtype(values.dtype, np.floating):
+            return values
+        scale, zero_point = details["quantization"]
+        return (values.astype(np.float32) - zero_point) * scale
+
+
+class OnnxBackend(InferenceBackend):
+    name = "onnx"
+
+    def __init__(self, path: str, num_threads: Optional[int] = None):
+        super().__init__(path)
+        try:
+            import onnxruntime as ort
+        except ImportError as exc:
+            raise ImportError(f"The onnx backend needs onnxruntime, install {OPTIONAL_REQUIREMENTS}") from exc
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        # InferenceSession.run is thread-safe, no lock needed
+        self.session = ort.InferenceSession(path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self._sample_shape = tuple(self.session.get_inputs()[0].shape[1:])
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch.astype(np.float32, copy=False)})[0]
+
+    def warmup(self):
+        self.predict(np.zeros((1, *self._sample_shape), dtype=np.float32))
+
+
+def backend_model_path(keras_path: str, backend: str, quantized: bool = False) -> str:
+    """
+    Path of the exported model next to a .keras file, as written by tools/export_models.py:
+    model.keras -> model.tflite, model.int8.tflite or model.onnx.
+    """
+    base, _ = os.path.splitext(keras_path)
+    if backend == "keras":
+        return keras_path
+    if backend == "tflite":
+        return base + (".int8.tflite" if quantized else ".tflite")
+    if backend == "onnx":
+        return base + ".onnx"
+    raise ValueError(f"Unknown inference backend {backend!r}, expected one of {BACKENDS}")
+
+
+def load_backend(
+    keras_path: str,
+    backend: str = "keras",
+    quantized: bool = False,
+    num_threads: Optional[int] = None,
+    direct_call: bool = True,
+) -> InferenceBackend:
+    """
+    Loads the model exported from keras_path for the given backend.
+
+    :param keras_path: path of the reference .keras model
+    :param backend: "keras", "tflite" or "onnx"
+    :param quantized: use the int8 TFLite export
+    :param num_threads: intra-op threads of the runtime, None for its default
+    :param direct_call: call Keras models through a compiled tf.function instead of model.predict
+    """
+    path = backend_model_path(keras_path, backend, quantized)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist, export it with tools/export_models.py")
+    if backend == "keras":
+        return KerasBackend(path, num_threads=num_threads, direct_call=direct_call)
+    backend_class = {"tflite": TFLiteBackend, "onnx": OnnxBackend}[backend]
+    return backend_class(path, num_threads=num_threads)
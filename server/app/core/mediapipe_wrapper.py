@@ -5,11 +5,75 @@ import cv2 as cv
 import numpy as np
 import time
 import os
+from app.core.detector_pool import DetectorPool, VideoLandmarkerPool
+
+class VideoHandTracker:
+    """
+    HandLandmarker in VIDEO running mode for a single clip.
+    The landmarks found in one frame seed the search in the next one, so palm
+    detection only reruns when tracking is lost.
+    Use one tracker per clip: timestamps must keep increasing and tracking
+    state must not leak from one clip into another. The landmarker itself is
+    borrowed from a VideoLandmarkerPool and given back, cleared, on close().
+    """
+
+    def __init__(self, detector, fps: float = 30.0, start_timestamp_ms: int = 0, on_close=None):
+        """
+        :param detector: HandLandmarker in VIDEO running mode
+        :param fps: frame rate used to derive timestamps when none are given
+        :param start_timestamp_ms: first timestamp the detector accepts, clip timestamps are offset by it
+        :param on_close: called with (detector, last timestamp) on close instead of closing the detector
+        """
+        self.detector = detector
+        self.frame_interval_ms = 1000.0 / fps if fps and fps > 0 else 1000.0 / 30
+        self.start_timestamp_ms = start_timestamp_ms
+        self.on_close = on_close
+        self._frame_idx = 0
+        self._last_timestamp_ms = start_timestamp_ms - 1
+        self._closed = False
+
+    def process(self, img: np.array, timestamp_ms: int = None):
+        """
+        Detects hands in the next frame of the clip.
+
+        :param img: BGR frame
+        :param timestamp_ms: frame timestamp, derived from the frame index and fps if omitted
+        :return: HandLandmarkerResult, same as MediaPipeWrapper.process_from_image
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(self._frame_idx * self.frame_interval_ms)
+        # MediaPipe rejects timestamps that do not strictly increase
+        timestamp_ms = max(self.start_timestamp_ms + int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        self._frame_idx += 1
+
+        rgb_frame = cv.cvtColor(img, cv.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        return self.detector.detect_for_video(mp_image, timestamp_ms)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        if self.on_close is not None:
+            self.on_close(self.detector, self._last_timestamp_ms)
+        else:
+            self.detector.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 class MediaPipeWrapper:
-    def __init__(self):
+    def __init__(self, pool_size: int = 1):
         """
         Initializes the MediaPipe wrapper for detecting up to two hands.
+
+        :param pool_size: number of HandLandmarker instances that can detect concurrently,
+            None sizes the pool to the number of cores
         """
         self.base_option = python.BaseOptions(model_asset_path='./hand_landmarker.task')
         self.option = vision.HandLandmarkerOptions(
@@ -17,18 +81,36 @@ class MediaPipeWrapper:
             num_hands=2,
             running_mode=vision.RunningMode.IMAGE
         )
-        self.detector = vision.HandLandmarker.create_from_options(self.option)
+        self.pool = DetectorPool(self.option, pool_size)
         self.num_hands = 2
+        # VIDEO mode landmarkers are created on the first clip and reused afterwards
+        self.video_option = vision.HandLandmarkerOptions(
+            base_options=self.base_option,
+            num_hands=self.num_hands,
+            running_mode=vision.RunningMode.VIDEO
+        )
+        self.video_pool = VideoLandmarkerPool(self.video_option, max_idle=self.pool.size)
 
     def process_from_image(self, img: np.array):
         # Convert the BGR image to RGB before processing.
         rgb_frame = cv.cvtColor(img, cv.COLOR_BGR2RGB)
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
 
-        results = self.detector.detect(mp_image)
+        results = self.pool.detect(mp_image)
 
         return results
 
+    def video_tracker(self, fps: float = 30.0) -> VideoHandTracker:
+        """
+        Creates a VIDEO mode tracker for one clip with a landmarker of the video pool.
+
+        :param fps: frame rate of the frames that will be fed to the tracker
+        :return: VideoHandTracker, close it (or use it as a context manager) when the clip
+            ends, which returns its landmarker to the pool
+        """
+        detector, start_timestamp_ms = self.video_pool.acquire()
+        return VideoHandTracker(detector, fps, start_timestamp_ms, on_close=self.video_pool.release)
+
 
     def get_landmarks_from_hands(self, detected_hands) -> np.ndarray:
         """
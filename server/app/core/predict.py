@@ -1,6 +1,7 @@
 import os
 import numpy as np
-from tensorflow.keras.models import load_model
+from app.config import settings
+from app.core.inference import load_backend
 
 labels = ['ሀገር', 'ልጅ', 'መድሃኒት', 'ምክንያት', 'ምግብ',
           'ቀን', 'ባለቤት', 'ባክቴሪያ', 'ቤተሰብ', 'ትክክል',
@@ -13,10 +14,13 @@ MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../ml_models/video_mode
 
 class SignLanguageModel:
     def __init__(self):
-        self.model = load_model(MODEL_PATH)
+        self.model = load_backend(
+            MODEL_PATH, settings.INFERENCE_BACKEND, settings.INFERENCE_QUANTIZED, settings.INFERENCE_THREADS,
+            settings.KERAS_DIRECT_CALL
+        )
 
     def predict(self, data: np.ndarray) -> str:
-        prediction = self.model.predict(data.reshape(1, 6, 132))
+        prediction = self.model.predict(data.reshape(1, 6, 132).astype(np.float32))
         predicted_index = np.argmax(prediction)
         print("Predicted index:", predicted_index)
         return labels[predicted_index]
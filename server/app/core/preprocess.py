@@ -1,26 +1,78 @@
 import cv2
-from typing import List
+from typing import Iterator, List
 import numpy as np
 
-def load_frames_from_video(video_path: str, max_frames: int = None) -> List[np.ndarray]:
-    frames = []
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        print(f"Error opening video file: {video_path}")
-        return frames
+def iter_frames_from_capture(
+    cap: cv2.VideoCapture,
+    frame_stride: int = 1,
+    max_frames: int = None,
+    max_duration: float = None,
+    max_side: int = None,
+) -> Iterator[np.ndarray]:
+    """
+    Lazily decodes frames from an opened capture, one frame at a time.
+    Only the frame being yielded is kept in memory.
+
+    Args:
+        cap: opened cv2.VideoCapture. It is not released here.
+        frame_stride: keep every n-th decoded frame.
+        max_frames: stop after yielding this many frames.
+        max_duration: stop once this many seconds of video have been read.
+        max_side: downscale frames so the longer side is at most this many pixels.
+    Yields:
+        BGR frames (np.ndarray).
+    """
+    frame_stride = max(1, int(frame_stride))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0
+    max_source_frames = int(max_duration * fps) if max_duration and fps > 0 else None
 
     frame_idx = 0
+    yielded = 0
     while True:
+        if max_source_frames is not None and frame_idx >= max_source_frames:
+            break
+
+        # grab() skips the decode of frames dropped by the stride
+        if frame_idx % frame_stride != 0:
+            if not cap.grab():
+                break
+            frame_idx += 1
+            continue
+
         ret, frame = cap.read()
         if not ret:
             break
-
-        frames.append(frame)
         frame_idx += 1
 
-        if max_frames and frame_idx >= max_frames:
+        if max_side:
+            height, width = frame.shape[:2]
+            scale = max_side / max(height, width)
+            if scale < 1:
+                frame = cv2.resize(frame, (int(width * scale), int(height * scale)), interpolation=cv2.INTER_AREA)
+
+        yield frame
+        yielded += 1
+
+        if max_frames and yielded >= max_frames:
             break
 
-    cap.release()
-    print(f"Loaded {frame_idx} frames from video: {video_path}")
+
+def iter_frames_from_video(video_path: str, **decode_options) -> Iterator[np.ndarray]:
+    """
+    Lazily decodes frames from a video file. See iter_frames_from_capture for the options.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"Error opening video file: {video_path}")
+        return
+
+    try:
+        yield from iter_frames_from_capture(cap, **decode_options)
+    finally:
+        cap.release()
+
+
+def load_frames_from_video(video_path: str, max_frames: int = None) -> List[np.ndarray]:
+    frames = list(iter_frames_from_video(video_path, max_frames=max_frames))
+    print(f"Loaded {len(frames)} frames from video: {video_path}")
     return frames
@@ -0,0 +1,234 @@
+import os
+import resource
+import time
+from typing import Callable, Dict
+
+import numpy as np
+from fastapi import Depends
+from starlette.requests import HTTPConnection
+
+from app.core.executor import BoundedExecutor
+from app.core.mediapipe_wrapper import MediaPipeWrapper
+from app.core.predict import SignLanguageModel
+from app.core.trajectory import GeneralDirectionBuilder
+from app.services import mediapipe_service
+from app.services.audio_cache import AudioCache, sign_vocabulary
+from app.services.tts_worker import TTSClient
+from app.services.batching import MicroBatcher
+from app.services import model_service
+from app.services.model_service import predict_raw_hand_sign_batch
+from app.services.sequence_cleaner import SequenceCleaner
+
+
+def _current_rss_bytes() -> int:
+    """
+    Returns the resident set size of this process.
+    Falls back to the peak RSS where /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # ru_maxrss is in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class ModelRegistry:
+    """
+    Holds the detectors and models used by the prediction routes.
+    Everything is loaded once per worker at startup and shared by all requests.
+    """
+
+    def __init__(
+        self,
+        executor: BoundedExecutor,
+        warmup: bool = True,
+        batch_window_ms: float = 5.0,
+        max_batch_size: int = 32,
+        detector_pool_size: int = None,
+        video_tracking: bool = False,
+        audio_cache_dir: str = None,
+        audio_precompute: bool = False,
+        audio_free_text_cache_size: int = 256,
+        tts_worker_address: str = None,
+        tts_authkey: bytes = None,
+        tts_batch_max_size: int = 8,
+        tts_batch_window_ms: float = 10.0,
+        tts_timeout: float = 120.0,
+    ):
+        self.warmup = warmup
+        self.detector_pool_size = detector_pool_size
+        self.video_tracking = video_tracking
+        self.audio_cache_dir = audio_cache_dir
+        self.audio_precompute = audio_precompute
+        self.audio_free_text_cache_size = audio_free_text_cache_size
+        self.tts_worker_address = tts_worker_address
+        self.tts_authkey = tts_authkey
+        self.tts_batch_max_size = tts_batch_max_size
+        self.tts_batch_window_ms = tts_batch_window_ms
+        self.tts_timeout = tts_timeout
+        self.stats: Dict[str, dict] = {}
+        # Open /api/video/live WebSocket sessions, bounded by LIVE_MAX_SESSIONS
+        self.live_sessions = 0
+
+        self.image_detector = None
+        self.video_detector = None
+        self.sequence_cleaner = None
+        self.direction_builder = None
+        self.video_model = None
+        self.tts_client = None
+        self.audio_cache = None
+
+        # Normalization runs batched as well, the routes submit raw landmarks
+        self.static_batcher = MicroBatcher(
+            predict_raw_hand_sign_batch,
+            max_batch_size=max_batch_size,
+            window_ms=batch_window_ms,
+            executor=executor,
+        )
+
+    def load(self):
+        """
+        Loads and optionally warms every component, recording its cost.
+        """
+        blank_frame = np.zeros((256, 256, 3), dtype=np.uint8)
+        self.image_detector = self._load(
+            "image_detector",
+            lambda: mediapipe_service.MediaPipeWrapper(pool_size=self.detector_pool_size),
+            lambda wrapper: wrapper.detect_hands(blank_frame),
+        )
+        self.video_detector = self._load(
+            "video_detector",
+            lambda: MediaPipeWrapper(pool_size=self.detector_pool_size),
+            lambda wrapper: self._warm_video_detector(wrapper, blank_frame),
+        )
+        # The cleaner only needs the wrapper for its position helpers,
+        # so it shares the detector instead of creating its own.
+        self.sequence_cleaner = self._load(
+            "sequence_cleaner",
+            lambda: SequenceCleaner(mp=self.video_detector),
+        )
+        self.direction_builder = self._load("direction_builder", GeneralDirectionBuilder)
+        # The static model is loaded when model_service is imported, only its warmup is recorded here
+        self._load("static_model", lambda: model_service.model, lambda model: model.warmup())
+        self.video_model = self._load(
+            "video_model",
+            SignLanguageModel,
+            lambda model: model.model.warmup(),
+        )
+        # Only a client here, the worker is started or connected on the first synthesis
+        self.tts_client = self._load("tts_worker", self._create_tts_client)
+        self.audio_cache = self._load(
+            "audio_cache",
+            self._create_audio_cache,
+            lambda cache: cache.warm() if self.audio_precompute else None,
+        )
+        return self
+
+    def _warm_video_detector(self, wrapper: MediaPipeWrapper, frame: np.ndarray):
+        wrapper.process_from_image(frame)
+        if self.video_tracking:
+            # Loads the first VIDEO mode landmarker now instead of on the first clip
+            with wrapper.video_tracker() as tracker:
+                tracker.process(frame)
+
+    def _create_tts_client(self) -> TTSClient:
+        if self.tts_worker_address is None:
+            print("TTS_WORKER_ADDRESS is not set, this worker starts a private TTS process on first use")
+        return TTSClient(
+            self.tts_worker_address,
+            authkey=self.tts_authkey,
+            max_batch_size=self.tts_batch_max_size,
+            batch_window_ms=self.tts_batch_window_ms,
+            timeout=self.tts_timeout,
+        )
+
+    def _create_audio_cache(self) -> AudioCache:
+        return AudioCache(
+            self.tts_client.synthesize,
+            lambda: self.tts_client.revision,
+            sign_vocabulary(),
+            cache_dir=self.audio_cache_dir,
+            max_free_text=self.audio_free_text_cache_size,
+            synthesize_many=self.tts_client.synthesize_many,
+            submit=self.tts_client.submit,
+            timeout=self.tts_timeout,
+        )
+
+    def close(self):
+        if self.tts_client is not None:
+            self.tts_client.close()
+
+    def _load(self, name: str, factory: Callable, warmup: Callable = None):
+        rss_before = _current_rss_bytes()
+        start = time.perf_counter()
+        component = factory()
+        load_seconds = time.perf_counter() - start
+
+        warmup_seconds = 0.0
+        if self.warmup and warmup is not None:
+            start = time.perf_counter()
+            warmup(component)
+            warmup_seconds = time.perf_counter() - start
+
+        self.stats[name] = {
+            "load_seconds": round(load_seconds, 4),
+            "warmup_seconds": round(warmup_seconds, 4),
+            "rss_delta_bytes": _current_rss_bytes() - rss_before,
+        }
+        print(f"Loaded {name} in {load_seconds:.2f}s (warmup {warmup_seconds:.2f}s)")
+        return component
+
+    def describe(self) -> dict:
+        return {
+            "rss_bytes": _current_rss_bytes(),
+            "components": self.stats,
+            "static_batching": self.static_batcher.describe(),
+            "live_sessions": self.live_sessions,
+            "audio_cache": self.audio_cache.describe() if self.audio_cache else None,
+            "tts_worker": self.tts_client.describe() if self.tts_client else None,
+            "inference": {
+                "static_model": model_service.model.describe(),
+                "video_model": self.video_model.model.describe() if self.video_model else None,
+            },
+        }
+
+    def describe_detector_pools(self) -> dict:
+        return {
+            "image_detector": self.image_detector.pool.describe(),
+            "video_detector": self.video_detector.pool.describe(),
+            "video_trackers": self.video_detector.video_pool.describe(),
+        }
+
+
+def get_registry(connection: HTTPConnection) -> ModelRegistry:
+    # HTTPConnection so the dependencies also work for WebSocket routes
+    return connection.app.state.registry
+
+
+def get_image_detector(registry: ModelRegistry = Depends(get_registry)) -> mediapipe_service.MediaPipeWrapper:
+    return registry.image_detector
+
+
+def get_video_detector(registry: ModelRegistry = Depends(get_registry)) -> MediaPipeWrapper:
+    return registry.video_detector
+
+
+def get_sequence_cleaner(registry: ModelRegistry = Depends(get_registry)) -> SequenceCleaner:
+    return registry.sequence_cleaner
+
+
+def get_direction_builder(registry: ModelRegistry = Depends(get_registry)) -> GeneralDirectionBuilder:
+    return registry.direction_builder
+
+
+def get_video_model(registry: ModelRegistry = Depends(get_registry)) -> SignLanguageModel:
+    return registry.video_model
+
+
+def get_static_batcher(registry: ModelRegistry = Depends(get_registry)) -> MicroBatcher:
+    return registry.static_batcher
+
+
+def get_audio_cache(registry: ModelRegistry = Depends(get_registry)) -> AudioCache:
+    return registry.audio_cache
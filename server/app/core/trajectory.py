@@ -3,13 +3,18 @@ from typing import List
 
 class GeneralDirectionBuilder:
     def make_trajectory(self, landmarks: List[np.ndarray], handedness: List[int]) -> dict:
-        trajectories = {'left': [], 'right': []}
-        for i in range(1, len(landmarks)):
-            for hand_idx, hand in enumerate(['left', 'right']):
-                prev = landmarks[i - 1][hand_idx][0]
-                curr = landmarks[i][hand_idx][0]
-                delta = np.subtract(curr, prev)
-                trajectories[hand].append(delta)
-        for hand in trajectories:
-            trajectories[hand] = np.array(trajectories[hand])
-        return trajectories
+        return self.make_trajectory_batch(np.asarray(landmarks))
+
+    def make_trajectory_batch(self, landmarks: np.ndarray) -> dict:
+        """
+        Wrist displacement of each hand slot between consecutive frames,
+        computed for the whole sequence at once.
+
+        :param landmarks: (num_frames, 2, 21, 3) landmarks
+        :return: {'left': (num_frames - 1, 3), 'right': (num_frames - 1, 3)}
+        """
+        if len(landmarks) < 2:
+            return {'left': np.array([]), 'right': np.array([])}
+        wrists = landmarks[:, :2, 0]
+        deltas = np.subtract(wrists[1:], wrists[:-1])
+        return {'left': deltas[:, 0], 'right': deltas[:, 1]}
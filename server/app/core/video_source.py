@@ -0,0 +1,116 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional
+
+import cv2
+
+
+class UploadTooLarge(Exception):
+    """
+    Raised when an upload exceeds the per-request byte or scratch-disk budget.
+    """
+
+
+def stream_size(fileobj: BinaryIO) -> int:
+    """
+    Returns the size in bytes of a seekable file object and rewinds it.
+    """
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+def _as_buffered_stream(fileobj: BinaryIO) -> Optional[io.BufferedIOBase]:
+    """
+    OpenCV only decodes from Python streams derived from io.BufferedIOBase.
+    Uploads are tempfile.SpooledTemporaryFile objects, which wrap either a
+    BytesIO (still in memory) or a buffered disk file, so unwrap those.
+    """
+    if isinstance(fileobj, io.BufferedIOBase):
+        return fileobj
+    inner = getattr(fileobj, "_file", None)
+    if isinstance(inner, io.BufferedIOBase):
+        return inner
+    return None
+
+
+def _safe_suffix(filename: Optional[str]) -> str:
+    # Only keep the extension of the client filename, it helps FFmpeg probe the container
+    ext = os.path.splitext(os.path.basename(filename or ""))[1]
+    return ext if re.fullmatch(r"\.[A-Za-z0-9]{1,8}", ext) else ".video"
+
+
+@contextmanager
+def open_video_capture(
+    fileobj: BinaryIO,
+    filename: str = None,
+    max_bytes: int = None,
+    max_scratch_bytes: int = None,
+    scratch_dir: str = None,
+) -> Iterator[cv2.VideoCapture]:
+    """
+    Opens an uploaded video for decoding without copying it to a fixed path.
+
+    The upload is decoded straight from its buffer when OpenCV supports stream
+    input. Otherwise it is copied to a uniquely named scratch file that is
+    always removed on exit, even if decoding fails.
+
+    Args:
+        fileobj: seekable binary file object holding the upload.
+        filename: client filename, only used for its extension.
+        max_bytes: reject uploads larger than this many bytes.
+        max_scratch_bytes: reject uploads that need a scratch file larger than this.
+        scratch_dir: directory for scratch files, defaults to the system temp dir.
+    Yields:
+        an opened cv2.VideoCapture. It is released on exit.
+    Raises:
+        UploadTooLarge: if a byte budget is exceeded.
+        ValueError: if the video can not be opened.
+    """
+    size = stream_size(fileobj)
+    if max_bytes is not None and size > max_bytes:
+        raise UploadTooLarge(f"Upload is {size} bytes, the limit is {max_bytes}")
+
+    cap = None
+    scratch_path = None
+    try:
+        stream = _as_buffered_stream(fileobj)
+        if stream is not None:
+            try:
+                stream.seek(0)
+                cap = cv2.VideoCapture(stream, cv2.CAP_FFMPEG, [])
+            except (cv2.error, TypeError, SystemError):
+                # OpenCV builds without stream input support
+                cap = None
+            if cap is not None and not cap.isOpened():
+                cap.release()
+                cap = None
+
+        if cap is None:
+            if max_scratch_bytes is not None and size > max_scratch_bytes:
+                raise UploadTooLarge(f"Upload needs {size} bytes of scratch space, the limit is {max_scratch_bytes}")
+            if scratch_dir:
+                os.makedirs(scratch_dir, exist_ok=True)
+            fd, scratch_path = tempfile.mkstemp(prefix="upload-", suffix=_safe_suffix(filename), dir=scratch_dir)
+            with os.fdopen(fd, "wb") as scratch:
+                fileobj.seek(0)
+                shutil.copyfileobj(fileobj, scratch)
+            cap = cv2.VideoCapture(scratch_path)
+
+        if not cap.isOpened():
+            raise ValueError("Could not open the uploaded video.")
+
+        yield cap
+    finally:
+        if cap is not None:
+            cap.release()
+        if scratch_path is not None:
+            try:
+                os.remove(scratch_path)
+            except FileNotFoundError:
+                pass
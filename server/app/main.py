@@ -1,12 +1,72 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.config import settings
+from app.core.body_limit import MULTIPART_OVERHEAD_BYTES, BodySizeLimitMiddleware
+from app.core.executor import Executors, ExecutorSaturated
+from app.core.registry import ModelRegistry
 from app.db.database import engine
 from app.db import models
-from app.routes import image_processing , feedback, video_translation, auth
+from app.routes import image_processing , feedback, video_translation, live_translation, auth, metrics, audio, landmarks
+from app.services.video_pipeline import init_process_worker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.executors = Executors(
+        cpu_workers=settings.CPU_POOL_WORKERS,
+        cpu_max_queue=settings.CPU_POOL_MAX_QUEUE,
+        process_workers=settings.PROCESS_POOL_WORKERS,
+        process_max_queue=settings.PROCESS_POOL_MAX_QUEUE,
+        process_initializer=init_process_worker,
+    )
+    # Load detectors and models once per worker, before serving requests
+    app.state.registry = ModelRegistry(
+        executor=app.state.executors.cpu,
+        warmup=settings.MODEL_WARMUP,
+        batch_window_ms=settings.STATIC_BATCH_WINDOW_MS,
+        max_batch_size=settings.STATIC_BATCH_MAX_SIZE,
+        detector_pool_size=settings.DETECTOR_POOL_SIZE,
+        video_tracking=settings.VIDEO_RUNNING_MODE == "video",
+        audio_cache_dir=settings.AUDIO_CACHE_DIR,
+        audio_precompute=settings.AUDIO_PRECOMPUTE,
+        audio_free_text_cache_size=settings.AUDIO_FREE_TEXT_CACHE_SIZE,
+        tts_worker_address=settings.TTS_WORKER_ADDRESS,
+        tts_authkey=settings.TTS_WORKER_AUTHKEY.encode("utf-8") if settings.TTS_WORKER_AUTHKEY else None,
+        tts_batch_max_size=settings.TTS_BATCH_MAX_SIZE,
+        tts_batch_window_ms=settings.TTS_BATCH_WINDOW_MS,
+        tts_timeout=settings.TTS_TIMEOUT_SECONDS,
+    ).load()
+    yield
+    app.state.executors.shutdown()
+    app.state.registry.close()
+
+
+app = FastAPI(title="Hand Detection API", lifespan=lifespan)
+
+# Enforced while the body is received, before Starlette spools the upload to memory and disk
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/api/video/translate": settings.VIDEO_MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES},
+)
+
+
+@app.exception_handler(ExecutorSaturated)
+async def executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+    # Fail fast so clients can back off instead of piling up behind a full queue
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, retry shortly"},
+        headers={"Retry-After": "1"},
+    )
 
-app = FastAPI(title="Hand Detection API")
 
 # Include image processing routes
 app.include_router(image_processing.router)
 app.include_router(feedback.router)
 app.include_router(video_translation.router, prefix="/api/video", tags=["Video Translation"])
-app.include_router(auth.router)
\ No newline at end of file
+app.include_router(live_translation.router, prefix="/api/video", tags=["Video Translation"])
+app.include_router(auth.router)
+app.include_router(metrics.router, tags=["Metrics"])
+app.include_router(audio.router, tags=["Audio"])
+app.include_router(landmarks.router)
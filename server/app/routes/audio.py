@@ -0,0 +1,68 @@
+from urllib.parse import quote
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.core.registry import get_audio_cache
+from app.services.audio_cache import AudioCache
+from app.services.tts_worker import TTSWorkerError
+
+router = APIRouter()
+
+# The URL of a label is stable, the ETag changes with the TTS model revision,
+# so clients keep the audio for a day and then revalidate for free.
+AUDIO_CACHE_CONTROL = "public, max-age=86400"
+CHUNK_SIZE = 64 * 1024
+
+
+def audio_url(label: str) -> str:
+    """
+    Path of the spoken label, returned next to predictions.
+    """
+    return f"/audio/{quote(label, safe='')}"
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _chunks(audio: bytes):
+    view = memoryview(audio)
+    for start in range(0, len(view), CHUNK_SIZE):
+        yield bytes(view[start:start + CHUNK_SIZE])
+
+
+@router.get("/audio/{label}", name="label_audio")
+async def label_audio(
+    label: str,
+    request: Request,
+    cache: AudioCache = Depends(get_audio_cache),
+):
+    """
+    Spoken label as audio/wav. Only the labels the models can predict are served.
+    """
+    if not cache.in_vocabulary(label):
+        raise HTTPException(status_code=404, detail="Unknown label")
+
+    # Strong validator: the key hashes the text and the model revision, which determine the bytes
+    try:
+        etag = f'"{await cache.key_async(label)}"'
+    except TTSWorkerError:
+        raise HTTPException(status_code=503, detail="Speech synthesis is unavailable, try again later")
+    headers = {"ETag": etag, "Cache-Control": AUDIO_CACHE_CONTROL}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # Only the first request of a label synthesizes, later ones are memory hits.
+    # The synthesis is awaited on the TTS worker, it holds no CPU executor slot.
+    try:
+        audio = await cache.get_async(label)
+    except (TTSWorkerError, asyncio.TimeoutError):
+        raise HTTPException(status_code=503, detail="Speech synthesis is unavailable, try again later")
+    headers["Content-Length"] = str(len(audio))
+    return StreamingResponse(_chunks(audio), media_type="audio/wav", headers=headers)
@@ -1,23 +1,25 @@
-from fastapi import APIRouter, File, UploadFile, HTTPException
+import asyncio
+from typing import List
+from fastapi import APIRouter, Depends, File, UploadFile, HTTPException
 from fastapi.responses import JSONResponse
 import numpy as np
 import cv2
+from app.config import settings
 from app.services.mediapipe_service import MediaPipeWrapper
-from app.services.model_service import predict_hand_sign
-from app.services.normalization import Normalization
-from app.utils.audio_generator import generate_base64_audio
+from app.services.model_service import predict_raw_hand_sign_batch
+from app.core.executor import BoundedExecutor, ExecutorSaturated, get_cpu_executor
+from app.core.registry import get_image_detector, get_static_batcher
+from app.services.batching import MicroBatcher
+from app.routes.audio import audio_url
 from app.utils.amharic_map import AMHARIC_MAP
 
 router = APIRouter()
-mp_wrapper = MediaPipeWrapper()
-normalizer = Normalization()
 
-@router.post("/process-image/")
-async def process_image(file: UploadFile = File(...)):
-    if not file.content_type.startswith('image/'):
-        raise HTTPException(status_code=400, detail="Invalid image file")
-
-    contents = await file.read()
+def _detect_landmarks(contents: bytes, mp_wrapper: MediaPipeWrapper) -> np.ndarray:
+    """
+    Decodes the image and detects the hand landmarks.
+    Blocking, runs on the CPU executor. Normalization happens per batch in the batcher.
+    """
     np_array = np.frombuffer(contents, np.uint8)
     img = cv2.imdecode(np_array, cv2.IMREAD_COLOR)
 
@@ -25,22 +27,90 @@ async def process_image(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail="Could not read image")
 
     hand_roi, hand_landmarks, roi = mp_wrapper.extract_hand_roi(img)
-    
-    
-    if hand_landmarks is not None:
-        landmarks_array = mp_wrapper.landmarks_to_array(hand_landmarks)
-        normalized_original = normalizer.normalize_hand_landmarks(landmarks_array)
-        # normalized_original = normalized_original.reshape(1, 21, 2)
-        prediction = predict_hand_sign(normalized_original)
-
-    else:
+
+    if hand_landmarks is None:
         raise HTTPException(status_code=422, detail="No hand detected")
-    
+
+    return mp_wrapper.landmarks_to_array(hand_landmarks)
+
+@router.post("/process-image/")
+async def process_image(
+    file: UploadFile = File(...),
+    mp_wrapper: MediaPipeWrapper = Depends(get_image_detector),
+    batcher: MicroBatcher = Depends(get_static_batcher),
+    executor: BoundedExecutor = Depends(get_cpu_executor),
+):
+    if not file.content_type.startswith('image/'):
+        raise HTTPException(status_code=400, detail="Invalid image file")
+
+    contents = await file.read()
+    landmarks_array = await executor.run(_detect_landmarks, contents, mp_wrapper)
+
+    # Batched with concurrent requests into a single normalization and forward pass
+    prediction = int(await batcher.submit(landmarks_array))
+
     print(prediction)
     prediction = AMHARIC_MAP.get(prediction, "Unknown")
-    
-    # audio_base64 = generate_base64_audio(prediction)
+
+    # Audio is fetched separately from a cacheable route instead of inlined as base64
     return {
-    "prediction": prediction
+        "prediction": prediction,
+        "audio_url": audio_url(prediction) if prediction in AMHARIC_MAP.values() else None,
+    }
+
+
+@router.post("/process-images/")
+async def process_images(
+    files: List[UploadFile] = File(...),
+    mp_wrapper: MediaPipeWrapper = Depends(get_image_detector),
+    executor: BoundedExecutor = Depends(get_cpu_executor),
+):
+    """
+    Classifies several images in one request.
+
+    The images are decoded and detected in parallel on the CPU executor, which
+    checks detectors out of the shared pool. All hands are then normalized in
+    one batched step and classified in a single forward pass. An image that
+    fails (not an image, unreadable, no hand) gets its own error entry instead
+    of failing the batch. Results are in upload order.
+    """
+    if len(files) > settings.BATCH_MAX_IMAGES:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BATCH_MAX_IMAGES} images per request")
+
+    # At most one job per executor worker, so a batch can not fill the queue on its own
+    slots = asyncio.Semaphore(executor.max_workers)
+
+    async def detect(file: UploadFile):
+        if not file.content_type or not file.content_type.startswith('image/'):
+            raise HTTPException(status_code=400, detail="Invalid image file")
+        contents = await file.read()
+        async with slots:
+            return await executor.run(_detect_landmarks, contents, mp_wrapper)
+
+    detections = await asyncio.gather(*(detect(file) for file in files), return_exceptions=True)
+
+    results = [{"filename": file.filename} for file in files]
+    detected = []
+    for result, detection in zip(results, detections):
+        if isinstance(detection, HTTPException):
+            result.update(error=detection.detail, status_code=detection.status_code)
+        elif isinstance(detection, ExecutorSaturated):
+            result.update(error="Server is busy, retry shortly", status_code=503)
+        elif isinstance(detection, Exception):
+            raise detection
+        else:
+            detected.append((result, detection))
+
+    if detected:
+        # One normalization and one forward pass for every hand of the request
+        indices = await executor.run(
+            predict_raw_hand_sign_batch, np.stack([landmarks for _, landmarks in detected])
+        )
+        for (result, _), index in zip(detected, indices):
+            prediction = AMHARIC_MAP.get(int(index), "Unknown")
+            result.update(
+                prediction=prediction,
+                audio_url=audio_url(prediction) if prediction in AMHARIC_MAP.values() else None,
+            )
 
-}
\ No newline at end of file
+    return {"results": results}
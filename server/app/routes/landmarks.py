@@ -0,0 +1,128 @@
+import asyncio
+from typing import List
+
+import numpy as np
+from fastapi import APIRouter, Depends, HTTPException, Request
+
+from app.config import settings
+from app.core.executor import BoundedExecutor, get_cpu_executor
+from app.core.predict import SignLanguageModel
+from app.core.registry import get_direction_builder, get_sequence_cleaner, get_static_batcher, get_video_model
+from app.core.trajectory import GeneralDirectionBuilder
+from app.routes.audio import audio_url
+from app.services.batching import MicroBatcher
+from app.services.sequence_cleaner import SequenceCleaner
+from app.utils import landmark_codec
+from app.utils.amharic_map import AMHARIC_MAP
+from app.utils.helpers import frame_landmarks_from_arrays, keyframe_sample_from_landmarks, sample_to_model_input
+
+router = APIRouter()
+
+NUM_KEYFRAMES = 6
+
+
+async def _read_message(request: Request, max_bytes: int) -> bytes:
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(status_code=413, detail="Landmark message is too large")
+    body = await request.body()
+    if len(body) > max_bytes:
+        raise HTTPException(status_code=413, detail="Landmark message is too large")
+    return body
+
+
+def _predict_landmark_sequence(hand_landmarks: np.ndarray, world_landmarks: np.ndarray, handedness: np.ndarray,
+                               cleaner: SequenceCleaner, builder: GeneralDirectionBuilder,
+                               model: SignLanguageModel) -> str:
+    """
+    Runs decoded client landmarks through the same keyframe extraction and
+    classifier as a video upload. Blocking, runs on the CPU executor.
+    """
+    frame_hand_landmarks: List[np.ndarray] = []
+    frame_world_landmarks: List[np.ndarray] = []
+    frame_handedness: List[np.ndarray] = []
+    keyframe_extractor = cleaner.online(NUM_KEYFRAMES)
+
+    for hands, world, labels in zip(hand_landmarks, world_landmarks, handedness):
+        present = labels != -1
+        landmarks = frame_landmarks_from_arrays(hands[present], world[present], labels[present])
+        if landmarks is None:
+            continue
+        frame_hand, frame_world, frame_labels = landmarks
+        frame_hand_landmarks.append(frame_hand)
+        frame_world_landmarks.append(frame_world)
+        frame_handedness.append(frame_labels)
+        keyframe_extractor.push(frame_hand, frame_labels)
+
+    if len(frame_hand_landmarks) < NUM_KEYFRAMES:
+        raise ValueError("Not enough valid frames to extract keyframes.")
+
+    sample = keyframe_sample_from_landmarks(
+        frame_hand_landmarks, frame_world_landmarks, frame_handedness, cleaner, builder, NUM_KEYFRAMES,
+        key_frames=keyframe_extractor.finalize()
+    )
+    return model.predict(sample_to_model_input(sample))
+
+
+@router.post("/process-landmarks/")
+async def process_landmarks(
+    request: Request,
+    batcher: MicroBatcher = Depends(get_static_batcher),
+):
+    """
+    Static sign classification from landmarks detected on the device.
+
+    The body is a static message of app.utils.landmark_codec: one or more
+    (21, 2) hands of image x and y coordinates, float16 or float32. The hands
+    skip decoding and detection and go straight into the batched normalization
+    and forward pass of /process-image/. There is one result per hand, in order.
+    """
+    body = await _read_message(
+        request, landmark_codec.HEADER.size + settings.LANDMARK_MAX_HANDS * 21 * 2 * 4
+    )
+    try:
+        landmarks = landmark_codec.decode_static(body, max_hands=settings.LANDMARK_MAX_HANDS)
+    except landmark_codec.LandmarkCodecError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Every hand joins the micro-batch on its own, concurrent requests share the forward pass
+    indices = await asyncio.gather(*(batcher.submit(hand) for hand in landmarks))
+    predictions = [AMHARIC_MAP.get(int(index), "Unknown") for index in indices]
+    return {"results": [
+        {"prediction": prediction, "audio_url": audio_url(prediction) if prediction in AMHARIC_MAP.values() else None}
+        for prediction in predictions
+    ]}
+
+
+@router.post("/api/video/translate-landmarks", tags=["Video Translation"])
+async def translate_landmarks(
+    request: Request,
+    cleaner: SequenceCleaner = Depends(get_sequence_cleaner),
+    builder: GeneralDirectionBuilder = Depends(get_direction_builder),
+    model: SignLanguageModel = Depends(get_video_model),
+    executor: BoundedExecutor = Depends(get_cpu_executor),
+):
+    """
+    Dynamic sign translation from a landmark sequence detected on the device.
+
+    The body is a dynamic message of app.utils.landmark_codec: (T, 2, 21, 3)
+    image and world landmarks and (T, 2) handedness. It runs through the
+    keyframe extraction, trajectory and classifier of /api/video/translate
+    without decoding or detecting a single frame.
+    """
+    max_frames = settings.LANDMARK_MAX_FRAMES
+    body = await _read_message(
+        request, landmark_codec.HEADER.size + max_frames * (2 * 2 * 21 * 3 * 4 + 2)
+    )
+    try:
+        hand_landmarks, world_landmarks, handedness = landmark_codec.decode_dynamic(body, max_frames=max_frames)
+    except landmark_codec.LandmarkCodecError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        predicted_label = await executor.run(
+            _predict_landmark_sequence, hand_landmarks, world_landmarks, handedness, cleaner, builder, model
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"prediction": predicted_label, "audio_url": audio_url(predicted_label)}
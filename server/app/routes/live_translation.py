@@ -0,0 +1,198 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect
+
+from app.config import settings
+from app.core.executor import Executors, ExecutorSaturated, get_executors
+from app.core.mediapipe_wrapper import MediaPipeWrapper
+from app.core.predict import SignLanguageModel
+from app.core.registry import (
+    ModelRegistry,
+    get_registry,
+    get_video_detector,
+    get_sequence_cleaner,
+    get_direction_builder,
+    get_video_model,
+)
+from app.core.trajectory import GeneralDirectionBuilder
+from app.services.sequence_cleaner import SequenceCleaner
+from app.utils.helpers import (
+    frame_landmarks_from_arrays,
+    frame_landmarks_from_result,
+    keyframe_sample_from_landmarks,
+    sample_to_model_input,
+)
+
+router = APIRouter()
+
+NUM_KEYFRAMES = 6
+
+
+class LiveSession:
+    """
+    Rolling window of per-frame landmarks for one WebSocket client.
+    Only the last window_frames frames are kept, so memory per session is bounded.
+    """
+
+    def __init__(self, window_frames: int, tracker=None):
+        self.hand_landmarks = deque(maxlen=window_frames)
+        self.world_landmarks = deque(maxlen=window_frames)
+        self.handedness = deque(maxlen=window_frames)
+        self.tracker = tracker
+        self.started = time.monotonic()
+        self.frames_since_prediction = 0
+
+    def add(self, landmarks):
+        hand_landmarks, world_landmarks, handedness = landmarks
+        self.hand_landmarks.append(hand_landmarks)
+        self.world_landmarks.append(world_landmarks)
+        self.handedness.append(handedness)
+        self.frames_since_prediction += 1
+
+    def reset(self):
+        self.hand_landmarks.clear()
+        self.world_landmarks.clear()
+        self.handedness.clear()
+        self.frames_since_prediction = 0
+
+    def ready(self, predict_every: int) -> bool:
+        return len(self.hand_landmarks) >= NUM_KEYFRAMES and self.frames_since_prediction >= predict_every
+
+    def elapsed_ms(self) -> int:
+        return int((time.monotonic() - self.started) * 1000)
+
+    def close(self):
+        if self.tracker is not None:
+            self.tracker.close()
+
+
+def _detect_frame(data: bytes, wrapper: MediaPipeWrapper, tracker, timestamp_ms: int):
+    """
+    Decodes one encoded frame and returns its landmarks, or None without hands.
+    Blocking, runs on the CPU executor.
+    """
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Could not decode frame.")
+
+    if tracker is not None:
+        result = tracker.process(img, timestamp_ms)
+    else:
+        result = wrapper.process_from_image(img)
+    return frame_landmarks_from_result(result, wrapper)
+
+
+def _predict_window(frame_hand_landmarks, frame_world_landmarks, frame_handedness,
+                    cleaner: SequenceCleaner, builder: GeneralDirectionBuilder, model: SignLanguageModel) -> str:
+    """
+    Extracts keyframes from the current window and classifies them.
+    Blocking, runs on the CPU executor.
+    """
+    sample = keyframe_sample_from_landmarks(
+        frame_hand_landmarks, frame_world_landmarks, frame_handedness, cleaner, builder, NUM_KEYFRAMES
+    )
+    return model.predict(sample_to_model_input(sample))
+
+
+@router.websocket("/live")
+async def live_translation(
+    websocket: WebSocket,
+    wrapper: MediaPipeWrapper = Depends(get_video_detector),
+    cleaner: SequenceCleaner = Depends(get_sequence_cleaner),
+    builder: GeneralDirectionBuilder = Depends(get_direction_builder),
+    model: SignLanguageModel = Depends(get_video_model),
+    executors: Executors = Depends(get_executors),
+    registry: ModelRegistry = Depends(get_registry),
+):
+    """
+    Incremental sign translation over a WebSocket.
+
+    The client sends frames as they are captured, either as binary messages
+    holding an encoded image (JPEG/PNG), or as text messages holding a JSON
+    landmark packet detected on the device:
+        {"hand_landmarks": [[[x, y, z] * 21] * n],
+         "world_landmarks": [[[x, y, z] * 21] * n],
+         "handedness": [0 or 1] * n}
+    {"type": "reset"} clears the window. Once enough frames are buffered the
+    server answers every LIVE_PREDICT_EVERY frames with
+        {"prediction": <label>, "frames": <frames in window>}
+    Sessions idle for LIVE_IDLE_SECONDS are closed.
+    """
+    if registry.live_sessions >= settings.LIVE_MAX_SESSIONS:
+        # 1013: try again later
+        await websocket.close(code=1013)
+        return
+
+    # Counted before the first await, so concurrent handshakes can not all pass the check above
+    registry.live_sessions += 1
+    session = None
+    try:
+        await websocket.accept()
+        tracker = wrapper.video_tracker() if settings.VIDEO_RUNNING_MODE == "video" else None
+        session = LiveSession(settings.LIVE_WINDOW_FRAMES, tracker)
+
+        while True:
+            try:
+                message = await asyncio.wait_for(websocket.receive(), timeout=settings.LIVE_IDLE_SECONDS)
+            except asyncio.TimeoutError:
+                await websocket.close(code=1000, reason="Idle timeout")
+                break
+            if message["type"] == "websocket.disconnect":
+                break
+
+            try:
+                if message.get("bytes") is not None:
+                    if len(message["bytes"]) > settings.LIVE_MAX_FRAME_BYTES:
+                        raise ValueError("Frame is too large.")
+                    landmarks = await executors.cpu.run(
+                        _detect_frame, message["bytes"], wrapper, session.tracker, session.elapsed_ms()
+                    )
+                else:
+                    text = message.get("text") or "{}"
+                    if len(text.encode("utf-8")) > settings.LIVE_MAX_FRAME_BYTES:
+                        raise ValueError("Frame is too large.")
+                    packet = json.loads(text)
+                    if packet.get("type") == "reset":
+                        session.reset()
+                        continue
+                    landmarks = frame_landmarks_from_arrays(
+                        packet["hand_landmarks"], packet["world_landmarks"], packet["handedness"]
+                    )
+            except ExecutorSaturated:
+                await websocket.send_json({"error": "Server is busy, frame dropped"})
+                continue
+            except (ValueError, KeyError, TypeError) as e:
+                await websocket.send_json({"error": str(e)})
+                continue
+
+            if landmarks is None:
+                continue
+            session.add(landmarks)
+
+            if not session.ready(settings.LIVE_PREDICT_EVERY):
+                continue
+            session.frames_since_prediction = 0
+            try:
+                label = await executors.cpu.run(
+                    _predict_window,
+                    list(session.hand_landmarks), list(session.world_landmarks), list(session.handedness),
+                    cleaner, builder, model,
+                )
+            except ExecutorSaturated:
+                continue
+            except Exception as e:
+                # A failed prediction ends this window only, the session goes on
+                await websocket.send_json({"error": f"Prediction failed: {e}"})
+                continue
+            await websocket.send_json({"prediction": label, "frames": len(session.hand_landmarks)})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if session is not None:
+            session.close()
+        registry.live_sessions -= 1
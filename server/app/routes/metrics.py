@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends
+from app.core.executor import Executors, get_executors
+from app.core.registry import ModelRegistry, get_registry
+
+router = APIRouter()
+
+@router.get("/metrics/models")
+def model_metrics(registry: ModelRegistry = Depends(get_registry)):
+    """
+    Load time, warmup time and memory delta of every registry component.
+    """
+    return registry.describe()
+
+@router.get("/metrics/executors")
+def executor_metrics(executors: Executors = Depends(get_executors)):
+    """
+    Queue depth, in-flight and rejected jobs of the blocking-work executors.
+    """
+    return executors.describe()
+
+@router.get("/metrics/detectors")
+def detector_metrics(registry: ModelRegistry = Depends(get_registry)):
+    """
+    Size, checkouts and wait times of the HandLandmarker pools.
+    """
+    return registry.describe_detector_pools()
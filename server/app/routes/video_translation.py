@@ -1,46 +1,49 @@
-from fastapi import APIRouter, UploadFile, File
-import os
-import shutil
-from app.core.preprocess import load_frames_from_video
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from app.config import settings
+from app.core.executor import Executors, ExecutorSaturated, get_executors
 from app.core.mediapipe_wrapper import MediaPipeWrapper
 from app.core.trajectory import GeneralDirectionBuilder
 from app.core.predict import SignLanguageModel
+from app.core.registry import get_video_detector, get_sequence_cleaner, get_direction_builder, get_video_model
+from app.routes.audio import audio_url
+from app.core.video_source import UploadTooLarge, stream_size
 from app.services.sequence_cleaner import SequenceCleaner
-from app.utils.helpers import load_one_sample_with_keyframes_from_frames, pad_trajectories, combine_landmarks_and_trajectory , pad_single_sample
+from app.services.video_pipeline import extract_video_sample, extract_video_sample_in_process
+from app.utils.helpers import sample_to_model_input
 
 router = APIRouter()
 
 @router.post("/translate")
-async def translate_video(file: UploadFile = File(...)):
-    # Save uploaded file
+async def translate_video(
+    file: UploadFile = File(...),
+    wrapper: MediaPipeWrapper = Depends(get_video_detector),
+    cleaner: SequenceCleaner = Depends(get_sequence_cleaner),
+    builder: GeneralDirectionBuilder = Depends(get_direction_builder),
+    model: SignLanguageModel = Depends(get_video_model),
+    executors: Executors = Depends(get_executors),
+):
     try:
-        file_location = f"temp_videos/{file.filename}"
-        os.makedirs("temp_videos", exist_ok=True)
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Decoding and detection are blocking, keep them off the event loop
+        if executors.process is not None:
+            # BodySizeLimitMiddleware already bounded the request, this is the exact file size
+            if stream_size(file.file) > settings.VIDEO_MAX_UPLOAD_BYTES:
+                raise UploadTooLarge("Video upload is too large")
+            data = await file.read()
+            single_data = await executors.process.run(extract_video_sample_in_process, data, file.filename)
+        else:
+            single_data = await executors.cpu.run(extract_video_sample, file.file, file.filename, wrapper, cleaner, builder)
 
-        # Load frames
-        frames = load_frames_from_video(file_location)
-        if not frames:
-            return {"error": "Could not process video frames."}
-
-        # Initialize processors
-        wrapper = MediaPipeWrapper()
-        cleaner = SequenceCleaner()
-        builder = GeneralDirectionBuilder()
-
-        # Process frames
-        single_data = load_one_sample_with_keyframes_from_frames(frames, wrapper, cleaner, builder)
-        single_data['trajectory'] = pad_trajectories(single_data['trajectory'])
-        to_test = combine_landmarks_and_trajectory(single_data['landmark'], single_data['trajectory'])
-        to_test = pad_single_sample(to_test)
+        to_test = sample_to_model_input(single_data)
         # Predict
-        model = SignLanguageModel()
-        predicted_label = model.predict(to_test)
-
-        # Clean up
-        os.remove(file_location)
+        predicted_label = await executors.cpu.run(model.predict, to_test)
 
-        return {"prediction": predicted_label}
+        return {"prediction": predicted_label, "audio_url": audio_url(predicted_label)}
+    except ExecutorSaturated:
+        raise
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        # The video could not be opened or has too few frames with hands
+        raise HTTPException(status_code=422, detail=str(e))
     except Exception as e:
-        return {"errorssssss": str(e)}
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
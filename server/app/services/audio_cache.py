@@ -0,0 +1,246 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from app.core.predict import labels as video_labels
+from app.utils.amharic_map import AMHARIC_MAP
+
+
+def sign_vocabulary() -> List[str]:
+    """
+    Every text the prediction routes can speak: the letters of the static
+    model and the words of the video model.
+    """
+    return list(dict.fromkeys([*AMHARIC_MAP.values(), *video_labels]))
+
+
+class AudioCache:
+    """
+    Synthesized speech keyed by text and TTS model revision.
+
+    The closed sign vocabulary is synthesized once, lazily or with warm(),
+    persisted as WAV files under cache_dir and kept in memory afterwards, so
+    repeats never call the model. Other texts go to a bounded in-memory LRU.
+    A revision change gives new keys, so stale audio is never served.
+
+    get() blocks its thread while the model synthesizes. With submit, the
+    event loop uses get_async() instead, which waits on the TTS worker without
+    holding an executor thread.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], bytes],
+        revision: Union[str, Callable[[], str]],
+        vocabulary: Iterable[str],
+        cache_dir: Optional[str] = None,
+        max_free_text: int = 256,
+        synthesize_many: Optional[Callable[[List[str]], List[bytes]]] = None,
+        submit: Optional[Callable[[str], Future]] = None,
+        timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            synthesize: blocking function mapping a text to WAV bytes.
+            revision: identifies the TTS model, part of every key. A callable is
+                called on first use, so a lazily started TTS worker stays stopped until audio is needed.
+            vocabulary: texts that are persisted and never evicted.
+            cache_dir: directory of the persisted WAVs, None to keep them in memory only.
+            max_free_text: entries of the LRU for texts outside the vocabulary.
+            synthesize_many: optional batched synthesize, used by warm().
+            submit: optional non-blocking synthesize returning a future of the WAV bytes,
+                required by get_async().
+            timeout: seconds get_async() waits for a synthesis, None to wait forever.
+        """
+        self.synthesize = synthesize
+        self.synthesize_many = synthesize_many
+        self.submit = submit
+        self.timeout = timeout
+        self._revision = revision if isinstance(revision, str) else None
+        self._get_revision = revision if callable(revision) else None
+        self.vocabulary = list(vocabulary)
+        self._vocabulary = set(self.vocabulary)
+        self.cache_dir = cache_dir
+        self.max_free_text = max_free_text
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+        self._vocabulary_audio: Dict[str, bytes] = {}
+        self._free_text: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        # One lock per text being synthesized, concurrent requests for it wait instead of synthesizing again
+        self._in_flight: Dict[str, threading.Lock] = {}
+        # Same for get_async(), only touched from the event loop thread
+        self._in_flight_async: Dict[str, asyncio.Task] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.syntheses = 0
+        self.synthesis_seconds = 0.0
+
+    @property
+    def revision(self) -> str:
+        if self._revision is None:
+            self._revision = self._get_revision()
+        return self._revision
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.revision}\n{text}".encode("utf-8")).hexdigest()
+
+    async def key_async(self, text: str) -> str:
+        """
+        key() for the event loop. Resolving the revision the first time may
+        start the TTS worker, that wait runs off the loop.
+        """
+        if self._revision is None:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.revision)
+        return self.key(text)
+
+    def in_vocabulary(self, text: str) -> bool:
+        return text in self._vocabulary
+
+    def get(self, text: str) -> bytes:
+        """
+        Returns the WAV bytes of text, synthesizing it on the first request. Blocking.
+        """
+        audio = self._lookup(text)
+        if audio is not None:
+            return audio
+
+        with self._lock:
+            text_lock = self._in_flight.setdefault(text, threading.Lock())
+        with text_lock:
+            # Another request may have synthesized it while we waited
+            audio = self._lookup(text)
+            if audio is None:
+                audio = self._synthesize(text)
+        with self._lock:
+            self._in_flight.pop(text, None)
+        return audio
+
+    async def get_async(self, text: str) -> bytes:
+        """
+        Returns the WAV bytes of text like get(), awaiting the synthesis
+        instead of blocking a thread. Concurrent calls for a text share one
+        synthesis.
+
+        Raises:
+            asyncio.TimeoutError: if the synthesis takes longer than timeout.
+        """
+        if self.submit is None:
+            raise RuntimeError("get_async() needs an AudioCache created with submit")
+        # The lookup and submit() below only block once the revision, and so the worker, is ready
+        await self.key_async(text)
+        audio = self._lookup(text)
+        if audio is not None:
+            return audio
+
+        task = self._in_flight_async.get(text)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_async(text))
+            self._in_flight_async[text] = task
+            task.add_done_callback(lambda _: self._in_flight_async.pop(text, None))
+        # Shielded, a cancelled request must not cancel the synthesis others are waiting for
+        return await asyncio.shield(task)
+
+    async def _synthesize_async(self, text: str) -> bytes:
+        start = time.perf_counter()
+        # On timeout wait_for cancels the wrapped future, which cancels the request in the client
+        audio = await asyncio.wait_for(asyncio.wrap_future(self.submit(text)), self.timeout)
+        self._store(text, audio, time.perf_counter() - start)
+        return audio
+
+    def warm(self) -> int:
+        """
+        Synthesizes the vocabulary entries missing from memory and disk.
+        Returns the number of syntheses.
+        """
+        missing = [text for text in self.vocabulary if self._lookup(text) is None]
+        if not missing:
+            return 0
+        if self.synthesize_many is None:
+            for text in missing:
+                self.get(text)
+            return len(missing)
+
+        start = time.perf_counter()
+        audios = self.synthesize_many(missing)
+        elapsed = time.perf_counter() - start
+        for text, audio in zip(missing, audios):
+            self._store(text, audio, elapsed / len(missing))
+        return len(missing)
+
+    def describe(self) -> dict:
+        return {
+            "revision": self._revision,
+            "vocabulary_cached": len(self._vocabulary_audio),
+            "vocabulary_size": len(self.vocabulary),
+            "free_text_cached": len(self._free_text),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "syntheses": self.syntheses,
+            "synthesis_seconds": round(self.synthesis_seconds, 4),
+        }
+
+    def _lookup(self, text: str) -> Optional[bytes]:
+        with self._lock:
+            if text in self._vocabulary_audio:
+                self.hits += 1
+                return self._vocabulary_audio[text]
+            if text in self._free_text:
+                self._free_text.move_to_end(text)
+                self.hits += 1
+                return self._free_text[text]
+
+        if text not in self._vocabulary or self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(text), "rb") as f:
+                audio = f.read()
+        except OSError:
+            return None
+        with self._lock:
+            self._vocabulary_audio[text] = audio
+            self.disk_hits += 1
+        return audio
+
+    def _synthesize(self, text: str) -> bytes:
+        start = time.perf_counter()
+        audio = self.synthesize(text)
+        self._store(text, audio, time.perf_counter() - start)
+        return audio
+
+    def _store(self, text: str, audio: bytes, elapsed: float):
+        if text in self._vocabulary and self.cache_dir is not None:
+            self._write(self._path(text), audio)
+        with self._lock:
+            self.syntheses += 1
+            self.synthesis_seconds += elapsed
+            if text in self._vocabulary:
+                self._vocabulary_audio[text] = audio
+            else:
+                self._free_text[text] = audio
+                while len(self._free_text) > self.max_free_text:
+                    self._free_text.popitem(last=False)
+
+    def _path(self, text: str) -> str:
+        return os.path.join(self.cache_dir, self.key(text) + ".wav")
+
+    @staticmethod
+    def _write(path: str, audio: bytes):
+        # Atomic, so other workers sharing the directory never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
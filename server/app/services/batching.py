@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Callable, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from app.core.executor import BoundedExecutor
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single-sample requests and answers them with one
+    batched call.
+
+    A batch is flushed when max_batch_size samples are waiting or window_ms
+    after the first sample of the batch arrived, whichever comes first. The
+    batched call runs on a BoundedExecutor, so a saturated executor fails
+    every sample of the batch with ExecutorSaturated.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[np.ndarray], Sequence],
+        max_batch_size: int = 32,
+        window_ms: float = 5.0,
+        *,
+        executor: BoundedExecutor,
+    ):
+        """
+        Args:
+            predict_batch: blocking function mapping a stacked batch to one result per sample.
+            max_batch_size: flush as soon as this many samples are waiting.
+            window_ms: how long the first sample of a batch waits for company.
+            executor: runs predict_batch, usually the CPU executor of the worker.
+        """
+        self.predict_batch = predict_batch
+        self.executor = executor
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.window_ms = window_ms
+
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks, a dropped batch would never resolve
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.batches = 0
+        self.samples = 0
+        self.busy_seconds = 0.0
+
+    async def submit(self, sample: np.ndarray):
+        """
+        Queues one sample and waits for its result.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((sample, future))
+
+        if len(self._pending) >= self.max_batch_size or self.window_ms <= 0:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        inputs = np.stack([sample for sample, _ in batch])
+
+        start = time.perf_counter()
+        try:
+            # The forward pass is blocking, keep it off the event loop
+            outputs = await self.executor.run(self.predict_batch, inputs)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+
+        self.batches += 1
+        self.samples += len(batch)
+        for (_, future), output in zip(batch, outputs):
+            # The caller may have gone away (e.g. client disconnect)
+            if not future.done():
+                future.set_result(output)
+
+    def describe(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "window_ms": self.window_ms,
+            "batches": self.batches,
+            "samples": self.samples,
+            "mean_batch_size": round(self.samples / self.batches, 2) if self.batches else 0.0,
+            "busy_seconds": round(self.busy_seconds, 4),
+        }
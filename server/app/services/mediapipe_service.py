@@ -3,16 +3,21 @@ from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 import cv2
 import numpy as np
+from app.core.detector_pool import DetectorPool
 
 class MediaPipeWrapper:
-    def __init__(self):
+    def __init__(self, pool_size: int = 1):
         """
         Initializes the MediaPipe wrapper for hand detection.
+
+        Args:
+            pool_size: number of HandLandmarker instances that can detect concurrently,
+                None sizes the pool to the number of cores.
         """
         self.base_option = python.BaseOptions(model_asset_path='./hand_landmarker.task')
         self.option = vision.HandLandmarkerOptions(base_options=self.base_option,
                                                    num_hands=2)
-        self.detector = vision.HandLandmarker.create_from_options(self.option)
+        self.pool = DetectorPool(self.option, pool_size)
         
     def detect_hands(self, frame):
         """
@@ -23,7 +28,7 @@ class MediaPipeWrapper:
         """
         H, W, _ = frame.shape
         mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        result = self.detector.detect(mp_image)
+        result = self.pool.detect(mp_image)
         return result
 
     def extract_hand_roi(self, frame):
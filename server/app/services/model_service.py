@@ -1,10 +1,39 @@
 import os
 import numpy as np
-from tensorflow.keras.models import load_model
+from app.config import settings
+from app.core.inference import load_backend
+from app.services.normalization import Normalization
 
 # Load the model once when the service is imported
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '../../ml_models/model.keras')
-model = load_model(MODEL_PATH)
+model = load_backend(
+    MODEL_PATH, settings.INFERENCE_BACKEND, settings.INFERENCE_QUANTIZED, settings.INFERENCE_THREADS,
+    settings.KERAS_DIRECT_CALL
+)
+normalizer = Normalization()
+
+def predict_hand_sign_batch(landmarks_batch: np.ndarray) -> np.ndarray:
+    """
+    Make predictions for a stack of normalized hand landmarks in one forward pass.
+
+    Args:
+        landmarks_batch (np.ndarray): normalized landmarks of shape (N, 21, 2)
+    Returns:
+        np.ndarray: predicted class index for every sample, shape (N,)
+    """
+    prediction = model.predict(np.asarray(landmarks_batch, dtype=np.float32))
+    return np.argmax(prediction, axis=1)
+
+def predict_raw_hand_sign_batch(landmarks_batch: np.ndarray) -> np.ndarray:
+    """
+    Normalize a stack of raw hand landmarks in one vectorized pass and classify them.
+
+    Args:
+        landmarks_batch (np.ndarray): raw landmarks of shape (N, 21, 2)
+    Returns:
+        np.ndarray: predicted class index for every sample, shape (N,)
+    """
+    return predict_hand_sign_batch(normalizer.normalize_hand_landmarks_batch(landmarks_batch))
 
 def predict_hand_sign(landmarks_array: np.ndarray):
     """
@@ -21,16 +50,7 @@ def predict_hand_sign(landmarks_array: np.ndarray):
     # Add batch dimension: (1, 63)
     input_array = np.expand_dims(landmarks_array, axis=0)
 
-    prediction = model.predict(input_array)
-
-
     # return the maximum value index as the predicted class
-    maximum_index = 0
-    value = -1
-    print(prediction)    
-    for idx , val in enumerate(prediction[0]):
-        if val > value:
-            value = val
-            maximum_index = idx
+    maximum_index = int(predict_hand_sign_batch(input_array)[0])
     print("maximum index", maximum_index)
-    return maximum_index
\ No newline at end of file
+    return maximum_index
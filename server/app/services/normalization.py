@@ -102,4 +102,51 @@ class Normalization:
         if max_val > 0:
             rotated_landmarks = rotated_landmarks / max_val
 
-        return rotated_landmarks
\ No newline at end of file
+        return rotated_landmarks
+
+
+    def normalize_hand_landmarks_batch(self, landmarks):
+        """
+        Batched normalize_hand_landmarks: centers, scales, rotates and rescales
+        a whole stack of hands with broadcasting, one rotation matrix per hand.
+
+        Args:
+            landmarks: The hand landmarks, numpy array of shape (N, 21, 2).
+        Returns:
+            The normalized landmarks, shape (N, 21, 2).
+        """
+        landmarks = np.asarray(landmarks)
+        if len(landmarks) == 0:
+            return landmarks.astype(np.float64)
+
+        # Center around the palm center
+        center = np.mean(landmarks[:, self.mcp_indices], axis=1, keepdims=True)
+        centered = landmarks - center
+
+        # Scale by the mean MCP distance to their center
+        mcp_joints = centered[:, self.mcp_indices]
+        mcp_center = np.mean(mcp_joints, axis=1, keepdims=True)
+        scale = np.mean(np.linalg.norm(mcp_joints - mcp_center, axis=2), axis=1)
+        scale = np.where(scale < 1e-6, 1e-6, scale)
+        scaled = centered / scale[:, np.newaxis, np.newaxis]
+
+        # Align L9 (index MCP) upward
+        vec = scaled[:, 9]
+        reference = np.array([0, -1])
+        dot = vec @ reference
+        det = vec[:, 0] * reference[1] - vec[:, 1] * reference[0]
+        theta = np.arctan2(det, dot)
+
+        cos_t = np.cos(-theta)
+        sin_t = np.sin(-theta)
+        # R.T of rotate_hand_landmark for every hand, shape (N, 2, 2)
+        R_T = np.stack([
+            np.stack([cos_t, sin_t], axis=-1),
+            np.stack([-sin_t, cos_t], axis=-1)
+        ], axis=1)
+        rotated = scaled @ R_T
+
+        # Normalize to [-1, 1] range
+        max_val = np.max(np.abs(rotated), axis=(1, 2))
+        max_val = np.where(max_val > 0, max_val, 1)
+        return rotated / max_val[:, np.newaxis, np.newaxis]
@@ -5,9 +5,14 @@ import numpy as np
 from app.core.mediapipe_wrapper import MediaPipeWrapper
 
 class SequenceCleaner:
-  def __init__(self, target_len=15):
+  def __init__(self, target_len=15, mp: MediaPipeWrapper = None):
+    """
+    :param target_len: default number of key frames
+    :param mp: wrapper used for the hand position helpers. Pass the shared
+        detector to avoid creating another HandLandmarker.
+    """
     self.target_len = target_len
-    self.mp = MediaPipeWrapper()
+    self.mp = mp if mp is not None else MediaPipeWrapper()
 
   def remove_outliers(self, landmark_sequence: List[np.ndarray]) -> List[np.ndarray]:
     """
@@ -16,20 +21,8 @@ class SequenceCleaner:
     :param landmark_sequence: initial landmark sequence
     :return: reduced sequence
     """
-    positions = []
-    for i in range(len(landmark_sequence)):
-        positions.append(self.mp.hands_spacial_position(landmark_sequence[i]))
-
-    non_outliers = [landmark_sequence[0]]
-    for i in range(1, len(landmark_sequence) - 1):
-        if min(self._distance(positions[i-1], positions[i]), self._distance(positions[i], positions[i+1])) > \
-                self._distance(positions[i-1], positions[i+1]):
-            # outlier
-            continue
-        non_outliers.append(landmark_sequence[i])
-
-    non_outliers.append(landmark_sequence[-1])
-    return non_outliers
+    positions = self._positions(np.asarray(landmark_sequence))
+    return [landmark_sequence[i] for i in self._non_outlier_indices(positions)]
 
   def extract_key_frames_dual_hand(
       self,
@@ -40,56 +33,229 @@ class SequenceCleaner:
       """
       Extracts key frames based on combined motion of both hands.
       Ensures that left and right hand sequences stay temporally aligned.
+      The whole sequence is processed as one (num_frames, 42, 3) array.
       """
-      full_sequence = []
+      sequence = self._combine_hands(frame_landmarks, frame_handedness)
 
-      for i in range(len(frame_landmarks)):
-          landmarks = frame_landmarks[i]
-          handedness = frame_handedness[i]
+      # Hand positions are computed once and reused for outliers and displacements
+      positions = self._positions(sequence)
 
-          # Initialize placeholders for left and right hand landmarks
-          left_hand = np.zeros((21, 3))
-          right_hand = np.zeros((21, 3))
+      # Remove outliers based on combined motion
+      positions = positions[self._non_outlier_indices(positions)]
 
-          for h_index, hand_label in enumerate(handedness):
-              if hand_label == -1:
-                  continue  # Skip if hand not detected
-              if hand_label == 0:
-                  left_hand = landmarks[h_index]
-              elif hand_label == 1:
-                  right_hand = landmarks[h_index]
+      # Compute displacements
+      displacements = np.concatenate([[0.0], _pair_distances(positions[:-1], positions[1:])])
 
-          # Concatenate left and right hand landmarks
-          combined = np.concatenate([left_hand, right_hand], axis=0)
-          full_sequence.append(combined)
+      return _select_key_frames(displacements, target_len)
 
-      # Remove outliers based on combined motion
-      full_sequence = self.remove_outliers(full_sequence)
+  def online(self, target_len: int = None, interval: float = None) -> "OnlineKeyframeExtractor":
+      """
+      Creates an incremental key frame extractor that takes one frame at a time.
 
-      # Compute displacements
-      displacements: List[float] = [0]
-      last_pos = self.mp.hands_spacial_position(full_sequence[0])
-      for i in range(1, len(full_sequence)):
-          pos = self.mp.hands_spacial_position(full_sequence[i])
-          displacements.append(self._distance(last_pos, pos))
-          last_pos = pos.copy()
+      :param target_len: number of key frames, defaults to self.target_len
+      :param interval: displacement between key frames, if known in advance.
+          Key frames are then emitted while frames are pushed.
+      :return: OnlineKeyframeExtractor
+      """
+      return OnlineKeyframeExtractor(self, target_len or self.target_len, interval)
 
-      total = sum(displacements)
-      interval = total / (target_len - 1)
-      running_sum = 0
-      key_frames: List[int] = [0]
+  def _combine_hands(self, frame_landmarks: List[np.ndarray], frame_handedness: List[np.ndarray]) -> np.ndarray:
+      """
+      Places the left and right hand landmarks of every frame in fixed slots.
 
-      for i in range(1, len(full_sequence)):
-          running_sum += displacements[i]
-          if running_sum >= interval:
-              key_frames.append(i)
-              running_sum = 0
+      :param frame_landmarks: (num_frames, num_hands, 21, 3) landmarks
+      :param frame_handedness: (num_frames, num_hands) values: 0 (left), 1 (right), -1 (not detected)
+      :return: (num_frames, 42, 3) left hand followed by right hand, zeros for a missing hand
+      """
+      landmarks = np.asarray(frame_landmarks, dtype=np.float64).reshape(len(frame_landmarks), -1, 21, 3)
+      handedness = np.asarray(frame_handedness).reshape(len(frame_handedness), -1)
 
-      if len(key_frames) < target_len:
-          key_frames.append(len(full_sequence) - 1)
+      combined = np.zeros((len(landmarks), 2, 21, 3))
+      # Hands are visited in order, so a later hand with the same label wins
+      for h_index in range(handedness.shape[1]):
+          for slot in (0, 1):
+              mask = handedness[:, h_index] == slot
+              combined[mask, slot] = landmarks[mask, h_index]
 
-      return key_frames
+      return combined.reshape(len(landmarks), 42, 3)
 
+  def _positions(self, sequence: np.ndarray) -> np.ndarray:
+      """
+      :param sequence: (num_frames, 42, 3) combined landmarks
+      :return: (num_frames, 2, 3) position of each hand slot
+      """
+      return self.mp.hands_spacial_position(sequence).reshape(len(sequence), -1, 3)
+
+  def _non_outlier_indices(self, positions: np.ndarray) -> np.ndarray:
+      """
+      Vectorized outlier test of remove_outliers. The first and last frames
+      are always kept, a single frame is therefore returned twice.
+
+      :param positions: (num_frames, 2, 3) hand positions
+      :return: indices of the frames that are not outliers
+      """
+      step = _pair_distances(positions[:-1], positions[1:])
+      skip = _pair_distances(positions[:-2], positions[2:])
+      inner = np.flatnonzero(np.minimum(step[:-1], step[1:]) <= skip) + 1
+      return np.concatenate([[0], inner, [len(positions) - 1]])
 
   def _distance(self, pos1, pos2):
-      return np.linalg.norm(pos1 - pos2)
+      return _pair_distances(pos1[np.newaxis], pos2[np.newaxis])[0]
+
+
+def _pair_distances(pos1: np.ndarray, pos2: np.ndarray) -> np.ndarray:
+  """
+  Row-wise euclidean distance between two stacks of hand positions.
+  SequenceCleaner._distance goes through here as well, so the batch and
+  online extractors compare exactly the same values.
+
+  The squared norms are one dot product per row, like the np.linalg.norm of
+  the original loop. A vector-vector matmul runs the same dot kernel, so the
+  distances and the running_sum >= interval ties are bit-identical to it,
+  which np.sum(diff * diff) is not.
+
+  :param pos1: (n, ...) positions
+  :param pos2: (n, ...) positions
+  :return: (n,) distances
+  """
+  diff = pos1 - pos2
+  diff = diff.reshape(len(diff), int(np.prod(diff.shape[1:])))
+  return np.sqrt(np.matmul(diff[:, np.newaxis, :], diff[:, :, np.newaxis])[:, 0, 0])
+
+
+def _select_key_frames(displacements: np.ndarray, target_len: int) -> List[int]:
+  """
+  Picks a key frame every time the accumulated displacement reaches an
+  equal share of the total displacement.
+
+  The running sum restarts at every key frame, so each segment is one
+  sequential np.add.accumulate instead of a Python loop over frames.
+
+  :param displacements: displacement of every frame from the previous one, 0 for the first
+  :param target_len: number of key frames
+  :return: indices of the key frames
+  """
+  displacements = np.asarray(displacements, dtype=np.float64)
+  count = len(displacements)
+  interval = np.add.accumulate(displacements)[-1] / (target_len - 1)
+
+  if interval <= 0:
+      # No motion, every frame reaches the threshold
+      key_frames = list(range(count))
+  else:
+      key_frames = [0]
+      start = 0
+      while start < count - 1:
+          running_sum = np.add.accumulate(displacements[start + 1:])
+          reached = np.flatnonzero(running_sum >= interval)
+          if len(reached) == 0:
+              break
+          start += int(reached[0]) + 1
+          key_frames.append(start)
+
+  if len(key_frames) < target_len:
+      key_frames.append(count - 1)
+
+  return key_frames
+
+
+class OnlineKeyframeExtractor:
+  """
+  Incremental version of SequenceCleaner.extract_key_frames_dual_hand.
+
+  Frames are pushed one at a time as they are decoded. Only the hand positions
+  of the last two frames are buffered for the outlier test, plus one
+  displacement value per kept frame, never the landmarks themselves.
+  finalize() returns the same key frames as the batch version for the same input.
+
+  When the interval between key frames is known in advance, push() also
+  returns key frames as soon as they are confirmed, with O(1) memory.
+  """
+
+  def __init__(self, cleaner: SequenceCleaner, target_len: int, interval: float = None):
+    """
+    :param cleaner: SequenceCleaner providing the hand positions and distances
+    :param target_len: number of key frames
+    :param interval: displacement between key frames, if known in advance
+    """
+    self.cleaner = cleaner
+    self.target_len = target_len
+    self.interval = interval
+
+    self.frame_count = 0
+    # Original index of every frame that survived outlier removal
+    self.kept_frame_indices: List[int] = []
+    self.key_frames: List[int] = []
+
+    self._positions = []  # positions of the last two pushed frames
+    self._last_kept_pos = None
+    self._displacements: List[float] = []
+    self._running_sum = 0
+
+  def push(self, landmarks: np.ndarray, handedness: np.ndarray) -> List[int]:
+    """
+    Adds the next frame.
+
+    :param landmarks: (num_hands, 21, 3) landmarks of the frame
+    :param handedness: (num_hands,) values: 0 (left), 1 (right), -1 (not detected)
+    :return: key frames confirmed by this frame, only with a fixed interval
+    """
+    combined = self.cleaner._combine_hands([landmarks], [handedness])
+    position = self.cleaner._positions(combined)[0]
+    index = self.frame_count
+    self.frame_count += 1
+
+    emitted = []
+    if index == 0:
+        # The first frame is always kept
+        emitted = self._keep(0, position)
+    elif index >= 2:
+        # The previous frame has both neighbours now, run the outlier test on it
+        before, middle = self._positions
+        distance = self.cleaner._distance
+        if min(distance(before, middle), distance(middle, position)) <= distance(before, position):
+            emitted = self._keep(index - 1, middle)
+
+    self._positions = (self._positions + [position])[-2:]
+    return emitted
+
+  def finalize(self) -> List[int]:
+    """
+    Closes the sequence and returns all key frames, indexed like the
+    outlier-free sequence of extract_key_frames_dual_hand.
+    """
+    if self.frame_count == 0:
+        raise ValueError("No frames were pushed.")
+
+    # The last frame is always kept
+    self._keep(self.frame_count - 1, self._positions[-1])
+
+    if self.interval is None:
+        self.key_frames = _select_key_frames(np.array(self._displacements), self.target_len)
+    elif len(self.key_frames) < self.target_len:
+        self.key_frames.append(len(self.kept_frame_indices) - 1)
+    return self.key_frames
+
+  def _keep(self, frame_index: int, position: np.ndarray) -> List[int]:
+    if self._last_kept_pos is None:
+        displacement = 0
+    else:
+        displacement = self.cleaner._distance(self._last_kept_pos, position)
+    self._last_kept_pos = position.copy()
+    self.kept_frame_indices.append(frame_index)
+
+    if self.interval is None:
+        self._displacements.append(displacement)
+        return []
+
+    # Fixed interval: run the key frame selection on the fly
+    kept_index = len(self.kept_frame_indices) - 1
+    if kept_index == 0:
+        self.key_frames.append(0)
+        return [0]
+    self._running_sum += displacement
+    if self._running_sum >= self.interval:
+        self.key_frames.append(kept_index)
+        self._running_sum = 0
+        return [kept_index]
+    return []
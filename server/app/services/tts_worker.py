@@ -0,0 +1,374 @@
+"""
+Text-to-speech in a dedicated process, so API workers never import torch or
+transformers and a synthesis never blocks them.
+
+The worker loads the TTS model once and serves any number of connections.
+Requests from all of them go to one queue. Requests that arrive within
+batch_window_ms of each other are synthesized in one padded forward pass.
+
+In production one worker is shared by all API workers, so the model is in
+memory once. It is started on its own:
+    TTS_WORKER_AUTHKEY=... python -m app.services.tts_worker --address 127.0.0.1:8765
+with TTS_WORKER_ADDRESS=127.0.0.1:8765 and the same TTS_WORKER_AUTHKEY in the
+API settings. Without an address every API worker starts a private worker
+process on its first synthesis, which is only meant for development. It
+exits when the pipe to its API worker closes, even if that worker was killed.
+"""
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, List, Optional, Tuple, Union
+
+Address = Union[str, Tuple[str, int]]
+
+
+def parse_address(address: str) -> Address:
+    """
+    "host:port" for TCP, anything else is a Unix socket path.
+    """
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return host, int(port)
+    return address
+
+
+class _Requests:
+    """
+    The queue of the worker: (connection, request id, text) of every connection,
+    and None whenever a connection closes.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.send_locks: Dict[int, threading.Lock] = {}
+
+    def open(self, connection: Connection):
+        # Registered before its reader starts, so open_connections never misses it
+        self.send_locks[id(connection)] = threading.Lock()
+
+    @property
+    def open_connections(self) -> int:
+        return len(self.send_locks)
+
+    def read(self, connection: Connection, revision: str):
+        try:
+            connection.send(("hello", revision))
+            while True:
+                request_id, text = connection.recv()
+                self.queue.put((connection, request_id, text))
+        except (EOFError, OSError):
+            # The client went away, replies still queued for it are dropped in reply()
+            self.send_locks.pop(id(connection), None)
+            # Wakes the serve loop, which may have to exit
+            self.queue.put(None)
+
+    def next_batch(self, max_batch_size: int, window_ms: float) -> list:
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + window_ms / 1000
+        while len(batch) < max_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def reply(self, connection: Connection, request_id: int, audio: Optional[bytes], error: Optional[str]):
+        lock = self.send_locks.get(id(connection))
+        if lock is None:
+            return
+        with lock:
+            try:
+                connection.send((request_id, audio, error))
+            except (EOFError, OSError):
+                pass
+
+
+def serve(
+    connections: List[Connection] = (),
+    address: Optional[Address] = None,
+    authkey: Optional[bytes] = None,
+    max_batch_size: int = 8,
+    batch_window_ms: float = 10.0,
+):
+    """
+    Serves the given connections and, with an address, every client that
+    connects to it. With an address it runs until the process is stopped,
+    without one it returns once all the given connections are closed.
+    """
+    # The only place the TTS model and torch are imported
+    from app.utils import audio_generator
+
+    revision = audio_generator.model_revision()
+    requests = _Requests()
+
+    def start_reader(connection):
+        requests.open(connection)
+        threading.Thread(target=requests.read, args=(connection, revision), daemon=True).start()
+
+    for connection in connections:
+        start_reader(connection)
+
+    if address is not None:
+        listener = Listener(address, authkey=authkey)
+        print(f"TTS worker listening on {listener.address}")
+
+        def accept():
+            while True:
+                try:
+                    start_reader(listener.accept())
+                except (OSError, EOFError, multiprocessing.AuthenticationError):
+                    continue
+
+        threading.Thread(target=accept, daemon=True).start()
+
+    while True:
+        batch = requests.next_batch(max_batch_size, batch_window_ms)
+        if address is None and requests.open_connections == 0:
+            return
+        batch = [request for request in batch if request is not None]
+        if not batch:
+            continue
+        texts = [text for _, _, text in batch]
+        try:
+            results = [(audio, None) for audio in audio_generator.synthesize_wav_batch(texts)]
+        except Exception as exc:
+            # One bad text must not fail the whole batch, retry them one by one
+            if len(batch) == 1:
+                results = [(None, f"{type(exc).__name__}: {exc}")]
+            else:
+                results = []
+                for text in texts:
+                    try:
+                        results.append((audio_generator.synthesize_wav(text), None))
+                    except Exception as text_exc:
+                        results.append((None, f"{type(text_exc).__name__}: {text_exc}"))
+        for (connection, request_id, _), (audio, error) in zip(batch, results):
+            requests.reply(connection, request_id, audio, error)
+
+
+def _serve_private(connection: Connection, max_batch_size: int, batch_window_ms: float):
+    serve([connection], max_batch_size=max_batch_size, batch_window_ms=batch_window_ms)
+
+
+class TTSWorkerError(RuntimeError):
+    """
+    Raised when the worker failed to synthesize a text or is no longer reachable.
+    """
+
+
+class TTSClient:
+    """
+    Thread-safe client of a TTS worker. synthesize() blocks the calling
+    thread only, concurrent calls are batched by the worker.
+    """
+
+    def __init__(
+        self,
+        address: Optional[str] = None,
+        authkey: Optional[bytes] = None,
+        max_batch_size: int = 8,
+        batch_window_ms: float = 10.0,
+        timeout: float = 120.0,
+    ):
+        """
+        Nothing is started or connected until the first synthesis, see start().
+
+        Args:
+            address: "host:port" or socket path of a running worker, None to start a private one.
+            authkey: shared secret of the worker connection, required with an address.
+            max_batch_size, batch_window_ms: batching of a private worker.
+            timeout: seconds to wait for the worker, at startup and per synthesis.
+        """
+        if address is not None and not authkey:
+            raise ValueError("Connecting to a shared TTS worker needs an authkey")
+        self.address = address
+        self.authkey = authkey
+        self.max_batch_size = max_batch_size
+        self.batch_window_ms = batch_window_ms
+        self.timeout = timeout
+        self.process = None
+        self.connection = None
+        self._revision = None
+
+        self._ids = itertools.count()
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._closed = False
+        self.requests = 0
+
+    @property
+    def revision(self) -> str:
+        """
+        Revision of the worker's model. Starts the worker if needed.
+        """
+        self.start()
+        return self._revision
+
+    def start(self):
+        """
+        Starts the private worker or connects to the shared one, once, and
+        waits for its greeting. Blocking, called by the first synthesis.
+
+        Raises:
+            TTSWorkerError: if the worker can not be reached or does not greet within timeout.
+        """
+        with self._start_lock:
+            if self.connection is not None:
+                return
+            if self._closed:
+                raise TTSWorkerError("The TTS worker is not running")
+            try:
+                connection = self._open()
+            except (OSError, multiprocessing.AuthenticationError) as exc:
+                raise TTSWorkerError(f"The TTS worker is not reachable: {exc}") from exc
+            try:
+                # The worker loads its model before it greets
+                if not connection.poll(self.timeout):
+                    raise TTSWorkerError(f"The TTS worker did not start within {self.timeout}s")
+                try:
+                    _, self._revision = connection.recv()
+                except (EOFError, OSError) as exc:
+                    raise TTSWorkerError("The TTS worker exited while starting") from exc
+                with self._lock:
+                    if self._closed:
+                        raise TTSWorkerError("The TTS worker is not running")
+                    self.connection = connection
+            except BaseException:
+                connection.close()
+                self._stop_process()
+                raise
+            threading.Thread(target=self._read_replies, name="tts-client", daemon=True).start()
+
+    def _open(self) -> Connection:
+        if self.address is not None:
+            return Client(parse_address(self.address), authkey=self.authkey)
+        connection, worker_connection = multiprocessing.Pipe()
+        # Spawn, forking a process that already loaded TensorFlow or MediaPipe is unsafe
+        self.process = multiprocessing.get_context("spawn").Process(
+            target=_serve_private,
+            args=(worker_connection, self.max_batch_size, self.batch_window_ms),
+            name="tts-worker",
+            daemon=True,
+        )
+        self.process.start()
+        worker_connection.close()
+        return connection
+
+    def synthesize(self, text: str) -> bytes:
+        return self.synthesize_many([text])[0]
+
+    def synthesize_many(self, texts: List[str]) -> List[bytes]:
+        # Submitted together, so the worker can put them in the same batches
+        futures = [self.submit(text) for text in texts]
+        deadline = time.monotonic() + self.timeout
+        try:
+            return [future.result(max(0.0, deadline - time.monotonic())) for future in futures]
+        except FutureTimeoutError:
+            raise TTSWorkerError(f"The TTS worker did not answer within {self.timeout}s") from None
+        finally:
+            # Cancelling drops the requests from _pending, a late reply is ignored
+            for future in futures:
+                future.cancel()
+
+    def submit(self, text: str) -> Future:
+        """
+        Sends text to the worker. The future resolves to its WAV bytes, or
+        raises TTSWorkerError. Cancel it to give up waiting.
+        """
+        self.start()
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise TTSWorkerError("The TTS worker is not running")
+            request_id = next(self._ids)
+            self._pending[request_id] = future
+            self.requests += 1
+            try:
+                self.connection.send((request_id, text))
+            except (EOFError, OSError) as exc:
+                self._pending.pop(request_id)
+                raise TTSWorkerError("The TTS worker is not running") from exc
+        future.add_done_callback(lambda done: self._forget(request_id) if done.cancelled() else None)
+        return future
+
+    def describe(self) -> dict:
+        return {
+            "revision": self._revision,
+            "private_process": self.address is None,
+            "started": self.connection is not None,
+            "alive": self.connection is not None and not self._closed,
+            "pending": len(self._pending),
+            "requests": self.requests,
+        }
+
+    def close(self):
+        # Not under _start_lock, a start() waiting for the worker ends when the process is terminated
+        with self._lock:
+            self._closed = True
+        if self.connection is not None:
+            self.connection.close()
+        self._stop_process()
+
+    def _stop_process(self):
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join(timeout=5)
+
+    def _forget(self, request_id: int):
+        with self._lock:
+            self._pending.pop(request_id, None)
+
+    @staticmethod
+    def _resolve(future: Future, audio: Optional[bytes], error: Optional[str]):
+        # The future may have been cancelled since it was popped
+        try:
+            if error is None:
+                future.set_result(audio)
+            else:
+                future.set_exception(TTSWorkerError(error))
+        except InvalidStateError:
+            pass
+
+    def _read_replies(self):
+        try:
+            while True:
+                request_id, audio, error = self.connection.recv()
+                with self._lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    self._resolve(future, audio, error)
+        # TypeError when close() closed the connection under a blocked recv()
+        except (EOFError, OSError, TypeError):
+            with self._lock:
+                self._closed = True
+                pending, self._pending = self._pending, {}
+            for future in pending.values():
+                self._resolve(future, None, "The TTS worker exited")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from app.config import settings
+
+    parser = argparse.ArgumentParser(description="Runs a TTS worker shared by several API workers.")
+    parser.add_argument("--address", default=settings.TTS_WORKER_ADDRESS or "127.0.0.1:8765")
+    parser.add_argument("--max-batch", type=int, default=settings.TTS_BATCH_MAX_SIZE)
+    parser.add_argument("--window-ms", type=float, default=settings.TTS_BATCH_WINDOW_MS)
+    args = parser.parse_args()
+    if not settings.TTS_WORKER_AUTHKEY:
+        # Requests are pickled, an unauthenticated listener would run anything sent to it
+        parser.error("TTS_WORKER_AUTHKEY must be set")
+
+    serve(
+        address=parse_address(args.address),
+        authkey=settings.TTS_WORKER_AUTHKEY.encode("utf-8"),
+        max_batch_size=args.max_batch,
+        batch_window_ms=args.window_ms,
+    )
@@ -0,0 +1,78 @@
+import io
+import cv2
+from typing import BinaryIO, Dict
+
+from app.config import settings
+from app.core.mediapipe_wrapper import MediaPipeWrapper
+from app.core.preprocess import iter_frames_from_capture
+from app.core.trajectory import GeneralDirectionBuilder
+from app.core.video_source import open_video_capture
+from app.services.sequence_cleaner import SequenceCleaner
+from app.utils.helpers import load_one_sample_with_keyframes_from_frames
+
+
+def extract_video_sample(
+    fileobj: BinaryIO,
+    filename: str,
+    wrapper: MediaPipeWrapper,
+    cleaner: SequenceCleaner,
+    builder: GeneralDirectionBuilder,
+) -> Dict[str, object]:
+    """
+    Decodes an uploaded video and extracts its keyframe landmarks and trajectory.
+    Blocking, meant to run on an executor.
+
+    Args:
+        fileobj: seekable binary file object holding the upload.
+        filename: client filename, only used for its extension.
+        wrapper: MediaPipe wrapper instance.
+        cleaner: SequenceCleaner instance for keyframe extraction.
+        builder: GeneralDirectionBuilder for trajectory computation.
+    Returns:
+        dict with 'landmark' and 'trajectory', see load_one_sample_with_keyframes_from_frames.
+    """
+    # Decode straight from the upload buffer, falling back to a unique scratch file
+    with open_video_capture(
+        fileobj,
+        filename=filename,
+        max_bytes=settings.VIDEO_MAX_UPLOAD_BYTES,
+        max_scratch_bytes=settings.VIDEO_MAX_SCRATCH_BYTES,
+        scratch_dir=settings.VIDEO_SCRATCH_DIR,
+    ) as cap:
+        # Decode frames lazily, only the current frame is held in memory
+        frames = iter_frames_from_capture(
+            cap,
+            frame_stride=settings.VIDEO_FRAME_STRIDE,
+            max_frames=settings.VIDEO_MAX_FRAMES,
+            max_duration=settings.VIDEO_MAX_SECONDS,
+            max_side=settings.VIDEO_MAX_SIDE,
+        )
+        # The stride thins the frame rate seen by the VIDEO mode tracker
+        fps = (cap.get(cv2.CAP_PROP_FPS) or 30.0) / max(1, settings.VIDEO_FRAME_STRIDE)
+        return load_one_sample_with_keyframes_from_frames(
+            frames, wrapper, cleaner, builder,
+            video_mode=settings.VIDEO_RUNNING_MODE == "video",
+            fps=fps,
+        )
+
+
+# Per-process components of the optional process pool, see init_process_worker
+_worker_components = None
+
+
+def init_process_worker():
+    """
+    Process pool initializer: every worker process builds its own detector once.
+    """
+    global _worker_components
+    wrapper = MediaPipeWrapper()
+    _worker_components = (wrapper, SequenceCleaner(mp=wrapper), GeneralDirectionBuilder())
+
+
+def extract_video_sample_in_process(data: bytes, filename: str) -> Dict[str, object]:
+    """
+    Process pool entry point of extract_video_sample. The upload is sent as bytes
+    because file objects can not be pickled.
+    """
+    wrapper, cleaner, builder = _worker_components
+    return extract_video_sample(io.BytesIO(data), filename, wrapper, cleaner, builder)
@@ -5,60 +5,120 @@ import scipy.io.wavfile
 import io
 import base64
 import subprocess
+import threading
+from typing import List
+
+MODEL_NAME = "facebook/mms-tts-amh"
 
 # Load model and tokenizer once (outside the function for efficiency)
-model = VitsModel.from_pretrained("facebook/mms-tts-amh")
-tokenizer = AutoTokenizer.from_pretrained("facebook/mms-tts-amh")
+model = VitsModel.from_pretrained(MODEL_NAME)
+tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+model.eval()
 
-def generate_base64_audio(text: str) -> str:
+# The model is shared by every request thread, one forward pass at a time
+_model_lock = threading.Lock()
+
+
+def model_revision() -> str:
     """
-    Converts Amharic text to base64-encoded WAV audio.
+    Identifies the loaded weights, part of every audio cache key.
+    The commit hash of the downloaded snapshot when known, the model name otherwise.
+    """
+    return f"{MODEL_NAME}@{getattr(model.config, '_commit_hash', None) or 'local'}"
 
-    Args:
-        text (str): Amharic text to convert.
 
-    Returns:
-        str: Base64-encoded audio.
+class Uromanizer:
+    """
+    Romanizes Amharic text for the MMS tokenizer.
+
+    Uses the uroman Python package in process when it is installed. Otherwise
+    falls back to the uroman command, with a single process for a whole
+    list of texts instead of one per text.
     """
-    
-    # Function to romanize Amharic using uroman
-    def uromanize_text(text: str) -> str:
-        process = subprocess.Popen(
+
+    def __init__(self):
+        try:
+            import uroman
+            self._uroman = uroman.Uroman()
+        except ImportError:
+            self._uroman = None
+
+    def romanize(self, texts: List[str]) -> List[str]:
+        if self._uroman is not None:
+            return [self._uroman.romanize_string(text).strip() for text in texts]
+
+        # uroman reads and writes one line per text
+        lines = [" ".join(text.splitlines()) for text in texts]
+        process = subprocess.run(
             ["uroman"],
-            stdin=subprocess.PIPE,
+            input="\n".join(lines).encode("utf-8"),
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stderr=subprocess.PIPE,
         )
-        # Encode input manually as UTF-8
-        romanized_text, err = process.communicate(input=text.encode('utf-8'))
         if process.returncode != 0:
-            raise RuntimeError(f"Uroman failed: {err.decode('utf-8')}")
-        return romanized_text.decode('utf-8').strip()
+            raise RuntimeError(f"Uroman failed: {process.stderr.decode('utf-8')}")
+        romanized = process.stdout.decode("utf-8").splitlines()
+        if len(romanized) != len(texts):
+            raise RuntimeError(f"Uroman returned {len(romanized)} lines for {len(texts)} texts")
+        return [line.strip() for line in romanized]
 
-    # Load model and tokenizer
-    model = VitsModel.from_pretrained("facebook/mms-tts-amh")
-    tokenizer = AutoTokenizer.from_pretrained("facebook/mms-tts-amh")
 
-    # Input Amharic text
-    # text = "ምክንያት"
+uromanizer = Uromanizer()
 
-    # Romanize the text
-    romanized_text = uromanize_text(text)
-
-    # Tokenize input
-    inputs = tokenizer(romanized_text, return_tensors="pt")
-
-    # Generate waveform
-    with torch.no_grad():
-        output = model(**inputs).waveform.squeeze()
 
+def _to_wav(waveform: np.ndarray) -> bytes:
     # Convert to int16 PCM format
-    output_int16 = (output.numpy() * 32767).astype(np.int16)
-    # Save to buffer
+    output_int16 = (waveform * 32767).astype(np.int16)
     buffer = io.BytesIO()
     scipy.io.wavfile.write(buffer, rate=int(model.config.sampling_rate), data=output_int16)
-    buffer.seek(0)
+    return buffer.getvalue()
+
 
-    # Encode to base64
-    base64_audio = base64.b64encode(buffer.read()).decode("utf-8")
-    return base64_audio
+def synthesize_wav_batch(texts: List[str]) -> List[bytes]:
+    """
+    Converts several Amharic texts to WAV bytes with one padded forward pass.
+
+    Args:
+        texts (List[str]): Amharic texts to convert.
+
+    Returns:
+        List[bytes]: one WAV file per text, trimmed to its own length.
+    """
+    if not texts:
+        return []
+    romanized_texts = uromanizer.romanize(texts)
+    inputs = tokenizer(romanized_texts, padding=True, return_tensors="pt")
+
+    # Generate waveforms, padded to the longest one
+    with _model_lock, torch.no_grad():
+        output = model(**inputs)
+
+    waveforms = output.waveform.numpy()
+    lengths = output.sequence_lengths.numpy()
+    return [_to_wav(waveform[:length]) for waveform, length in zip(waveforms, lengths)]
+
+
+def synthesize_wav(text: str) -> bytes:
+    """
+    Converts Amharic text to WAV bytes (16-bit PCM).
+
+    Args:
+        text (str): Amharic text to convert.
+
+    Returns:
+        bytes: the WAV file.
+    """
+    return synthesize_wav_batch([text])[0]
+
+
+def generate_base64_audio(text: str) -> str:
+    """
+    Converts Amharic text to base64-encoded WAV audio.
+
+    Args:
+        text (str): Amharic text to convert.
+
+    Returns:
+        str: Base64-encoded audio.
+    """
+    return base64.b64encode(synthesize_wav(text)).decode("utf-8")
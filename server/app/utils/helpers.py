@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, Iterable, List
 import numpy as np
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
@@ -31,24 +31,154 @@ def combine_landmarks_and_trajectory(landmarks: np.ndarray, trajectories: dict)
     return np.array(combined)
 
 
+def frame_landmarks_from_result(mp_result, wrapper):
+    """
+    Converts the detection result of one frame into landmark arrays.
+
+    Parameters:
+        mp_result: HandLandmarkerResult of the frame.
+        wrapper: MediaPipe wrapper instance.
+
+    Returns:
+        tuple: (hand_landmarks (2, 21, 3), sorted world landmarks (2, 21, 3), handedness (2,)),
+        or None if no hand was detected.
+    """
+    if not mp_result.hand_landmarks or not mp_result.hand_world_landmarks:
+        return None
+
+    raw_landmark = wrapper.get_landmarks_from_hands(mp_result.hand_landmarks)
+    hand_landmarks = raw_landmark.reshape(wrapper.num_hands, 21, 3)
+    handedness = wrapper.get_handedness(mp_result)
+
+    raw_world = wrapper.get_landmarks_from_hands(mp_result.hand_world_landmarks)
+    sorted_world = np.zeros((wrapper.num_hands, 21, 3), dtype=np.float32)
+    for i, hand in enumerate(handedness):
+        if hand == 0:  # left
+            sorted_world[0] = raw_world[i * 21:(i + 1) * 21]
+        elif hand == 1:  # right
+            sorted_world[1] = raw_world[i * 21:(i + 1) * 21]
+
+    return hand_landmarks, sorted_world, handedness
+
+
+def frame_landmarks_from_arrays(hand_landmarks, world_landmarks, handedness, num_hands: int = 2):
+    """
+    Builds the same per-frame arrays as frame_landmarks_from_result from
+    landmarks that were detected by the client.
+
+    Parameters:
+        hand_landmarks: image landmarks of the detected hands, (n, 21, 3).
+        world_landmarks: world landmarks of the detected hands, (n, 21, 3).
+        handedness: label of every detected hand, 0 for left and 1 for right.
+        num_hands (int): Number of hand slots.
+
+    Returns:
+        tuple: (hand_landmarks (2, 21, 3), sorted world landmarks (2, 21, 3), handedness (2,)),
+        or None if no hand was detected.
+    """
+    hands = np.asarray(hand_landmarks, dtype=np.float64).reshape(-1, 21, 3)
+    world = np.asarray(world_landmarks, dtype=np.float32).reshape(-1, 21, 3)
+    labels = [int(label) for label in handedness]
+
+    detected = len(labels)
+    if detected == 0:
+        return None
+    if detected > num_hands or len(hands) != detected or len(world) != detected:
+        raise ValueError("hand_landmarks, world_landmarks and handedness must describe the same hands.")
+    if any(label not in (0, 1) for label in labels):
+        raise ValueError("handedness values must be 0 (left) or 1 (right).")
+
+    padded_hands = np.zeros((num_hands, 21, 3))
+    padded_hands[:detected] = hands
+
+    # Same convention as MediaPipeWrapper.get_handedness: a missing hand gets the opposite label
+    frame_handedness = np.full(num_hands, -1)
+    frame_handedness[:detected] = labels
+    if num_hands == 2 and detected == 1:
+        frame_handedness[1] = 1 - labels[0]
+
+    sorted_world = np.zeros((num_hands, 21, 3), dtype=np.float32)
+    for i, hand in enumerate(frame_handedness[:detected]):
+        if hand == 0:  # left
+            sorted_world[0] = world[i]
+        elif hand == 1:  # right
+            sorted_world[1] = world[i]
+
+    return padded_hands, sorted_world, frame_handedness
+
+
+def keyframe_sample_from_landmarks(
+    frame_hand_landmarks: List[np.ndarray],
+    frame_world_landmarks: List[np.ndarray],
+    frame_handedness: List[np.ndarray],
+    cleaner,
+    builder,
+    num_keyframes: int = 6,
+    key_frames: List[int] = None
+) -> Dict[str, object]:
+    """
+    Applies keyframe filtering to per-frame landmarks and computes the trajectory.
+
+    Parameters:
+        frame_hand_landmarks (List[np.ndarray]): Raw hand landmarks per frame, (2, 21, 3) each.
+        frame_world_landmarks (List[np.ndarray]): Sorted world landmarks per frame, (2, 21, 3) each.
+        frame_handedness (List[np.ndarray]): Handedness per frame, (2,) each.
+        cleaner: SequenceCleaner instance for keyframe extraction.
+        builder: GeneralDirectionBuilder for trajectory computation.
+        num_keyframes (int): Number of keyframes per sequence.
+        key_frames (List[int]): Keyframes already picked while the frames were
+            collected, see SequenceCleaner.online. Extracted here if not given.
+
+    Returns:
+        dict: Contains 'landmark' and 'trajectory'.
+    """
+    if len(frame_hand_landmarks) < num_keyframes:
+        raise ValueError("Not enough valid frames to extract keyframes.")
+
+    if key_frames is None:
+        key_frames = cleaner.extract_key_frames_dual_hand(
+            frame_hand_landmarks, frame_handedness, num_keyframes
+        )
+
+    filtered_world_landmarks = [frame_world_landmarks[i] for i in key_frames]
+    filtered_landmarks = [frame_hand_landmarks[i] for i in key_frames]
+    filtered_handedness = [frame_handedness[i] for i in key_frames]
+
+    trajectory = builder.make_trajectory(filtered_landmarks, filtered_handedness)
+
+    return {
+        "landmark": np.array(filtered_world_landmarks),   # (K, 2, 21, 3)
+        "trajectory": trajectory                           # {'left': (K-1, 3), 'right': (K-1, 3)}
+    }
+
+
 def load_one_sample_with_keyframes_from_frames(
-    frames: List[np.ndarray],
+    frames: Iterable[np.ndarray],
     wrapper,
     cleaner,
     builder,
-    num_keyframes: int = 6
+    num_keyframes: int = 6,
+    video_mode: bool = False,
+    fps: float = 30.0
 ) -> Dict[str, object]:
     """
     Processes a single sample (list of frames), extracts sorted world landmarks,
     computes trajectory, applies keyframe filtering, and returns a dictionary
     with 'landmark' and 'trajectory'.
 
+    Frames are consumed one at a time and only their landmarks are kept, so a
+    generator such as app.core.preprocess.iter_frames_from_video keeps memory
+    flat regardless of the video length.
+
     Parameters:
-        frames (List[np.ndarray]): List of frames (as images).
+        frames (Iterable[np.ndarray]): Frames (as images), e.g. a lazy decoder.
         wrapper: MediaPipe wrapper instance.
         cleaner: SequenceCleaner instance for keyframe extraction.
         builder: GeneralDirectionBuilder for trajectory computation.
         num_keyframes (int): Number of keyframes per sequence.
+        video_mode (bool): Track hands across frames with a VIDEO mode
+            HandLandmarker instead of detecting every frame from scratch.
+        fps (float): Frame rate of `frames`, used for the VIDEO mode timestamps.
 
     Returns:
         dict: Contains 'landmark' and 'trajectory'.
@@ -57,47 +187,47 @@ def load_one_sample_with_keyframes_from_frames(
     frame_world_landmarks = []    # Sorted world landmarks (model input)
     frame_handedness = []         # Handedness for sorting and trajectory
 
-    for image in frames:
-        if image is None:
-            continue
+    # Outlier removal and displacement sums run while the video is decoded
+    keyframe_extractor = cleaner.online(num_keyframes)
+    tracker = wrapper.video_tracker(fps) if video_mode else None
+    detect = tracker.process if tracker is not None else wrapper.process_from_image
 
-        mp_result = wrapper.process_from_image(image)
-
-        if not mp_result.hand_landmarks or not mp_result.hand_world_landmarks:
-            continue
+    try:
+        for image in frames:
+            if image is None:
+                continue
 
-        raw_landmark = wrapper.get_landmarks_from_hands(mp_result.hand_landmarks)
-        frame_hand_landmarks.append(raw_landmark.reshape(wrapper.num_hands, 21, 3))
-        handedness = wrapper.get_handedness(mp_result)
-        frame_handedness.append(handedness)
+            landmarks = frame_landmarks_from_result(detect(image), wrapper)
+            if landmarks is None:
+                continue
 
-        raw_world = wrapper.get_landmarks_from_hands(mp_result.hand_world_landmarks)
-        sorted_world = np.zeros((wrapper.num_hands, 21, 3), dtype=np.float32)
-        for i, hand in enumerate(handedness):
-            if hand == 0:  # left
-                sorted_world[0] = raw_world[i * 21:(i + 1) * 21]
-            elif hand == 1:  # right
-                sorted_world[1] = raw_world[i * 21:(i + 1) * 21]
-        frame_world_landmarks.append(sorted_world)
+            hand_landmarks, sorted_world, handedness = landmarks
+            frame_hand_landmarks.append(hand_landmarks)
+            frame_world_landmarks.append(sorted_world)
+            frame_handedness.append(handedness)
+            keyframe_extractor.push(hand_landmarks, handedness)
+    finally:
+        if tracker is not None:
+            tracker.close()
 
     if len(frame_hand_landmarks) < num_keyframes:
         raise ValueError("Not enough valid frames to extract keyframes.")
 
-    key_frames = cleaner.extract_key_frames_dual_hand(
-        frame_hand_landmarks, frame_handedness, num_keyframes
+    return keyframe_sample_from_landmarks(
+        frame_hand_landmarks, frame_world_landmarks, frame_handedness, cleaner, builder, num_keyframes,
+        key_frames=keyframe_extractor.finalize()
     )
 
-    filtered_world_landmarks = [frame_world_landmarks[i] for i in key_frames]
-    filtered_landmarks = [frame_hand_landmarks[i] for i in key_frames]
-    filtered_handedness = [frame_handedness[i] for i in key_frames]
 
-    trajectory = builder.make_trajectory(filtered_landmarks, filtered_handedness)
+def sample_to_model_input(sample: Dict[str, object], target_timesteps: int = 6) -> np.ndarray:
+    """
+    Pads the trajectory, appends it to the keyframe landmarks and pads the
+    time axis, giving the (6, 132) input of the video model.
+    """
+    trajectory = pad_trajectories(sample['trajectory'], target_timesteps)
+    combined = combine_landmarks_and_trajectory(sample['landmark'], trajectory)
+    return pad_single_sample(combined, target_timesteps)
 
-    return {
-        "landmark": np.array(filtered_world_landmarks),   # (K, 2, 21, 3)
-        "trajectory": trajectory                           # {'left': (K-1, 3), 'right': (K-1, 3)}
-    }
-    
 
 def pad_single_sample(x, target_timesteps=6):
     current_len = x.shape[0]
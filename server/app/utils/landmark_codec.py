@@ -0,0 +1,125 @@
+"""
+Compact binary encoding of hand landmarks detected on the client.
+
+Every message is a 12-byte little-endian header followed by the arrays:
+
+    magic     4s   b"LMK1"
+    kind      u8   1 = static, 2 = dynamic
+    dtype     u8   1 = float16, 2 = float32
+    reserved  u16  0
+    count     u32  hands (static) or frames (dynamic)
+
+static:  landmarks (count, 21, 2), image x and y of every hand
+dynamic: hand_landmarks (count, 2, 21, 3) image landmarks,
+         world_landmarks (count, 2, 21, 3),
+         handedness (count, 2) int8, 0 = left, 1 = right, -1 = empty slot
+
+A float16 static sign is 96 bytes and a 90-frame float16 sequence about 45 KB,
+instead of a full image or video upload.
+"""
+import struct
+from typing import Tuple
+
+import numpy as np
+
+MAGIC = b"LMK1"
+HEADER = struct.Struct("<4sBBHI")
+STATIC = 1
+DYNAMIC = 2
+DTYPES = {1: np.dtype("<f2"), 2: np.dtype("<f4")}
+DTYPE_CODES = {dtype: code for code, dtype in DTYPES.items()}
+MEDIA_TYPE = "application/x-landmarks"
+
+
+class LandmarkCodecError(ValueError):
+    """
+    Raised for a malformed landmark message.
+    """
+
+
+def _header(kind: int, dtype, count: int) -> bytes:
+    dtype = np.dtype(dtype).newbyteorder("<")
+    if dtype not in DTYPE_CODES:
+        raise LandmarkCodecError(f"Unsupported dtype {dtype}, use float16 or float32")
+    return HEADER.pack(MAGIC, kind, DTYPE_CODES[dtype], 0, count)
+
+
+def encode_static(landmarks: np.ndarray, dtype=np.float16) -> bytes:
+    """
+    Encodes (21, 2) or (N, 21, 2) landmarks.
+    """
+    landmarks = np.asarray(landmarks).reshape(-1, 21, 2)
+    return _header(STATIC, dtype, len(landmarks)) + landmarks.astype(np.dtype(dtype).newbyteorder("<")).tobytes()
+
+
+def encode_dynamic(hand_landmarks: np.ndarray, world_landmarks: np.ndarray, handedness: np.ndarray,
+                   dtype=np.float16) -> bytes:
+    """
+    Encodes a (T, 2, 21, 3) sequence of image and world landmarks and its (T, 2) handedness.
+    """
+    dtype = np.dtype(dtype).newbyteorder("<")
+    hand_landmarks = np.asarray(hand_landmarks).reshape(-1, 2, 21, 3)
+    world_landmarks = np.asarray(world_landmarks).reshape(-1, 2, 21, 3)
+    handedness = np.asarray(handedness).reshape(-1, 2)
+    if not len(hand_landmarks) == len(world_landmarks) == len(handedness):
+        raise LandmarkCodecError("hand_landmarks, world_landmarks and handedness must have the same frames")
+    return b"".join([
+        _header(DYNAMIC, dtype, len(hand_landmarks)),
+        hand_landmarks.astype(dtype).tobytes(),
+        world_landmarks.astype(dtype).tobytes(),
+        handedness.astype(np.int8).tobytes(),
+    ])
+
+
+def _read(data: bytes, kind: int, max_count: int) -> Tuple[np.dtype, int, memoryview]:
+    if len(data) < HEADER.size:
+        raise LandmarkCodecError("Message shorter than its header")
+    magic, message_kind, dtype_code, _, count = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise LandmarkCodecError("Not a landmark message")
+    if message_kind != kind:
+        raise LandmarkCodecError(f"Expected a {'static' if kind == STATIC else 'dynamic'} landmark message")
+    if dtype_code not in DTYPES:
+        raise LandmarkCodecError(f"Unknown dtype code {dtype_code}")
+    if count == 0 or count > max_count:
+        raise LandmarkCodecError(f"Expected 1 to {max_count} entries, got {count}")
+    return DTYPES[dtype_code], count, memoryview(data)[HEADER.size:]
+
+
+def _floats(payload: memoryview, offset: int, dtype: np.dtype, shape: tuple) -> np.ndarray:
+    # float32 for the models, float16 would lose precision in the normalization
+    values = np.frombuffer(payload, dtype=dtype, count=int(np.prod(shape)), offset=offset)
+    values = values.astype(np.float32).reshape(shape)
+    if not np.all(np.isfinite(values)):
+        raise LandmarkCodecError("Landmarks must be finite")
+    return values
+
+
+def decode_static(data: bytes, max_hands: int = 64) -> np.ndarray:
+    """
+    Returns the (N, 21, 2) float32 landmarks of a static message.
+    """
+    dtype, count, payload = _read(data, STATIC, max_hands)
+    shape = (count, 21, 2)
+    if len(payload) != int(np.prod(shape)) * dtype.itemsize:
+        raise LandmarkCodecError(f"Payload size does not match {count} hands of {dtype}")
+    return _floats(payload, 0, dtype, shape)
+
+
+def decode_dynamic(data: bytes, max_frames: int = 900) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns (hand_landmarks (T, 2, 21, 3), world_landmarks (T, 2, 21, 3), handedness (T, 2))
+    of a dynamic message, the landmarks as float32 and the handedness as int8.
+    """
+    dtype, count, payload = _read(data, DYNAMIC, max_frames)
+    shape = (count, 2, 21, 3)
+    landmark_bytes = int(np.prod(shape)) * dtype.itemsize
+    if len(payload) != 2 * landmark_bytes + count * 2:
+        raise LandmarkCodecError(f"Payload size does not match {count} frames of {dtype}")
+
+    hand_landmarks = _floats(payload, 0, dtype, shape)
+    world_landmarks = _floats(payload, landmark_bytes, dtype, shape)
+    handedness = np.frombuffer(payload, dtype=np.int8, offset=2 * landmark_bytes).reshape(count, 2)
+    if not np.all(np.isin(handedness, (-1, 0, 1))):
+        raise LandmarkCodecError("handedness values must be 0 (left), 1 (right) or -1 (empty slot)")
+    return hand_landmarks, world_landmarks, handedness
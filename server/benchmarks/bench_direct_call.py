@@ -0,0 +1,60 @@
+"""
+Single-sample latency of the Keras models through model.predict against the
+compiled direct-call path of app.core.inference.KerasBackend.
+
+Run from the server directory:
+    python -m benchmarks.bench_direct_call --repeats 500
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.inference import load_backend
+
+MODELS = {
+    "static": "ml_models/model.keras",   # (None, 21, 2)
+    "video": "ml_models/video_model.keras",  # (None, 6, 132)
+}
+
+
+def latencies_ms(predict, sample, repeats):
+    predict(sample)  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(sample)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=1)
+    args = parser.parse_args()
+
+    for name, path in MODELS.items():
+        backend = load_backend(path, "keras", direct_call=True)
+        sample = np.random.default_rng(0).normal(
+            size=(args.batch_size, *backend.input_signature.shape[1:])
+        ).astype(np.float32)
+
+        results = {
+            "model.predict": latencies_ms(
+                lambda batch: backend.model.predict(batch, batch_size=len(batch), verbose=0), sample, args.repeats
+            ),
+            "direct call": latencies_ms(backend.predict, sample, args.repeats),
+        }
+        if not np.allclose(backend.predict(sample), backend.model.predict(sample, verbose=0), atol=1e-5):
+            raise AssertionError(f"The direct call of the {name} model differs from model.predict")
+
+        print(f"{name} model {tuple(backend.input_signature.shape)}, batch {args.batch_size}")
+        baseline = np.percentile(results["model.predict"], 50)
+        for variant, timings in results.items():
+            p50, p99 = np.percentile(timings, 50), np.percentile(timings, 99)
+            print(f"{variant:>16}: p50 {p50:7.3f} ms  p99 {p99:7.3f} ms  x{baseline / p50:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Latency, memory and top-1 agreement of the inference backends of
+app.core.inference against the Keras reference.
+
+Export the models first, then run from the server directory:
+    python -m tools.export_models ml_models/model.keras ml_models/video_model.keras --onnx \
+        --int8 --calibration static_calibration.npy video_calibration.npy
+    python -m benchmarks.bench_inference_backends --model ml_models/model.keras --inputs static.npy
+Every backend runs in its own process, so the memory column is the cost of
+importing its runtime and loading the model in a fresh worker. Without
+--inputs the agreement is measured on random inputs shaped like the model input.
+"""
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from app.core.inference import backend_model_path
+
+VARIANTS = [("keras", False), ("tflite", False), ("tflite", True), ("onnx", False)]
+
+
+def _rss_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_backend(keras_path, backend, quantized, inputs, batch_sizes, repeats):
+    # Runs in a spawned process, see main
+    from app.core.inference import load_backend
+
+    rss_before = _rss_bytes()
+    start = time.perf_counter()
+    model = load_backend(keras_path, backend, quantized, num_threads=1)
+    load_seconds = time.perf_counter() - start
+    model.predict(inputs[:1])
+    rss_delta = _rss_bytes() - rss_before
+
+    latencies = {}
+    for batch_size in batch_sizes:
+        batch = inputs[:batch_size]
+        model.predict(batch)  # warm up this shape
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            model.predict(batch)
+            timings.append(time.perf_counter() - start)
+        timings_ms = np.array(timings) * 1000
+        latencies[batch_size] = (float(np.percentile(timings_ms, 50)), float(np.percentile(timings_ms, 99)))
+
+    predictions = np.concatenate([
+        np.argmax(model.predict(inputs[i:i + 256]), axis=1) for i in range(0, len(inputs), 256)
+    ])
+    return {
+        "load_seconds": load_seconds,
+        "rss_delta_mib": rss_delta / 2 ** 20,
+        "latencies": latencies,
+        "predictions": predictions,
+    }
+
+
+def model_input_shape(keras_path):
+    # Read it in a throwaway process, so the parent never imports TensorFlow
+    import tensorflow as tf
+    return tuple(tf.keras.models.load_model(keras_path).inputs[0].shape[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="ml_models/model.keras")
+    parser.add_argument("--inputs", default=None, help=".npy array of model inputs")
+    parser.add_argument("--samples", type=int, default=1024)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 32])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        if args.inputs:
+            inputs = np.load(args.inputs).astype(np.float32)
+        else:
+            shape = pool.apply(model_input_shape, (args.model,))
+            inputs = np.random.default_rng(0).normal(size=(args.samples, *shape)).astype(np.float32)
+
+    results = {}
+    for backend, quantized in VARIANTS:
+        name = backend + (" int8" if quantized else "")
+        if not os.path.exists(backend_model_path(args.model, backend, quantized)):
+            print(f"{name:>12}: skipped, no exported model")
+            continue
+        with context.Pool(1) as pool:
+            try:
+                results[name] = pool.apply(
+                    run_backend, (args.model, backend, quantized, inputs, args.batch_sizes, args.repeats)
+                )
+            except ImportError as exc:
+                print(f"{name:>12}: skipped, {exc}")
+
+    reference = results.get("keras", {}).get("predictions")
+    print(f"{args.model}, {len(inputs)} samples of shape {inputs.shape[1:]}")
+    for name, result in results.items():
+        latencies = "  ".join(
+            f"b{batch_size} p50 {p50:6.2f} ms p99 {p99:6.2f} ms" for batch_size, (p50, p99) in result["latencies"].items()
+        )
+        agreement = (
+            f"{np.mean(result['predictions'] == reference) * 100:6.2f}%" if reference is not None else "   n/a"
+        )
+        print(f"{name:>12}: load {result['load_seconds']:5.2f} s  rss +{result['rss_delta_mib']:6.1f} MiB  "
+              f"{latencies}  top-1 agreement {agreement}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Hand detection cost of IMAGE mode against VIDEO (tracking) mode, per frame and per clip.
+
+All modes run on the same decoded frames of every clip. A VIDEO tracker is
+bound to one clip, so its per-clip time includes getting a landmarker:
+"video new" loads one from scratch for the clip, "video pooled" borrows one
+from the wrapper's VideoLandmarkerPool and returns it, cleared, afterwards.
+Run from the server directory, next to hand_landmarker.task:
+    python -m benchmarks.bench_mediapipe_running_mode clip1.mp4 clip2.mov --max-side 640
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from mediapipe.tasks.python import vision
+
+from app.core.mediapipe_wrapper import MediaPipeWrapper, VideoHandTracker
+from app.core.preprocess import iter_frames_from_video
+
+
+def time_frames(detect, frames):
+    latencies = []
+    detected = 0
+    for frame in frames:
+        start = time.perf_counter()
+        result = detect(frame)
+        latencies.append(time.perf_counter() - start)
+        detected += bool(result.hand_landmarks)
+    return np.array(latencies) * 1000, detected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("clips", nargs="+")
+    parser.add_argument("--max-frames", type=int, default=300)
+    parser.add_argument("--max-side", type=int, default=640)
+    args = parser.parse_args()
+
+    wrapper = MediaPipeWrapper()
+    modes = ("image", "video new", "video pooled")
+    totals = {mode: [] for mode in modes}
+    clip_totals = {mode: [] for mode in modes}
+
+    # Loads the pool's first landmarker, later clips reuse it
+    wrapper.video_tracker().close()
+
+    for clip in args.clips:
+        cap = cv2.VideoCapture(clip)
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        cap.release()
+        # Frames are decoded once up front so decoding is not part of the timings
+        frames = list(iter_frames_from_video(clip, max_frames=args.max_frames, max_side=args.max_side))
+        if not frames:
+            print(f"{clip}: no frames decoded")
+            continue
+
+        wrapper.process_from_image(frames[0])  # warm up
+        start = time.perf_counter()
+        image_ms, image_hits = time_frames(wrapper.process_from_image, frames)
+        image_clip_ms = (time.perf_counter() - start) * 1000
+
+        # What a tracker per clip costs without the pool: a full model load
+        start = time.perf_counter()
+        with VideoHandTracker(vision.HandLandmarker.create_from_options(wrapper.video_option), fps) as tracker:
+            setup_ms = (time.perf_counter() - start) * 1000
+            new_ms, new_hits = time_frames(tracker.process, frames)
+        new_clip_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with wrapper.video_tracker(fps) as tracker:
+            pooled_setup_ms = (time.perf_counter() - start) * 1000
+            pooled_ms, pooled_hits = time_frames(tracker.process, frames)
+        # Includes clearing the tracking state when the landmarker goes back
+        pooled_clip_ms = (time.perf_counter() - start) * 1000
+
+        results = (
+            ("image", image_ms, image_hits, image_clip_ms, 0.0),
+            ("video new", new_ms, new_hits, new_clip_ms, setup_ms),
+            ("video pooled", pooled_ms, pooled_hits, pooled_clip_ms, pooled_setup_ms),
+        )
+        print(f"{clip} ({len(frames)} frames)")
+        for mode, latencies, hits, clip_ms, mode_setup_ms in results:
+            totals[mode].append(latencies)
+            clip_totals[mode].append(clip_ms)
+            print(f"  {mode:>12}: mean {latencies.mean():6.2f} ms  p50 {np.percentile(latencies, 50):6.2f} ms  "
+                  f"p95 {np.percentile(latencies, 95):6.2f} ms  hands found in {hits}/{len(frames)} frames  "
+                  f"clip {clip_ms:8.1f} ms (setup {mode_setup_ms:6.1f} ms)")
+
+    if totals["image"]:
+        print("overall:")
+        image_clip = np.mean(clip_totals["image"])
+        for mode in modes:
+            frame_mean = np.concatenate(totals[mode]).mean()
+            clip_mean = np.mean(clip_totals[mode])
+            print(f"  {mode:>12}: {frame_mean:6.2f} ms/frame  {clip_mean:8.1f} ms/clip  "
+                  f"clip speed-up over image x{image_clip / clip_mean:.2f}")
+    print(f"video pool: {wrapper.video_pool.describe()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Throughput and latency of the static sign classifier with and without micro-batching.
+
+Run from the server directory:
+    python -m benchmarks.bench_micro_batching --window-ms 5 --max-batch 32 --concurrency 64
+Use --synthetic to replace the Keras model with a stand-in that has a fixed
+per-call overhead, which is handy when TensorFlow is not installed.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.core.executor import BoundedExecutor
+from app.services.batching import MicroBatcher
+
+
+def synthetic_predict_batch(call_overhead_ms: float, per_sample_ms: float):
+    def predict_batch(batch: np.ndarray) -> np.ndarray:
+        time.sleep((call_overhead_ms + per_sample_ms * len(batch)) / 1000)
+        return np.zeros(len(batch), dtype=np.int64)
+    return predict_batch
+
+
+async def run_load(batcher: MicroBatcher, requests: int, concurrency: int) -> dict:
+    samples = np.random.default_rng(0).normal(size=(requests, 21, 2)).astype(np.float32)
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request(sample):
+        async with semaphore:
+            start = time.perf_counter()
+            await batcher.submit(sample)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request(sample) for sample in samples))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "requests_per_second": requests / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_batch_size": batcher.describe()["mean_batch_size"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--call-overhead-ms", type=float, default=3.0)
+    parser.add_argument("--per-sample-ms", type=float, default=0.02)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        predict_batch = synthetic_predict_batch(args.call_overhead_ms, args.per_sample_ms)
+    else:
+        from app.services.model_service import predict_hand_sign_batch
+        predict_batch = predict_hand_sign_batch
+        predict_batch(np.zeros((1, 21, 2), dtype=np.float32))  # warm up
+
+    # Queue deep enough that the unbatched run is never rejected
+    executor = BoundedExecutor.threads("bench", max_queue=args.concurrency)
+    configs = [
+        ("unbatched", MicroBatcher(predict_batch, max_batch_size=1, window_ms=0, executor=executor)),
+        (f"batched {args.window_ms}ms/{args.max_batch}",
+         MicroBatcher(predict_batch, args.max_batch, args.window_ms, executor=executor)),
+    ]
+    for name, batcher in configs:
+        result = asyncio.run(run_load(batcher, args.requests, args.concurrency))
+        print(f"{name:>24}: {result['requests_per_second']:8.1f} req/s  "
+              f"p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+              f"mean batch {result['mean_batch_size']}")
+
+
+if __name__ == "__main__":
+    main()
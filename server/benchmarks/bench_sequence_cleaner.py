@@ -0,0 +1,108 @@
+"""
+Keyframe extraction time of SequenceCleaner: the vectorized implementation
+against the former frame-by-frame loop, over sequences of 30 to 3000 frames.
+
+Run from the server directory:
+    python -m benchmarks.bench_sequence_cleaner --lengths 30 300 3000 --repeats 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.core.mediapipe_wrapper import MediaPipeWrapper
+from app.services.sequence_cleaner import SequenceCleaner
+
+
+def loop_key_frames(mp, frame_landmarks, frame_handedness, target_len):
+    """
+    The previous implementation, kept here as the baseline.
+    """
+    def distance(pos1, pos2):
+        return np.linalg.norm(pos1 - pos2)
+
+    full_sequence = []
+    for landmarks, handedness in zip(frame_landmarks, frame_handedness):
+        left_hand = np.zeros((21, 3))
+        right_hand = np.zeros((21, 3))
+        for h_index, hand_label in enumerate(handedness):
+            if hand_label == 0:
+                left_hand = landmarks[h_index]
+            elif hand_label == 1:
+                right_hand = landmarks[h_index]
+        full_sequence.append(np.concatenate([left_hand, right_hand], axis=0))
+
+    positions = [mp.hands_spacial_position(frame) for frame in full_sequence]
+    non_outliers = [full_sequence[0]]
+    for i in range(1, len(full_sequence) - 1):
+        if min(distance(positions[i-1], positions[i]), distance(positions[i], positions[i+1])) > \
+                distance(positions[i-1], positions[i+1]):
+            continue
+        non_outliers.append(full_sequence[i])
+    non_outliers.append(full_sequence[-1])
+
+    displacements = [0]
+    last_pos = mp.hands_spacial_position(non_outliers[0])
+    for frame in non_outliers[1:]:
+        pos = mp.hands_spacial_position(frame)
+        displacements.append(distance(last_pos, pos))
+        last_pos = pos.copy()
+
+    interval = sum(displacements) / (target_len - 1)
+    running_sum = 0
+    key_frames = [0]
+    for i in range(1, len(non_outliers)):
+        running_sum += displacements[i]
+        if running_sum >= interval:
+            key_frames.append(i)
+            running_sum = 0
+    if len(key_frames) < target_len:
+        key_frames.append(len(non_outliers) - 1)
+    return key_frames
+
+
+def random_sequence(rng: np.random.Generator, length: int):
+    # A random walk of both hands, with the occasional missing hand
+    landmarks = np.cumsum(rng.normal(scale=0.01, size=(length, 2, 21, 3)), axis=0) + 0.5
+    handedness = np.tile([0, 1], (length, 1))
+    handedness[rng.random(length) < 0.1, 1] = -1
+    return list(landmarks), list(handedness)
+
+
+def best_of(fn, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[30, 100, 300, 1000, 3000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--keyframes", type=int, default=6)
+    args = parser.parse_args()
+
+    # Only the position helpers are used, no HandLandmarker has to be created
+    mp = MediaPipeWrapper.__new__(MediaPipeWrapper)
+    cleaner = SequenceCleaner(mp=mp)
+    rng = np.random.default_rng(0)
+
+    for length in args.lengths:
+        landmarks, handedness = random_sequence(rng, length)
+        expected = loop_key_frames(mp, landmarks, handedness, args.keyframes)
+        if cleaner.extract_key_frames_dual_hand(landmarks, handedness, args.keyframes) != expected:
+            raise AssertionError(f"Keyframes differ from the loop implementation for {length} frames")
+
+        loop = best_of(lambda: loop_key_frames(mp, landmarks, handedness, args.keyframes), args.repeats)
+        vectorized = best_of(
+            lambda: cleaner.extract_key_frames_dual_hand(landmarks, handedness, args.keyframes), args.repeats
+        )
+        print(f"{length:>6} frames: loop {loop * 1000:8.3f} ms  vectorized {vectorized * 1000:8.3f} ms  "
+              f"speed-up x{loop / vectorized:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Exports .keras classifiers to the TFLite and ONNX files loaded by
+app.core.inference, next to every source model:
+    model.keras -> model.tflite, model.int8.tflite (--int8), model.onnx (--onnx)
+
+Run from the server directory:
+    python -m tools.export_models ml_models/model.keras ml_models/video_model.keras --onnx \
+        --int8 --calibration static_inputs.npy video_inputs.npy
+Without paths every .keras file of ml_models/ and ../Model/ is exported.
+--int8 needs --calibration, one or more .npy arrays of real model inputs,
+e.g. normalized (N, 21, 2) landmarks and (N, 6, 132) video features. Every
+model is calibrated on the array shaped like its input. Random inputs would
+give wrong quantization ranges, so a model without a matching array gets no
+int8 file. ONNX export needs tf2onnx, see requirements-inference.txt.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import tensorflow as tf
+
+from app.core.inference import OPTIONAL_REQUIREMENTS, backend_model_path
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_MODEL_DIRS = [os.path.join(SERVER_DIR, "ml_models"), os.path.join(SERVER_DIR, "..", "Model")]
+
+
+def input_signature(model):
+    # Fixed feature shape, variable batch size: (None, 21, 2) or (None, 6, 132)
+    shape = (None, *model.inputs[0].shape[1:])
+    return [tf.TensorSpec(shape, tf.float32, name="input")]
+
+
+def input_shape(model):
+    return tuple(model.inputs[0].shape[1:])
+
+
+def calibration_for(model, calibration_paths):
+    """
+    Returns the calibration array of the first .npy file shaped like the model input, or None.
+    """
+    for path in calibration_paths:
+        data = np.load(path, mmap_mode="r")
+        if tuple(data.shape[1:]) == input_shape(model):
+            return np.asarray(data, dtype=np.float32)
+    return None
+
+
+def representative_dataset(data, samples=256):
+    def generate():
+        for sample in data[:samples]:
+            yield [sample[np.newaxis]]
+    return generate
+
+
+def export_tflite(model, keras_path, int8=False, calibration=None):
+    """
+    Writes the float TFLite model, or the int8 one calibrated on the calibration array.
+    """
+    if int8 and calibration is None:
+        raise ValueError("int8 export needs calibration inputs")
+    # The batch dimension stays dynamic (shape signature -1). A converted concrete
+    # function keeps resource variables the int8 calibrator can not read.
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if int8:
+        # Weights and activations in int8, float input and output so callers do not change
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset(calibration)
+    # Converted before the file is opened, a failed conversion leaves no empty model behind
+    flatbuffer = converter.convert()
+    path = backend_model_path(keras_path, "tflite", quantized=int8)
+    with open(path, "wb") as f:
+        f.write(flatbuffer)
+    return path
+
+
+def export_onnx(model, keras_path, opset=13):
+    import tf2onnx
+
+    path = backend_model_path(keras_path, "onnx")
+    function = tf.function(lambda x: model(x, training=False))
+    tf2onnx.convert.from_function(function, input_signature=input_signature(model), opset=opset, output_path=path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("models", nargs="*", help=".keras files, defaults to ml_models/ and ../Model/")
+    parser.add_argument("--int8", action="store_true", help="also write an int8 quantized TFLite model")
+    parser.add_argument("--onnx", action="store_true", help="also write an ONNX model")
+    parser.add_argument("--calibration", nargs="+", default=[],
+                        help=".npy arrays of real model inputs for the int8 calibration, one per input shape")
+    parser.add_argument("--opset", type=int, default=13)
+    args = parser.parse_args()
+    if args.int8 and not args.calibration:
+        parser.error("--int8 needs --calibration, random inputs give wrong quantization ranges")
+    if args.onnx:
+        # Checked up front instead of failing after the TFLite exports
+        try:
+            import tf2onnx  # noqa: F401
+        except ImportError:
+            parser.error(f"--onnx needs tf2onnx, install {OPTIONAL_REQUIREMENTS}")
+
+    models = args.models or sorted(
+        path for directory in DEFAULT_MODEL_DIRS for path in glob.glob(os.path.join(directory, "*.keras"))
+    )
+    for keras_path in models:
+        model = tf.keras.models.load_model(keras_path)
+        written = [export_tflite(model, keras_path)]
+        if args.int8:
+            calibration = calibration_for(model, args.calibration)
+            if calibration is None:
+                print(f"{keras_path}: no calibration array shaped (N, {', '.join(map(str, input_shape(model)))}), "
+                      f"int8 model not written")
+            else:
+                written.append(export_tflite(model, keras_path, int8=True, calibration=calibration))
+        if args.onnx:
+            written.append(export_onnx(model, keras_path, args.opset))
+        for path in written:
+            print(f"{keras_path} -> {path} ({os.path.getsize(path) / 1024:.1f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Batches per second the tf.data input pipelines of src.pipline.input_pipeline
+can deliver, against the in-memory arrays the training notebooks feed to fit.
+
+Run from the repository root with a static dataset directory or CSV:
+    python -m src.benchmarks.bench_input_pipeline Data/static_train_ouput.csv --batch-size 64
+A CSV is converted to a temporary directory first.
+"""
+import argparse
+import os
+import tempfile
+
+import tensorflow as tf
+
+from src.pipline.input_pipeline import measure_steps_per_second, static_input_pipeline
+from src.utils.static_dataset import StaticDataset, convert_static_csv
+
+
+def in_memory(path, batch_size):
+    # What fit does with NumPy arrays: slice, shuffle and batch tensors held in memory
+    X, y = StaticDataset(path, mmap=False).arrays()
+    return tf.data.Dataset.from_tensor_slices((X, y)).shuffle(len(X)).batch(batch_size)
+
+
+def run(path, args):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        variants = {
+            "in-memory arrays": in_memory(path, args.batch_size),
+            "stream": static_input_pipeline(path, args.batch_size, augment=False),
+            "stream + augment": static_input_pipeline(path, args.batch_size, augment=True),
+            "stream + file cache + augment": static_input_pipeline(
+                path, args.batch_size, augment=True, cache=os.path.join(cache_dir, "static")
+            ),
+            "stream + memory cache + augment": static_input_pipeline(path, args.batch_size, augment=True, cache=""),
+        }
+        print(f"{len(StaticDataset(path))} samples, batch size {args.batch_size}")
+        for name, dataset in variants.items():
+            steps_per_sec = measure_steps_per_second(dataset, steps=args.steps)
+            print(f"{name:>33}: {steps_per_sec:9.1f} steps/s  {steps_per_sec * args.batch_size:11.0f} samples/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="static dataset directory or CSV")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--steps", type=int, default=500)
+    args = parser.parse_args()
+
+    if os.path.isdir(args.path):
+        run(args.path, args)
+        return
+    with tempfile.TemporaryDirectory() as out_dir:
+        convert_static_csv(args.path, out_dir)
+        run(out_dir, args)
+
+
+if __name__ == "__main__":
+    main()
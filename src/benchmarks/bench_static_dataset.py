@@ -0,0 +1,73 @@
+"""
+Load time of a static landmark dataset: the CSV written by process_and_save_static
+against the binary layout of src.utils.static_dataset.
+
+Run from the repository root:
+    python -m src.benchmarks.bench_static_dataset Data/static_train_ouput.csv --repeats 5
+The CSV is converted to a temporary directory first.
+"""
+import argparse
+import ast
+import csv
+import tempfile
+import time
+
+import numpy as np
+
+from src.utils.static_dataset import StaticDataset, convert_static_csv
+
+
+def load_csv_literal_eval(csv_path):
+    # The loading code of the training notebooks
+    X_data, y_data = [], []
+    with open(csv_path, "r") as f:
+        for row in csv.DictReader(f):
+            X_data.append(np.array(ast.literal_eval(row["landmark"])))
+            y_data.append(np.array(ast.literal_eval(row["encoding"])))
+    return np.array(X_data), np.array(y_data)
+
+
+def load_binary(path, mmap):
+    X, y = StaticDataset(path, mmap=mmap).arrays()
+    # Touch every value so the memory map is actually read
+    float(np.sum(X))
+    return X, y
+
+
+def best_of(fn, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv_path")
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        convert_static_csv(args.csv_path, out_dir)
+
+        X_csv, y_csv = load_csv_literal_eval(args.csv_path)
+        X_bin, y_bin = load_binary(out_dir, mmap=True)
+        if not (np.allclose(X_csv, X_bin, atol=1e-6) and np.array_equal(y_csv, y_bin)):
+            raise AssertionError("The binary dataset differs from the CSV")
+
+        timings = {
+            "csv (ast.literal_eval)": best_of(lambda: load_csv_literal_eval(args.csv_path), args.repeats),
+            "binary (read)": best_of(lambda: load_binary(out_dir, mmap=False), args.repeats),
+            "binary (mmap)": best_of(lambda: load_binary(out_dir, mmap=True), args.repeats),
+        }
+
+    baseline = timings["csv (ast.literal_eval)"]
+    print(f"{len(X_csv)} samples")
+    for name, seconds in timings.items():
+        print(f"{name:>24}: {seconds * 1000:9.2f} ms  x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
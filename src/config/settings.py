@@ -17,3 +17,14 @@ STATIC_CSV_OUTPUT_TEST = os.getenv("STATIC_CSV_OUTPUT_TEST")
 DYNAMIC_CSV_OUTPUT_TEST = os.getenv("DYNAMIC_CSV_OUTPUT_TEST")
 STATIC_LABEL_PATH_TEST = os.getenv("STATIC_LABEL_PATH_TEST")
 DYNAMIC_LABEL_PATH_TEST = os.getenv("DYNAMIC_LABEL_PATH_TEST")
+
+# Directories of the binary static datasets (src.utils.static_dataset), skipped when unset
+STATIC_BINARY_OUTPUT_TRAIN = os.getenv("STATIC_BINARY_OUTPUT_TRAIN")
+STATIC_BINARY_OUTPUT_TEST = os.getenv("STATIC_BINARY_OUTPUT_TEST")
+# Directory of the dynamic dataset shards (src.utils.dynamic_dataset)
+DYNAMIC_BINARY_OUTPUT = os.getenv("DYNAMIC_BINARY_OUTPUT")
+
+
+# Persistent cache of MediaPipe detections, disabled when unset
+DETECTION_CACHE_DIR = os.getenv("DETECTION_CACHE_DIR")
+DETECTION_CACHE_MAX_BYTES = int(os.getenv("DETECTION_CACHE_MAX_BYTES", 2 * 1024 ** 3))
@@ -0,0 +1,336 @@
+"""
+Streaming tf.data input pipelines over the landmark shards of
+src.utils.static_dataset and src.utils.dynamic_dataset.
+
+The shards are read lazily from their memory maps, so a dataset never has to
+fit in RAM. Augmentation runs as vectorized TF ops on whole batches in
+parallel map stages. The stages are:
+    read shards -> [cache] -> shuffle -> batch -> augment (parallel) -> prefetch
+
+Nothing is cached by default. cache="" keeps the decoded samples in memory
+after the first epoch, for datasets known to fit. A file prefix such as
+cache="/tmp/static_cache" caches them on disk instead, which helps when the
+shards live on slow or remote storage.
+
+    model.fit(static_input_pipeline(path), epochs=..., callbacks=[StepsPerSecond()])
+"""
+import math
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from src.preprocessor.augmentation import HandLandmarkAugmenter
+from src.utils.dynamic_dataset import DynamicDataset
+from src.utils.static_dataset import StaticDataset
+
+AUTOTUNE = tf.data.AUTOTUNE
+MCP_INDICES = [5, 9, 13, 17]
+
+
+def normalize_hand_landmarks_tf(landmarks):
+    """
+    TF version of Normalization.normalize_hand_landmarks_batch.
+
+    Args:
+        landmarks: float32 tensor of shape (B, 21, 2)
+    Returns:
+        The normalized landmarks, shape (B, 21, 2)
+    """
+    # Center around the palm center
+    center = tf.reduce_mean(tf.gather(landmarks, MCP_INDICES, axis=1), axis=1, keepdims=True)
+    centered = landmarks - center
+
+    # Scale by the mean MCP distance to their center
+    mcp_joints = tf.gather(centered, MCP_INDICES, axis=1)
+    mcp_center = tf.reduce_mean(mcp_joints, axis=1, keepdims=True)
+    scale = tf.reduce_mean(tf.norm(mcp_joints - mcp_center, axis=2), axis=1)
+    scale = tf.maximum(scale, 1e-6)
+    scaled = centered / scale[:, tf.newaxis, tf.newaxis]
+
+    # Align L9 (index MCP) upward, the reference is (0, -1)
+    vec = scaled[:, 9]
+    theta = tf.atan2(-vec[:, 0], -vec[:, 1])
+    cos_t = tf.cos(-theta)
+    sin_t = tf.sin(-theta)
+    R_T = tf.stack([
+        tf.stack([cos_t, sin_t], axis=-1),
+        tf.stack([-sin_t, cos_t], axis=-1)
+    ], axis=1)
+    rotated = tf.matmul(scaled, R_T)
+
+    # Normalize to [-1, 1] range
+    max_val = tf.reduce_max(tf.abs(rotated), axis=[1, 2])
+    max_val = tf.where(max_val > 0, max_val, tf.ones_like(max_val))
+    return rotated / max_val[:, tf.newaxis, tf.newaxis]
+
+
+def make_static_augment_fn(augmenter=None, original_prob=0.2):
+    """
+    Returns fn(landmarks, seed) -> landmarks, the batched TF counterpart of
+    HandLandmarkAugmenter.augment_batch followed by normalization.
+
+    Every sample is kept as is with original_prob, otherwise it gets one of the
+    four augmentations of augment_batch (scaling, shear, rotation, jitter) with
+    the ranges and probabilities of the augmenter. The random ops are stateless,
+    so a batch only depends on its seed.
+    """
+    augmenter = augmenter or HandLandmarkAugmenter()
+    probs = tf.constant([
+        augmenter.scale_prob, augmenter.shear_prob, augmenter.rotation_prob, augmenter.jitter_prob, 0.0
+    ], dtype=tf.float32)
+    # Kind 4 is the original sample, the other kinds share the rest evenly
+    kind_logits = tf.math.log([[(1 - original_prob) / 4] * 4 + [original_prob]])
+
+    def augment(landmarks, seed):
+        batch_size = tf.shape(landmarks)[0]
+        seeds = tf.random.experimental.stateless_split(seed, num=6)
+
+        kind = tf.reshape(tf.random.stateless_categorical(
+            tf.tile(kind_logits, [batch_size, 1]), 1, seeds[0]
+        ), [-1])
+        applied = tf.random.stateless_uniform([batch_size], seeds[1]) < tf.gather(probs, kind)
+
+        scale = tf.random.stateless_uniform([batch_size, 2], seeds[2], *augmenter.scale_range)
+        shear = tf.random.stateless_uniform([batch_size], seeds[3], *augmenter.shear_range)
+        angle = tf.random.stateless_uniform([batch_size], seeds[4], *augmenter.rotation_range) * (math.pi / 180)
+
+        ones = tf.ones([batch_size])
+        zeros = tf.zeros([batch_size])
+
+        def matrices(a, b, c, d):
+            return tf.reshape(tf.stack([a, b, c, d], axis=-1), [-1, 2, 2])
+
+        scale_matrices = matrices(scale[:, 0], zeros, zeros, scale[:, 1])
+        shear_matrices = matrices(ones, shear, zeros, ones)
+        cos_a, sin_a = tf.cos(angle), tf.sin(angle)
+        rotation_matrices = matrices(cos_a, -sin_a, sin_a, cos_a)
+        identity = matrices(ones, zeros, zeros, ones)
+
+        # One 2x2 matrix per sample, the identity when the transform is not applied
+        transform = tf.gather(
+            tf.stack([scale_matrices, shear_matrices, rotation_matrices, identity, identity], axis=1),
+            tf.where(applied, kind, tf.fill([batch_size], tf.constant(4, tf.int64))),
+            batch_dims=1
+        )
+        landmarks = tf.matmul(landmarks, transform)
+
+        is_jitter = tf.logical_and(applied, tf.equal(kind, 3))
+        noise = tf.random.stateless_normal(tf.shape(landmarks), seeds[5], stddev=augmenter.jitter_std)
+        landmarks += noise * tf.cast(is_jitter, landmarks.dtype)[:, tf.newaxis, tf.newaxis]
+        return normalize_hand_landmarks_tf(landmarks)
+
+    return augment
+
+
+def make_dynamic_augment_fn(scale_range=(0.9, 1.1), rotation_range=(-10, 10), jitter_std=0.002):
+    """
+    Returns fn(landmarks, lengths, seed) -> landmarks for batches of padded
+    (B, K, 2, 21, 3) world landmarks. Every sample gets one random scale, one
+    rotation around the z axis and Gaussian jitter, the padded keyframes stay zero.
+    """
+    def augment(landmarks, lengths, seed):
+        batch_size = tf.shape(landmarks)[0]
+        seeds = tf.random.experimental.stateless_split(seed, num=3)
+
+        scale = tf.random.stateless_uniform([batch_size], seeds[0], *scale_range)
+        angle = tf.random.stateless_uniform([batch_size], seeds[1], *rotation_range) * (math.pi / 180)
+        cos_a, sin_a = tf.cos(angle) * scale, tf.sin(angle) * scale
+        zeros = tf.zeros([batch_size])
+        # (B, 3, 3): rotation in the image plane times the scale, z only scaled
+        transform = tf.reshape(tf.stack([
+            cos_a, -sin_a, zeros,
+            sin_a, cos_a, zeros,
+            zeros, zeros, scale,
+        ], axis=-1), [-1, 1, 1, 3, 3])
+
+        landmarks = tf.matmul(landmarks, transform)
+        landmarks += tf.random.stateless_normal(tf.shape(landmarks), seeds[2], stddev=jitter_std)
+        valid = tf.sequence_mask(lengths, tf.shape(landmarks)[1], dtype=landmarks.dtype)
+        return landmarks * valid[:, :, tf.newaxis, tf.newaxis, tf.newaxis]
+
+    return augment
+
+
+def _from_shards(shards, output_signature, block_size):
+    """
+    Dataset of the rows of a list of tuples of (memory-mapped) column arrays.
+    Blocks of block_size rows are copied out of the memory maps at a time,
+    so only the rows being consumed are paged in.
+    """
+    def read_shard(index):
+        columns = shards[int(index)]
+        for start in range(0, len(columns[0]), block_size):
+            yield tuple(np.asarray(column[start:start + block_size]) for column in columns)
+
+    block_signature = tuple(
+        tf.TensorSpec((None, *spec.shape), spec.dtype) for spec in output_signature
+    )
+    return tf.data.Dataset.range(len(shards)).flat_map(
+        lambda index: tf.data.Dataset.from_generator(read_shard, args=(index,), output_signature=block_signature)
+    ).unbatch()
+
+
+def _finish(dataset, batch_size, cache, shuffle_buffer, seed, augment, drop_remainder):
+    """
+    The stages shared by the static and the dynamic pipeline, see the module docstring.
+    augment is fn(*batch, seed) -> (features, labels) and runs in parallel.
+    """
+    if cache is not None:
+        # "" caches in memory, a file prefix caches to disk for datasets larger than RAM
+        dataset = dataset.cache(cache)
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size, drop_remainder=drop_remainder)
+
+    # One stateless seed per batch, drawn again every epoch
+    seeds = tf.data.Dataset.random(seed=seed, rerandomize_each_iteration=True).batch(2, drop_remainder=True)
+    dataset = tf.data.Dataset.zip((dataset, seeds)).map(
+        lambda batch, batch_seed: augment(*batch, batch_seed),
+        num_parallel_calls=AUTOTUNE,
+        deterministic=seed is not None,
+    )
+    return dataset.prefetch(AUTOTUNE)
+
+
+def static_input_pipeline(path, batch_size=64, augment=True, augmenter=None, cache=None,
+                          shuffle_buffer=16384, seed=None, block_size=4096, drop_remainder=False):
+    """
+    tf.data pipeline of (landmarks (B, 21, 2), one-hot encodings) batches over a
+    dataset written by write_static_dataset, for the CNN of the static model.
+
+    Args:
+        path: directory of the static dataset
+        batch_size: samples per batch
+        augment: augment every batch on the fly, see make_static_augment_fn.
+            The samples are normalized again after the augmentation, so the
+            dataset is best written without offline augmentation
+            (process_and_save_static(augmentation_factor=0)).
+        augmenter: HandLandmarkAugmenter holding the augmentation ranges and probabilities
+        cache: None to stream the shards every epoch, "" to cache the whole
+            dataset in memory or a file prefix to cache it on disk
+        shuffle_buffer: size of the shuffle buffer, 0 to keep the order
+        seed: seed of the shuffling and the augmentation, None for a random run
+        block_size: rows copied out of a memory map at a time
+        drop_remainder: drop the last incomplete batch
+    Returns:
+        tf.data.Dataset
+    """
+    dataset = StaticDataset(path, mmap=True)
+    label_encodings = tf.constant(np.asarray(dataset.label_encodings), dtype=tf.float32)
+    samples = _from_shards(
+        list(dataset.shards()),
+        (tf.TensorSpec((21, 2), tf.float32), tf.TensorSpec((), tf.int32)),
+        block_size,
+    )
+
+    augment_fn = make_static_augment_fn(augmenter) if augment else None
+
+    def to_model_input(landmarks, labels, batch_seed):
+        if augment_fn is not None:
+            landmarks = augment_fn(landmarks, batch_seed)
+        return landmarks, tf.gather(label_encodings, labels)
+
+    return _finish(samples, batch_size, cache, shuffle_buffer, seed, to_model_input, drop_remainder)
+
+
+def dynamic_input_pipeline(path, batch_size=32, augment=True, cache=None, shuffle_buffer=4096,
+                           seed=None, block_size=1024, drop_remainder=False, label_names=None):
+    """
+    tf.data pipeline of (features (B, K, 132), one-hot labels) batches over a
+    dataset written by DynamicDatasetWriter. The features are the same as
+    sample_to_model_input of the server: the flattened keyframe landmarks
+    followed by the left and right trajectory steps, zero padded.
+
+    Args:
+        path: directory of the dynamic dataset
+        augment: augment the landmarks on the fly, see make_dynamic_augment_fn
+        label_names: labels in class index order, defaults to the labels of this dataset.
+            Pass the labels of the training dataset to the test pipeline, so both
+            one-hot encode over the same classes.
+        See static_input_pipeline for the other arguments.
+    Returns:
+        tf.data.Dataset
+    """
+    dataset = DynamicDataset(path, mmap=True)
+    K = dataset.num_keyframes
+    if label_names is None:
+        label_names = dataset.label_names
+    class_index = {label: i for i, label in enumerate(label_names)}
+    unknown = [label for label in dataset.label_names if label not in class_index]
+    if unknown:
+        raise ValueError(f"Labels {unknown} of {path} are not in label_names")
+    # Maps the label indices stored in the dataset to class indices
+    classes = tf.constant([class_index[label] for label in dataset.label_names], dtype=tf.int32)
+    num_classes = len(label_names)
+    samples = _from_shards(
+        list(dataset.shards(("landmarks", "landmark_lengths", "trajectories", "labels"))),
+        (
+            tf.TensorSpec((K, 2, 21, 3), tf.float32),
+            tf.TensorSpec((), tf.int32),
+            tf.TensorSpec((K - 1, 2, 3), tf.float32),
+            tf.TensorSpec((), tf.int32),
+        ),
+        block_size,
+    )
+
+    augment_fn = make_dynamic_augment_fn() if augment else None
+
+    def to_model_input(landmarks, lengths, trajectories, labels, batch_seed):
+        if augment_fn is not None:
+            landmarks = augment_fn(landmarks, lengths, batch_seed)
+        batch = tf.shape(landmarks)[0]
+        # The last keyframe has no step, its trajectory columns are zero
+        steps = tf.pad(tf.reshape(trajectories, [batch, K - 1, 6]), [[0, 0], [0, 1], [0, 0]])
+        features = tf.concat([tf.reshape(landmarks, [batch, K, 2 * 21 * 3]), steps], axis=-1)
+        return features, tf.one_hot(tf.gather(classes, labels), num_classes)
+
+    return _finish(samples, batch_size, cache, shuffle_buffer, seed, to_model_input, drop_remainder)
+
+
+class StepsPerSecond(tf.keras.callbacks.Callback):
+    """
+    Reports the training steps per second of every epoch, to compare pipeline
+    settings under a real model. The values are added to the epoch logs as
+    steps_per_sec and kept in self.history.
+    """
+
+    def __init__(self, verbose=True):
+        super().__init__()
+        self.verbose = verbose
+        self.history = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._steps = 0
+        self._start = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        # Start after the first batch is ready, so tracing is not counted
+        if self._start is None:
+            self._start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = time.perf_counter() - self._start if self._start is not None else 0.0
+        steps_per_sec = self._steps / elapsed if elapsed > 0 else 0.0
+        self.history.append(steps_per_sec)
+        if logs is not None:
+            logs["steps_per_sec"] = steps_per_sec
+        if self.verbose:
+            print(f"Epoch {epoch + 1}: {self._steps} steps, {steps_per_sec:.1f} steps/s")
+
+
+def measure_steps_per_second(dataset, steps=200, warmup=10):
+    """
+    Iterates a dataset without a model and returns its batches per second,
+    the upper bound of the training speed it can feed.
+    """
+    iterator = iter(dataset.repeat())
+    for _ in range(warmup):
+        next(iterator)
+    start = time.perf_counter()
+    for _ in range(steps):
+        next(iterator)
+    return steps / (time.perf_counter() - start)
@@ -0,0 +1,184 @@
+import hashlib
+import multiprocessing
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Per-process state built by the initializer, see _init_worker
+_worker_state = None
+
+
+def _init_worker(initializer, initargs):
+    global _worker_state
+    _worker_state = initializer(*initargs) if initializer is not None else None
+
+
+def _run_shard(task, items, checkpoint_path):
+    """
+    Runs task on every item of a shard with the state of this process and
+    checkpoints the results before returning them.
+    """
+    results = [task(_worker_state, item) for item in items]
+    if checkpoint_path is not None:
+        _write_atomic(checkpoint_path, results)
+    return results
+
+
+def _write_atomic(path, results):
+    # Write to a temporary file in the same directory, then rename it over the
+    # final name, so a crash never leaves a truncated checkpoint behind
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _fingerprint(item):
+    """
+    Item as it appears in a checkpoint key. Paths of files and folders also
+    carry the size and modification time of every file under them, so an
+    image that was replaced or relabelled in place changes the key.
+    """
+    if isinstance(item, (tuple, list)):
+        return tuple(_fingerprint(value) for value in item)
+    if not isinstance(item, (str, os.PathLike)):
+        return item
+    if os.path.isfile(item):
+        stat = os.stat(item)
+        return (os.fspath(item), stat.st_size, stat.st_mtime_ns)
+    if os.path.isdir(item):
+        files = []
+        for root, dirs, names in os.walk(item):
+            dirs.sort()
+            for name in sorted(names):
+                stat = os.stat(os.path.join(root, name))
+                files.append((os.path.relpath(os.path.join(root, name), item), stat.st_size, stat.st_mtime_ns))
+        return (os.fspath(item), tuple(files))
+    return item
+
+
+def make_shards(items, shard_size):
+    """
+    Splits items into consecutive shards of at most shard_size items.
+    """
+    return [items[i:i + shard_size] for i in range(0, len(items), shard_size)]
+
+
+class ShardedBuilder:
+    """
+    Runs a per-item task over shards of items on a pool of worker processes.
+
+    Every worker builds its own state once (e.g. a MediaPipe detector) with
+    the initializer. Shard results are yielded in shard order whatever the
+    order they finish in, so the output is deterministic. With a checkpoint
+    directory every finished shard is written atomically, and a later run
+    over the same shards loads them instead of processing them again.
+    """
+
+    def __init__(self, task, initializer=None, initargs=(), workers=None, checkpoint_dir=None, name="build"):
+        """
+        Args:
+            task: module level function task(state, item) -> result, must be picklable.
+            initializer: module level function building the per-process state.
+            initargs: arguments of the initializer.
+            workers: number of worker processes, defaults to the number of cores.
+                With 1 the shards are processed in this process.
+            checkpoint_dir: directory of the per-shard checkpoints, None to disable.
+            name: prefix of the progress lines and the checkpoint files.
+        """
+        self.task = task
+        self.initializer = initializer
+        self.initargs = initargs
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.checkpoint_dir = checkpoint_dir
+        self.name = name
+        if checkpoint_dir is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+    def checkpoint_path(self, shard):
+        """
+        Checkpoints are named after the shard and the task settings, so a
+        changed corpus, shard size or setting never picks up stale results.
+        Items that are paths are keyed by the size and modification time of
+        their files, see _fingerprint. An edit that keeps both, e.g. a copy
+        with preserved timestamps, is not detected: clear the checkpoints by hand.
+        """
+        if self.checkpoint_dir is None:
+            return None
+        key = (self.name, self.task.__qualname__, self.initargs, [_fingerprint(item) for item in shard])
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        return os.path.join(self.checkpoint_dir, f"{self.name}-{digest}.pkl")
+
+    def run(self, shards):
+        """
+        Processes the shards and yields the list of results of every shard, in order.
+        """
+        total_items = sum(len(shard) for shard in shards)
+        self._start = time.perf_counter()
+        self._done_items = 0
+        self._processed_items = 0
+
+        # Computed once, fingerprinting stats every file of the shard
+        paths = [self.checkpoint_path(shard) for shard in shards]
+        pending = {}
+        for index, path in enumerate(paths):
+            if path is not None and os.path.exists(path):
+                continue
+            pending[index] = path
+
+        if pending:
+            print(f"[{self.name}] {len(shards) - len(pending)}/{len(shards)} shards already done, "
+                  f"processing {len(pending)} with {self.workers} worker(s)")
+
+        if self.workers == 1 or not pending:
+            if pending:
+                _init_worker(self.initializer, self.initargs)
+            for index, shard in enumerate(shards):
+                if index in pending:
+                    results = _run_shard(self.task, shard, pending[index])
+                    self._processed_items += len(shard)
+                else:
+                    results = self._load(paths[index])
+                yield self._report(index, shards, results, total_items)
+            return
+
+        # Forking a process that already loaded TensorFlow or MediaPipe is unsafe, always spawn
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.initializer, self.initargs),
+        ) as pool:
+            futures = {
+                index: pool.submit(_run_shard, self.task, shards[index], path)
+                for index, path in pending.items()
+            }
+            for index, shard in enumerate(shards):
+                if index in futures:
+                    # Later shards keep running while we wait for this one
+                    results = futures.pop(index).result()
+                    self._processed_items += len(shard)
+                else:
+                    results = self._load(paths[index])
+                yield self._report(index, shards, results, total_items)
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def _report(self, index, shards, results, total_items):
+        self._done_items += len(shards[index])
+        elapsed = time.perf_counter() - self._start
+        rate = self._processed_items / elapsed if elapsed > 0 else 0.0
+        print(f"[{self.name}] shard {index + 1}/{len(shards)}  "
+              f"{self._done_items}/{total_items} items  {rate:.1f} items/s")
+        return results
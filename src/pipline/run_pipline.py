@@ -4,13 +4,17 @@ from src.config.settings import STATIC_SIGN_PATH_TRAIN, DYNAMIC_SIGN_PATH_TRAIN,
     STATIC_CSV_OUTPUT_TRAIN, DYNAMIC_CSV_OUTPUT_TRAIN, STATIC_LABEL_PATH_TRAIN, \
     DYNAMIC_LABEL_PATH_TRAIN, STATIC_SIGN_PATH_TEST, DYNAMIC_SIGN_PATH_TEST, \
     STATIC_CSV_OUTPUT_TEST, DYNAMIC_CSV_OUTPUT_TEST, STATIC_LABEL_PATH_TEST, \
-    DYNAMIC_LABEL_PATH_TEST
+    DYNAMIC_LABEL_PATH_TEST, STATIC_BINARY_OUTPUT_TRAIN, STATIC_BINARY_OUTPUT_TEST, \
+    DYNAMIC_BINARY_OUTPUT
 from src.preprocessor.image_preprocessor import ImagePreProcessor
 from src.preprocessor.augmentation import HandLandmarkAugmenter
 from src.preprocessor.normalization import Normalization
 from src.utils.mediapipe_wrapper import MediaPipeWrapper
 from src.preprocessor.sequence_cleaner import SequenceCleaner
 from src.preprocessor.trajectory_builder import GeneralDirectionBuilder
+from src.pipline.parallel_builder import ShardedBuilder, make_shards
+from src.utils.static_dataset import write_static_dataset
+from src.utils.dynamic_dataset import DynamicDatasetWriter
 from src.utils.path_utiils import file_exists
 from pprint import pprint
 import os
@@ -18,17 +22,22 @@ import cv2
 from natsort import natsorted
 import numpy as np
 
-def process_and_save_static(train=True):
+AUGMENTATION_FACTOR = 4  # one copy per augmentation type
+
+def process_and_save_static(train=True, seed=0, workers=1, checkpoint_dir=None,
+                            augmentation_factor=AUGMENTATION_FACTOR):
     image_processor = ImagePreProcessor(num_classes=33)
 
     if train:
         sign_path = STATIC_SIGN_PATH_TRAIN
         label_path = STATIC_LABEL_PATH_TRAIN
         output_path = STATIC_CSV_OUTPUT_TRAIN
+        binary_output_path = STATIC_BINARY_OUTPUT_TRAIN
     else:
         sign_path = STATIC_SIGN_PATH_TEST
         label_path = STATIC_LABEL_PATH_TEST
         output_path = STATIC_CSV_OUTPUT_TEST
+        binary_output_path = STATIC_BINARY_OUTPUT_TEST
 
     if not file_exists(sign_path):
         raise FileNotFoundError(f"Sign path {sign_path} does not exist.")
@@ -36,16 +45,27 @@ def process_and_save_static(train=True):
     if not file_exists(label_path):
         raise FileNotFoundError(f"Label path {label_path} does not exist.")
 
-    X, y = image_processor.load_multiple_images(sign_path, label_path)
+    X, y = image_processor.load_multiple_images(
+        sign_path, label_path, workers=workers, checkpoint_dir=checkpoint_dir
+    )
 
-    augmenter = HandLandmarkAugmenter()
+    augmenter = HandLandmarkAugmenter(seed=seed)
     normalizer = Normalization()
 
     result = {}
 
     one_hot_encoding, label = y
 
-    for i, sample in enumerate(X):
+    # Augment the whole set at once, augmentation_factor copies per sample (0 when the
+    # training input pipeline augments on the fly, see src.pipline.input_pipeline),
+    # then normalize the augmented and the original samples in batches
+    augmented = augmenter.augment_batch(X, factor=augmentation_factor)
+    normalized_augmented = normalizer.normalize_hand_landmarks_batch(augmented).reshape(
+        len(X), augmentation_factor, *X.shape[1:]
+    )
+    normalized_original = normalizer.normalize_hand_landmarks_batch(X)
+
+    for i in range(len(X)):
         lbl = label[i]
 
         # Initialize entry if not already present
@@ -55,16 +75,9 @@ def process_and_save_static(train=True):
                 "encoding": None
             }
 
-        # Augment and normalize each augmented sample
-        augmented_samples = augmenter.augment(sample)
-        normalized_augmented = [normalizer.normalize_hand_landmarks(aug) for aug in augmented_samples]
-
-        # Normalize the original sample
-        normalized_original = normalizer.normalize_hand_landmarks(sample)
-
-        # Add to result
-        result[lbl]["landmark"].extend(normalized_augmented)
-        result[lbl]["landmark"].append(normalized_original)
+        # Add to result, augmented samples first and the original last
+        result[lbl]["landmark"].extend(normalized_augmented[i])
+        result[lbl]["landmark"].append(normalized_original[i])
 
         # Set encoding (only once per label)
         if result[lbl]["encoding"] is None:
@@ -85,46 +98,50 @@ def process_and_save_static(train=True):
                     'encoding': data["encoding"].numpy().tolist()  # Convert tensor to list
                 })
 
+    # Save the same rows in the binary layout, see src.utils.static_dataset
+    if binary_output_path:
+        labels, landmarks, encodings = [], [], []
+        for label, data in result.items():
+            labels.extend([label] * len(data["landmark"]))
+            landmarks.extend(data["landmark"])
+            encodings.extend([data["encoding"].numpy()] * len(data["landmark"]))
+        write_static_dataset(binary_output_path, labels, np.array(landmarks), np.array(encodings))
 
-def process_and_save_dynamic(num_keyframes=6):
+
+def process_dynamic_folder(folder_path, mp_wrapper, cleaner, builder, num_keyframes=6, video_mode=False, fps=30.0):
     '''
-    Loads all samples from the root_dir, extracts sorted world landmarks (for model),
-       computes trajectory (from original landmarks), applies keyframe filtering,
-       and returns a list of dictionaries with 'landmark', 'trajectory', and 'label'.
+    Extracts the keyframe landmarks and the trajectory of one sample folder.
 
        Parameters:
+           folder_path (str): Folder holding the frames of the sample.
+           mp_wrapper: MediaPipe wrapper instance.
+           cleaner: SequenceCleaner instance for keyframe extraction.
+           builder: GeneralDirectionBuilder for trajectory computation.
            num_keyframes (int): Number of keyframes per sequence.
+           video_mode (bool): Track hands across the frames with a VIDEO mode HandLandmarker.
+           fps (float): Frame rate the folder was extracted at, for the VIDEO mode timestamps.
 
        Returns:
-           None
+           dict with 'landmark' and 'trajectory', or None if the folder has too few valid frames
     '''
-    # due the time it takes to convert to frames and saving it we will just store it as a numpy array
-    # not as a csv file
-    root_dir = DYNAMIC_LABEL_PATH_TRAIN
-
-    mp_wrapper = MediaPipeWrapper()
-    cleaner = SequenceCleaner()
-    builder = GeneralDirectionBuilder()
+    image_files = [
+        f for f in os.listdir(folder_path)
+        if f.lower().endswith((".jpg", ".jpeg", ".png"))
+    ]
+    image_files = natsorted(image_files)
 
-    all_data = []
+    frame_hand_landmarks = []     # Raw hand_landmarks (trajectory input)
+    frame_world_landmarks = []    # Sorted world landmarks (model input)
+    frame_handedness = []         # Handedness for sorting and trajectory
 
-    for folder_name in os.listdir(root_dir):
-        folder_path = os.path.join(root_dir, folder_name)
-        if not os.path.isdir(folder_path):
-            continue
+    # Keyframe extraction runs alongside detection, one frame at a time
+    keyframe_extractor = cleaner.online(num_keyframes)
 
-        label = folder_name.split("_")[0]
-
-        image_files = [
-            f for f in os.listdir(folder_path)
-            if f.lower().endswith((".jpg", ".jpeg", ".png"))
-        ]
-        image_files = natsorted(image_files)
-
-        frame_hand_landmarks = []     # Raw hand_landmarks (trajectory input)
-        frame_world_landmarks = []    # Sorted world landmarks (model input)
-        frame_handedness = []         # Handedness for sorting and trajectory
+    # One tracker per folder so tracking state never crosses samples
+    tracker = mp_wrapper.video_tracker(fps) if video_mode else None
+    detect = tracker.process if tracker is not None else mp_wrapper.process_from_image
 
+    try:
         for filename in image_files:
             img_path = os.path.join(folder_path, filename)
             image = cv2.imread(img_path)
@@ -132,7 +149,7 @@ def process_and_save_dynamic(num_keyframes=6):
                 print(f"Failed to load: {img_path}")
                 continue
 
-            mp_result = mp_wrapper.process_from_image(image)
+            mp_result = detect(image)
 
             if not mp_result.hand_landmarks or not mp_result.hand_world_landmarks:
                 continue
@@ -152,35 +169,110 @@ def process_and_save_dynamic(num_keyframes=6):
                 elif hand == 1:  # right
                     sorted_world[1] = raw_world[i * 21:(i + 1) * 21]
             frame_world_landmarks.append(sorted_world)
+            keyframe_extractor.push(frame_hand_landmarks[-1], handedness)
+    finally:
+        if tracker is not None:
+            tracker.close()
+
+    # Skip if not enough frames
+    if len(frame_hand_landmarks) < num_keyframes:
+        return None
+
+    # === Extract keyframes ===
+    key_frames = keyframe_extractor.finalize()
 
-        # Skip if not enough frames
-        if len(frame_hand_landmarks) < num_keyframes:
-            continue
+    # === Filtered for each data type ===
+    filtered_world_landmarks = [frame_world_landmarks[i] for i in key_frames]
+    filtered_landmarks = [frame_hand_landmarks[i] for i in key_frames]
+    filtered_handedness = [frame_handedness[i] for i in key_frames]
 
-        # === Extract keyframes ===
-        key_frames = cleaner.extract_key_frames_dual_hand(
-            frame_hand_landmarks, frame_handedness, num_keyframes
-        )
+    # === Build trajectory ===
+    trajectory = builder.make_trajectory(filtered_landmarks, filtered_handedness)
 
-        # === Filtered for each data type ===
-        filtered_world_landmarks = [frame_world_landmarks[i] for i in key_frames]
-        filtered_landmarks = [frame_hand_landmarks[i] for i in key_frames]
-        filtered_handedness = [frame_handedness[i] for i in key_frames]
+    return {
+        "landmark": np.array(filtered_world_landmarks),   # (K, 2, 21, 3)
+        "trajectory": trajectory,                          # {'left': (K-1, 3), 'right': (K-1, 3)}
+    }
 
-        # === Build trajectory ===
-        trajectory = builder.make_trajectory(filtered_landmarks, filtered_handedness)
 
-        # === Store result ===
-        all_data.append({
-            "landmark": np.array(filtered_world_landmarks),   # (K, 2, 21, 3)
-            "trajectory": trajectory,                          # {'left': (K-1, 3), 'right': (K-1, 3)}
-            "label": label
-        })
+def _init_dynamic_worker(num_keyframes, video_mode, fps):
+    # Every worker process owns its detectors
+    return MediaPipeWrapper(), SequenceCleaner(), GeneralDirectionBuilder(), (num_keyframes, video_mode, fps)
+
+
+def _dynamic_folder_task(state, folder_path):
+    mp_wrapper, cleaner, builder, (num_keyframes, video_mode, fps) = state
+    return process_dynamic_folder(folder_path, mp_wrapper, cleaner, builder, num_keyframes, video_mode, fps)
+
+
+def process_and_save_dynamic(num_keyframes=6, video_mode=False, fps=30.0,
+                             workers=1, checkpoint_dir=None, shard_size=8):
+    '''
+    Loads all samples from the root_dir, extracts sorted world landmarks (for model),
+       computes trajectory (from original landmarks), applies keyframe filtering,
+       and returns a list of dictionaries with 'landmark', 'trajectory', and 'label'.
+
+       Parameters:
+           num_keyframes (int): Number of keyframes per sequence.
+           video_mode (bool): Track hands across the frames of a folder with a
+               VIDEO mode HandLandmarker instead of detecting every frame from scratch.
+           fps (float): Frame rate the folders were extracted at, for the VIDEO mode timestamps.
+           workers (int): Number of worker processes, each with its own detector.
+           checkpoint_dir (str): Directory of the per-shard checkpoints. A rerun after
+               a crash skips the shards that were finished.
+           shard_size (int): Number of folders per shard.
+
+       Returns:
+           None
+    '''
+    # due the time it takes to convert to frames and saving it we will just store it as numpy shards
+    # not as a csv file
+    root_dir = DYNAMIC_LABEL_PATH_TRAIN
 
-    # Save the data
-    np.save(DYNAMIC_CSV_OUTPUT_TEST, all_data)
+    if not DYNAMIC_BINARY_OUTPUT:
+        raise ValueError("DYNAMIC_BINARY_OUTPUT must name the directory of the dynamic dataset shards.")
+
+    # Sorted so shards, checkpoints and the output order are deterministic
+    folders = [
+        os.path.join(root_dir, folder_name)
+        for folder_name in natsorted(os.listdir(root_dir))
+        if os.path.isdir(os.path.join(root_dir, folder_name))
+    ]
+
+    sharded = ShardedBuilder(
+        _dynamic_folder_task,
+        initializer=_init_dynamic_worker,
+        initargs=(num_keyframes, video_mode, fps),
+        workers=workers,
+        checkpoint_dir=checkpoint_dir,
+        name="dynamic",
+    )
+
+    # Fixed-shape, memory-mappable shards instead of a pickled list of dicts,
+    # read them back with src.utils.dynamic_dataset.DynamicDataset
+    shards = make_shards(folders, shard_size)
+    with DynamicDatasetWriter(DYNAMIC_BINARY_OUTPUT, num_keyframes) as writer:
+        for shard, results in zip(shards, sharded.run(shards)):
+            for folder_path, sample in zip(shard, results):
+                if sample is None:
+                    continue
+                sample["label"] = os.path.basename(folder_path).split("_")[0]
+                writer.add(sample)
 
 if __name__ == "__main__":
-    process_and_save_static(train=True)
-    process_and_save_static(train=False)
-    process_and_save_dynamic()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Builds the static and dynamic landmark datasets.")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes, each with its own detector")
+    parser.add_argument("--checkpoint-dir", default=None, help="resume from the shards finished by a previous run")
+    parser.add_argument("--augmentation-factor", type=int, default=AUGMENTATION_FACTOR,
+                        help="offline augmented copies per static training sample, 0 to augment while training")
+    args = parser.parse_args()
+
+    def checkpoints(name):
+        return os.path.join(args.checkpoint_dir, name) if args.checkpoint_dir else None
+
+    process_and_save_static(train=True, workers=args.workers, checkpoint_dir=checkpoints("static_train"),
+                            augmentation_factor=args.augmentation_factor)
+    process_and_save_static(train=False, workers=args.workers, checkpoint_dir=checkpoints("static_test"))
+    process_and_save_dynamic(workers=args.workers, checkpoint_dir=checkpoints("dynamic"))
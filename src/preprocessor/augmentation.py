@@ -16,7 +16,7 @@ class HandLandmarkAugmenter:
         translate_prob=0.6,
         rotation_prob=0.7,
         jitter_prob=0.9,
-
+        seed=None,
     ):
         """
         Initialize the hand landmark augmenter with transformation parameters.
@@ -25,6 +25,7 @@ class HandLandmarkAugmenter:
                 scale_range: Tuple (min, max) for scaling factors in x and y.
                 shear_range: Tuple (min, max) for shear factors in x and y.
                 translate_range: Tuple (min, max)
+                seed: seed of the NumPy Generator used by augment_batch.
                 TODO: finis the docstring
         """
         self.scale_range = scale_range
@@ -37,6 +38,7 @@ class HandLandmarkAugmenter:
         self.translate_prob = translate_prob
         self.rotation_prob = rotation_prob
         self.jitter_prob = jitter_prob
+        self.rng = np.random.default_rng(seed)
 
     def _non_uniform_scaling(self, landmark):
         """
@@ -117,6 +119,66 @@ class HandLandmarkAugmenter:
 
         return augmented_landmarks
 
+    def augment_batch(self, landmarks, factor=4, out=None):
+        """
+        Vectorized, seeded version of augment for a whole stack of hands.
+
+        Output j of every sample gets augmentation j % 4, in the order of augment:
+        scaling, shear, rotation, jitter. All parameters are drawn at once from
+        self.rng and the linear transforms are applied as stacked 2x2 matrices,
+        so the result only depends on the seed and the input.
+
+            Args:
+                landmarks: The original hand landmarks, NumPy array of shape (N, 21, 2)
+                factor: number of augmented copies per sample
+                out: optional preallocated float64 array of shape (N * factor, 21, 2)
+
+            Returns:
+                Array of shape (N * factor, 21, 2), the copies of sample i
+                are rows i * factor to (i + 1) * factor - 1.
+        """
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        num_samples, num_points, dims = landmarks.shape
+        total = num_samples * factor
+        if out is None:
+            out = np.empty((total, num_points, dims))
+        elif out.shape != (total, num_points, dims) or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a contiguous array of shape {(total, num_points, dims)}")
+
+        kind = np.tile(np.arange(factor) % 4, num_samples)
+        applied = self.rng.random(total) < np.array([
+            self.scale_prob, self.shear_prob, self.rotation_prob, self.jitter_prob
+        ])[kind]
+
+        # Draw every parameter at once, only the ones of applied transforms are used
+        scale = self.rng.uniform(*self.scale_range, size=(total, 2))
+        shear = self.rng.uniform(*self.shear_range, size=total)
+        angle = np.deg2rad(self.rng.uniform(*self.rotation_range, size=total))
+
+        matrices = np.tile(np.eye(2), (total, 1, 1))
+        is_scale = applied & (kind == 0)
+        matrices[is_scale, 0, 0] = scale[is_scale, 0]
+        matrices[is_scale, 1, 1] = scale[is_scale, 1]
+        is_shear = applied & (kind == 1)
+        matrices[is_shear, 0, 1] = shear[is_shear]
+        is_rotation = applied & (kind == 2)
+        cos_a, sin_a = np.cos(angle[is_rotation]), np.sin(angle[is_rotation])
+        matrices[is_rotation] = np.stack([
+            np.stack([cos_a, -sin_a], axis=-1),
+            np.stack([sin_a, cos_a], axis=-1)
+        ], axis=1)
+
+        # (N, 1, 21, 2) @ (N, factor, 2, 2) -> (N, factor, 21, 2), written into out
+        np.matmul(
+            landmarks[:, np.newaxis],
+            matrices.reshape(num_samples, factor, 2, 2),
+            out=out.reshape(num_samples, factor, num_points, dims)
+        )
+
+        is_jitter = applied & (kind == 3)
+        out[is_jitter] += self.rng.normal(0, self.jitter_std, (int(is_jitter.sum()), num_points, dims))
+        return out
+
 
 class ImageLevelAugmentation:
     def __init__(self):
@@ -8,6 +8,7 @@ from src.utils.hand_visualizer import HandVisualizer
 import os 
 import mediapipe as mp
 import cv2
+from src.pipline.parallel_builder import ShardedBuilder, make_shards
 
 class ImagePreProcessor:
     def __init__(self, num_classes):
@@ -57,7 +58,7 @@ class ImagePreProcessor:
             self.hand_visualizer.draw_hand(annotated_image)
         return landmark_px
 
-    def load_multiple_images(self, image_path, lable_path):
+    def load_multiple_images(self, image_path, lable_path, workers=1, checkpoint_dir=None, shard_size=256):
         """
         Load images from a direcotry
         Extract landmarks from each image
@@ -67,6 +68,11 @@ class ImagePreProcessor:
         Args:
             image_path: Path to the image file.
             label_path: Path to the label file.
+            workers: Number of worker processes, each with its own detector.
+            checkpoint_dir: Directory of the per-shard checkpoints, to resume after a crash.
+                With more than one worker or a checkpoint directory, images without
+                a detected hand are skipped instead of raising.
+            shard_size: Number of images per shard.
         """
         
         X = []
@@ -78,11 +84,14 @@ class ImagePreProcessor:
             if f.lower().endswith(('.jpg', '.jpeg', '.png')) and not f.startswith('invert')
         ])
         
-        for file in files:
-            file_path = os.path.join(image_path, file)
-            
-            normalized_landmarks = self.load_single_image(file_path)
-            
+        if workers > 1 or checkpoint_dir is not None:
+            all_landmarks = self._load_images_sharded(
+                [os.path.join(image_path, file) for file in files], workers, checkpoint_dir, shard_size
+            )
+        else:
+            all_landmarks = (self.load_single_image(os.path.join(image_path, file)) for file in files)
+
+        for file, normalized_landmarks in zip(files, all_landmarks):
             if normalized_landmarks is not None:
                 X.append(normalized_landmarks)
                 label =  labels.get(file, -1)
@@ -95,3 +104,28 @@ class ImagePreProcessor:
         y = self.one_hot_encoding(np.array(y))
         
         return np.array(X), y
+
+    def _load_images_sharded(self, file_paths, workers, checkpoint_dir, shard_size):
+        """
+        Runs load_single_image over the files on worker processes.
+        Yields the landmarks of every file in order, None where no hand was found.
+        """
+        sharded = ShardedBuilder(
+            _load_image_task,
+            initializer=ImagePreProcessor,
+            initargs=(self.num_classes,),
+            workers=workers,
+            checkpoint_dir=checkpoint_dir,
+            name="static",
+        )
+        for results in sharded.run(make_shards(file_paths, shard_size)):
+            yield from results
+
+
+def _load_image_task(image_processor, file_path):
+    # Worker side of ImagePreProcessor._load_images_sharded
+    try:
+        return image_processor.load_single_image(file_path)
+    except ValueError as e:
+        print(f"Warning: {e}")
+        return None
@@ -47,46 +47,45 @@ class GeneralDirectionBuilder:
         Returns:
             dict with keys 'left' and 'right' containing np.ndarrays of trajectory
         """
-        num_frames = len(landmark_sequence)
+        return self.make_trajectory_batch(
+            np.asarray(landmark_sequence), np.asarray(handedness_sequence)
+        )
 
-        trajectories = {
-            "left": [],
-            "right": []
-        }
-
-        last_positions = {
-            "left": None,
-            "right": None
-        }
-
-        for i in range(num_frames):
-            frame_landmarks = landmark_sequence[i]
-            frame_handedness = handedness_sequence[i]
-
-            positions = self.mp.hands_spacial_position(frame_landmarks)
-
-            for h_index, hand_label in enumerate(frame_handedness):
-                hand_name = "left" if hand_label == 0 else "right"
-                current_position = positions[h_index]
-
-                if last_positions[hand_name] is not None:
-                    direction = self.make_step_directions(
-                        last_positions[hand_name],
-                        current_position,
-                        self.zero_precision,
-                        self.use_scaled_zero_precision
-                    )
-                    trajectories[hand_name].append(direction)
-
-                last_positions[hand_name] = current_position
+    def make_trajectory_batch(self, landmarks, handedness):
+        """
+        Array version of make_trajectory: the directions of all steps of a
+        sequence are computed with a handful of NumPy calls.
 
-        # Convert to np.array
-        for key in trajectories:
-            trajectories[key] = np.array(trajectories[key])
+        Every (frame, hand) pair is an event of the hand named by its label,
+        visited frame by frame and hand by hand like make_trajectory.
+        A label of -1 counts as the right hand, as in make_trajectory.
 
+        Args:
+            landmarks: np.ndarray with shape (num_frames, num_hands, 21, 3)
+            handedness: np.ndarray with shape (num_frames, num_hands), values in {0, 1, -1}
+        Returns:
+            dict with keys 'left' and 'right' containing np.ndarrays of trajectory
+        """
+        landmarks = np.asarray(landmarks)
+        handedness = np.asarray(handedness).reshape(-1)
+
+        # (num_frames * num_hands, 3), in the same order as the events
+        positions = self.mp.hands_spacial_position(landmarks)
+
+        trajectories = {}
+        for hand_name, is_hand in (("left", handedness == 0), ("right", handedness != 0)):
+            hand_positions = positions[is_hand]
+            if len(hand_positions) < 2:
+                trajectories[hand_name] = np.array([])
+                continue
+            trajectories[hand_name] = self.make_steps_directions(
+                hand_positions[:-1],
+                hand_positions[1:],
+                self.zero_precision,
+                self.use_scaled_zero_precision
+            )
         return trajectories
 
-
     @staticmethod
     def make_step_directions(previous, current,
                              zero_precision, use_scaled_zero_precision):
@@ -103,23 +102,40 @@ class GeneralDirectionBuilder:
         if previous.shape != (DIMENSIONS,) or current.shape != (DIMENSIONS,):
             raise ValueError(f"Expected 3D vectors, got {previous.shape} and {current.shape}")
 
-        directions = []
+        return GeneralDirectionBuilder.make_steps_directions(
+            previous[np.newaxis], current[np.newaxis], zero_precision, use_scaled_zero_precision
+        )[0]
+
+    @staticmethod
+    def make_steps_directions(previous, current,
+                              zero_precision, use_scaled_zero_precision):
+        """
+        Creates the directions for many steps at once, see make_step_directions.
+        Args:
+            previous: the previous positions, shape (num_steps, 3)
+            current: the current positions, shape (num_steps, 3)
+            zero_precision: how much is considered "no movement on the axis"
+            use_scaled_zero_precision: if True, the zero precision is scaled per step.
+        Returns:
+            the directions of every step, shape (num_steps, 3)
+        """
+        if previous.shape != current.shape or previous.shape[1:] != (DIMENSIONS,):
+            raise ValueError(f"Expected (n, 3) positions, got {previous.shape} and {current.shape}")
+
+        zero_precision = np.full((len(previous), 1), zero_precision, dtype=np.float64)
         if use_scaled_zero_precision:
-            # increase zero precision if the hand moved a lot
-            max_displacement = np.max(np.abs(current - previous))
-            if max_displacement > zero_precision * 2:
-                zero_precision = max_displacement / 2
-
-        for i in range(DIMENSIONS):
-            lower_boundary = previous[i] - zero_precision
-            upper_boundary = previous[i] + zero_precision
-            if lower_boundary > current[i]:
-                directions.append(Direction.DOWN.value)
-            elif upper_boundary < current[i]:
-                directions.append(Direction.UP.value)
-            else:
-                directions.append(Direction.STATIONARY.value)
-        return np.array(directions)
+            # increase zero precision for the steps where the hand moved a lot
+            max_displacement = np.max(np.abs(current - previous), axis=1, keepdims=True)
+            moved_a_lot = max_displacement > zero_precision * 2
+            zero_precision = np.where(moved_a_lot, max_displacement / 2, zero_precision)
+
+        lower_boundary = previous - zero_precision
+        upper_boundary = previous + zero_precision
+        return np.where(
+            lower_boundary > current,
+            Direction.DOWN.value,
+            np.where(upper_boundary < current, Direction.UP.value, Direction.STATIONARY.value)
+        )
 
     @staticmethod
     def filter_repeated(trajectory):
@@ -128,13 +144,14 @@ class GeneralDirectionBuilder:
         Args:
             trajectory
         """
-        filtered = []
-        last = None
-        for direction in trajectory:
-            if not np.array_equal(direction, last):
-                filtered.append(direction)
-            last = direction
-        return np.array(filtered)
+        trajectory = np.asarray(trajectory)
+        if len(trajectory) == 0:
+            return np.array([])
+        rows = trajectory.reshape(len(trajectory), -1)
+        # Each direction is compared with the one right before it in the input
+        keep = np.ones(len(rows), dtype=bool)
+        keep[1:] = ~np.all(rows[1:] == rows[:-1], axis=1)
+        return trajectory[keep]
 
     @staticmethod
     def filter_stationary(trajectory):
@@ -145,12 +162,13 @@ class GeneralDirectionBuilder:
         Returns:
 
         """
-        filtered = []
-        zeros = np.zeros(DIMENSIONS)
-        for direction in trajectory:
-            if not np.array_equal(direction, zeros):
-                filtered.append(direction)
-        return np.array(filtered)
+        trajectory = np.asarray(trajectory)
+        if len(trajectory) == 0:
+            return np.array([])
+        keep = ~np.all(trajectory.reshape(len(trajectory), -1) == 0, axis=1)
+        if not keep.any():
+            return np.array([])
+        return trajectory[keep]
 
     @staticmethod
     def from_flat(flat) :
@@ -163,9 +181,9 @@ class GeneralDirectionBuilder:
         """
         reshaped = flat.reshape(-1, DIMENSIONS)
         # shorten if found NaNs (they appear when converting to pandas)
-        for i in range(len(reshaped)):
-            if np.isnan(reshaped[i]).all():
-                return reshaped[:i]
+        nan_rows = np.flatnonzero(np.isnan(reshaped).all(axis=1))
+        if len(nan_rows):
+            return reshaped[:nan_rows[0]]
         return reshaped
 
     def pad_trajectories(traj_dict):
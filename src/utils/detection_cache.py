@@ -0,0 +1,255 @@
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+from mediapipe.tasks.python.components.containers import category, landmark
+from mediapipe.tasks.python.vision import HandLandmarkerResult
+
+try:
+    import fcntl
+except ImportError:  # Windows, the size bookkeeping is then not synchronized between processes
+    fcntl = None
+
+# Next to the two-level entry directories, neither ends with .npz
+SIZE_FILE = "size"
+LOCK_FILE = "lock"
+
+_shared_caches = {}
+_shared_lock = threading.Lock()
+
+
+class DetectionCache:
+    """
+    Persistent, content-addressed cache of HandLandmarker IMAGE mode results.
+
+    An entry is keyed by a hash of the image pixels plus the detector model and
+    settings, so changing the model or e.g. num_hands never returns stale
+    detections. Every entry is a small uncompressed .npz file of float32
+    landmark arrays, written atomically, so several worker processes can share
+    one cache directory. Once the cache grows past max_bytes the least recently
+    used entries are deleted.
+
+    The total size is a counter file in the cache directory, updated by every
+    process under a lock file, so N workers together stay within max_bytes.
+    The directory is only scanned when the counter is missing and when
+    evicting, never on creation. Use shared() to get one instance per process.
+    """
+
+    def __init__(self, cache_dir, model_path, settings, max_bytes=2 * 1024 ** 3):
+        """
+        Args:
+            cache_dir: directory holding the entries, created if missing
+            model_path: path of the .task model, its content is part of every key
+            settings: anything that changes the detections, e.g. a dict of detector options
+            max_bytes: size limit of the cache directory
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        namespace = hashlib.blake2b(digest_size=20)
+        with open(model_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                namespace.update(chunk)
+        namespace.update(repr(sorted(settings.items()) if isinstance(settings, dict) else settings).encode())
+        self._namespace = namespace.digest()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @classmethod
+    def shared(cls, cache_dir, model_path, settings, max_bytes=2 * 1024 ** 3):
+        """
+        Returns the instance of this process for these arguments, creating it
+        on the first call, so every detector of a worker shares one cache and
+        the model is only hashed once.
+        """
+        key = (
+            os.path.abspath(cache_dir), os.path.abspath(model_path),
+            repr(sorted(settings.items()) if isinstance(settings, dict) else settings), max_bytes,
+        )
+        with _shared_lock:
+            cache = _shared_caches.get(key)
+            if cache is None:
+                cache = _shared_caches[key] = cls(cache_dir, model_path, settings, max_bytes)
+            return cache
+
+    def key(self, img):
+        """
+        Returns the cache key of an image array.
+        """
+        digest = hashlib.blake2b(self._namespace, digest_size=20)
+        digest.update(repr((img.shape, img.dtype.str)).encode())
+        digest.update(np.ascontiguousarray(img).data)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Returns the cached HandLandmarkerResult, or None on a miss.
+        """
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as record:
+                result = self._to_result(record)
+        except (OSError, ValueError, KeyError):
+            # Missing, or a corrupt entry left by an external process
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        try:
+            os.utime(path)  # mark as recently used for the eviction
+        except OSError:
+            pass
+        return result
+
+    def put(self, key, result):
+        """
+        Stores a HandLandmarkerResult.
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **self._to_record(result))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        size = os.path.getsize(path)
+        with self._locked():
+            total = self._read_size()
+            # A missing counter is rebuilt from the directory, which already holds the new entry
+            total = self._scan_size() if total is None else total + size
+            if total > self.max_bytes:
+                total = self._evict_locked()
+            self._write_size(total)
+
+    def evict(self, target_ratio=0.9):
+        """
+        Deletes the least recently used entries until the cache fits in
+        target_ratio * max_bytes.
+        """
+        with self._locked():
+            self._write_size(self._evict_locked(target_ratio))
+
+    def size_bytes(self):
+        """
+        Size of the cache directory as counted by all processes, None before the first entry.
+        """
+        return self._read_size()
+
+    def _evict_locked(self, target_ratio=0.9):
+        # Rescanned, the counter may have drifted (overwritten keys, external deletes)
+        entries = sorted(self._entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        target = self.max_bytes * target_ratio
+        for path, _, size in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            self.evictions += 1
+        return total
+
+    @contextmanager
+    def _locked(self):
+        with open(os.path.join(self.cache_dir, LOCK_FILE), "a+b") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _read_size(self):
+        try:
+            with open(os.path.join(self.cache_dir, SIZE_FILE), encoding="ascii") as f:
+                return int(f.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_size(self, total):
+        # Only written under the lock, a torn write reads as missing and is rebuilt
+        with open(os.path.join(self.cache_dir, SIZE_FILE), "w", encoding="ascii") as f:
+            f.write(str(total))
+
+    def _scan_size(self):
+        return sum(size for _, _, size in self._entries())
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "size_bytes": self.size_bytes(),
+            "max_bytes": self.max_bytes,
+        }
+
+    def _path(self, key):
+        # Two-level layout keeps directories small on large corpora
+        return os.path.join(self.cache_dir, key[:2], key + ".npz")
+
+    def _entries(self):
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(".npz"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    @staticmethod
+    def _to_record(result):
+        def points(hands):
+            return np.array(
+                [[[point.x, point.y, point.z] for point in hand] for hand in hands], dtype=np.float32
+            ).reshape(-1, 21, 3)
+
+        first = [hand[0] for hand in result.handedness]
+        return {
+            "hand_landmarks": points(result.hand_landmarks),
+            "hand_world_landmarks": points(result.hand_world_landmarks),
+            "handedness_index": np.array([c.index for c in first], dtype=np.int32),
+            "handedness_score": np.array([c.score for c in first], dtype=np.float32),
+            "handedness_name": np.array([c.category_name or "" for c in first], dtype=str),
+            "handedness_display_name": np.array([c.display_name or "" for c in first], dtype=str),
+        }
+
+    @staticmethod
+    def _to_result(record):
+        handedness = zip(
+            record["handedness_index"], record["handedness_score"],
+            record["handedness_name"], record["handedness_display_name"],
+        )
+        return HandLandmarkerResult(
+            handedness=[
+                [category.Category(index=int(index), score=float(score),
+                                   display_name=str(display_name), category_name=str(name))]
+                for index, score, name, display_name in handedness
+            ],
+            hand_landmarks=[
+                [landmark.NormalizedLandmark(x=float(x), y=float(y), z=float(z)) for x, y, z in hand]
+                for hand in record["hand_landmarks"]
+            ],
+            hand_world_landmarks=[
+                [landmark.Landmark(x=float(x), y=float(y), z=float(z)) for x, y, z in hand]
+                for hand in record["hand_world_landmarks"]
+            ],
+        )
@@ -0,0 +1,267 @@
+import json
+import os
+
+import numpy as np
+
+from src.utils.static_dataset import INDEX_FILE, remove_index, write_index
+
+FORMAT_NAME = "dynamic-landmarks"
+FORMAT_VERSION = 1
+HANDS = ("left", "right")
+
+
+class DynamicDatasetWriter:
+    """
+    Streams dynamic samples into fixed-shape, memory-mappable shards.
+
+    Every sample of process_and_save_dynamic, {'landmark': (k, 2, 21, 3),
+    'trajectory': {'left': (k-1, 3), 'right': (k-1, 3)}, 'label': str},
+    is zero-padded to num_keyframes. The number of valid rows is kept in the
+    length columns. Layout of out_dir, per shard:
+        landmarks-00000.npy           float32 (n, K, 2, 21, 3)
+        landmark_lengths-00000.npy    int32 (n,) valid keyframes
+        trajectories-00000.npy        float32 (n, K-1, 2, 3), hand axis ordered left, right
+        trajectory_lengths-00000.npy  int32 (n, 2) valid steps of each hand
+        labels-00000.npy              int32 (n,) index into index.json "labels"
+    plus index.json, written by close(). The labels are sorted like those of
+    write_static_dataset, so datasets with the same label set share the indices.
+    """
+
+    def __init__(self, out_dir, num_keyframes=6, shard_size=4096):
+        """
+        Args:
+            out_dir: output directory, created if missing
+            num_keyframes: K, keyframes per sample after padding
+            shard_size: number of samples per shard
+        """
+        self.out_dir = out_dir
+        self.num_keyframes = num_keyframes
+        self.shard_size = shard_size
+        os.makedirs(out_dir, exist_ok=True)
+        # An index left by a previous run would describe the shards this run overwrites
+        remove_index(out_dir)
+
+        self.label_names = []
+        self._label_to_index = {}
+        self._shards = []
+        self._num_samples = 0
+        self._truncated = 0
+        self._new_buffers()
+
+    def _new_buffers(self):
+        K = self.num_keyframes
+        self._landmarks = np.zeros((self.shard_size, K, 2, 21, 3), dtype=np.float32)
+        self._landmark_lengths = np.zeros(self.shard_size, dtype=np.int32)
+        self._trajectories = np.zeros((self.shard_size, K - 1, 2, 3), dtype=np.float32)
+        self._trajectory_lengths = np.zeros((self.shard_size, 2), dtype=np.int32)
+        self._labels = np.zeros(self.shard_size, dtype=np.int32)
+        self._count = 0
+
+    def add(self, sample):
+        """
+        Appends one sample. Keyframes and trajectory steps beyond the padded
+        shape are dropped.
+        """
+        i = self._count
+        K = self.num_keyframes
+
+        landmark = np.asarray(sample["landmark"], dtype=np.float32)
+        truncated = len(landmark) > K
+        landmark = landmark[:K]
+        self._landmarks[i, :len(landmark)] = landmark
+        self._landmark_lengths[i] = len(landmark)
+
+        for h, hand in enumerate(HANDS):
+            trajectory = np.asarray(sample["trajectory"][hand], dtype=np.float32).reshape(-1, 3)
+            truncated |= len(trajectory) > K - 1
+            trajectory = trajectory[:K - 1]
+            self._trajectories[i, :len(trajectory), h] = trajectory
+            self._trajectory_lengths[i, h] = len(trajectory)
+        self._truncated += truncated
+
+        label = str(sample["label"])
+        if label not in self._label_to_index:
+            self._label_to_index[label] = len(self.label_names)
+            self.label_names.append(label)
+        self._labels[i] = self._label_to_index[label]
+
+        self._count += 1
+        if self._count == self.shard_size:
+            self._flush()
+
+    def _flush(self):
+        if self._count == 0:
+            return
+        shard_id = len(self._shards)
+        shard = {"start": self._num_samples, "count": self._count}
+        for column, values in (
+            ("landmarks", self._landmarks),
+            ("landmark_lengths", self._landmark_lengths),
+            ("trajectories", self._trajectories),
+            ("trajectory_lengths", self._trajectory_lengths),
+            ("labels", self._labels),
+        ):
+            shard[column] = f"{column}-{shard_id:05d}.npy"
+            np.save(os.path.join(self.out_dir, shard[column]), values[:self._count])
+        self._shards.append(shard)
+        self._num_samples += self._count
+        self._new_buffers()
+
+    def close(self):
+        """
+        Writes the last shard and the index. Returns the path of the index file.
+        """
+        self._flush()
+        self._sort_labels()
+        if self._truncated:
+            print(f"Warning: {self._truncated} samples did not fit {self.num_keyframes} keyframes and were truncated")
+        return write_index(self.out_dir, {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "num_samples": self._num_samples,
+            "num_keyframes": self.num_keyframes,
+            "labels": self.label_names,
+            "shards": self._shards,
+        })
+
+    def _sort_labels(self):
+        # Indices were assigned in first-seen order while streaming, rewrite the
+        # label columns so they index the sorted names instead
+        order = sorted(range(len(self.label_names)), key=self.label_names.__getitem__)
+        remap = np.empty(len(order), dtype=np.int32)
+        remap[order] = np.arange(len(order), dtype=np.int32)
+        for shard in self._shards:
+            labels_path = os.path.join(self.out_dir, shard["labels"])
+            np.save(labels_path, remap[np.load(labels_path)])
+        self.label_names = [self.label_names[i] for i in order]
+        self._label_to_index = {label: i for i, label in enumerate(self.label_names)}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        # Only a complete run gets an index, a failed one stays unreadable
+        if exc_type is None:
+            self.close()
+
+
+class DynamicDataset:
+    """
+    Lazy reader of the layout written by DynamicDatasetWriter.
+    Shards are memory-mapped. Samples and batches are read on demand,
+    and nothing is loaded up front.
+    """
+
+    COLUMNS = ("landmarks", "landmark_lengths", "trajectories", "trajectory_lengths", "labels")
+
+    def __init__(self, path, mmap=True):
+        """
+        Args:
+            path: dataset directory
+            mmap: memory-map the shards instead of reading them into memory
+        """
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("format") != FORMAT_NAME or self.index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} {FORMAT_NAME} dataset")
+
+        self.label_names = self.index["labels"]
+        self.num_keyframes = self.index["num_keyframes"]
+        mmap_mode = "r" if mmap else None
+        self._shards = [
+            {column: np.load(os.path.join(path, shard[column]), mmap_mode=mmap_mode) for column in self.COLUMNS}
+            for shard in self.index["shards"]
+        ]
+        self._starts = np.array([shard["start"] for shard in self.index["shards"]], dtype=np.int64)
+
+    def __len__(self):
+        return self.index["num_samples"]
+
+    def __getitem__(self, i):
+        """
+        Returns sample i in the format of process_and_save_dynamic, unpadded.
+        The arrays are views of the memory map.
+        """
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        shard_index = int(np.searchsorted(self._starts, i, side="right")) - 1
+        shard = self._shards[shard_index]
+        j = i - self._starts[shard_index]
+
+        trajectory_lengths = shard["trajectory_lengths"][j]
+        return {
+            "landmark": shard["landmarks"][j, :shard["landmark_lengths"][j]],
+            "trajectory": {
+                hand: shard["trajectories"][j, :trajectory_lengths[h], h] for h, hand in enumerate(HANDS)
+            },
+            "label": self.label_names[shard["labels"][j]],
+        }
+
+    def shards(self, columns=COLUMNS):
+        """
+        Yields a tuple of the requested padded column arrays of every shard, without copying.
+        """
+        for shard in self._shards:
+            yield tuple(shard[column] for column in columns)
+
+    def iter_samples(self):
+        """
+        Yields every sample in order, see __getitem__.
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+    def iter_batches(self, batch_size=256):
+        """
+        Yields dicts of padded column arrays with batch_size samples each, the
+        last one may be smaller. Only one batch is held in memory at a time.
+        """
+        pending = []
+        pending_size = 0
+        for shard in self._shards:
+            count = len(shard["labels"])
+            start = 0
+            while start < count:
+                take = min(batch_size - pending_size, count - start)
+                pending.append({column: shard[column][start:start + take] for column in self.COLUMNS})
+                pending_size += take
+                start += take
+                if pending_size == batch_size:
+                    yield self._join(pending)
+                    pending, pending_size = [], 0
+        if pending:
+            yield self._join(pending)
+
+    @staticmethod
+    def _join(parts):
+        if len(parts) == 1:
+            return {column: np.asarray(values) for column, values in parts[0].items()}
+        return {column: np.concatenate([part[column] for part in parts]) for column in parts[0]}
+
+
+def convert_dynamic_npy(npy_path, out_dir, num_keyframes=6, shard_size=4096):
+    """
+    Converts a pickled sample list saved by the former process_and_save_dynamic.
+    """
+    samples = np.load(npy_path, allow_pickle=True)
+    with DynamicDatasetWriter(out_dir, num_keyframes, shard_size) as writer:
+        for sample in samples:
+            writer.add(sample)
+    return os.path.join(out_dir, INDEX_FILE)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converts a pickled dynamic .npy dataset to memory-mappable shards.")
+    parser.add_argument("npy_path")
+    parser.add_argument("out_dir")
+    parser.add_argument("--num-keyframes", type=int, default=6)
+    parser.add_argument("--shard-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    index_path = convert_dynamic_npy(args.npy_path, args.out_dir, args.num_keyframes, args.shard_size)
+    print(f"Wrote {len(DynamicDataset(args.out_dir))} samples to {index_path}")
@@ -1,6 +1,6 @@
 import cv2
 import matplotlib.pyplot as plt
-from mediapipe_wrapper import MediaPipeWrapper
+from src.utils.mediapipe_wrapper import MediaPipeWrapper
 import os
 import cv2 as cv
 import mediapipe as mp
@@ -3,18 +3,113 @@ from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 import cv2
 import numpy as np
+from src.config.settings import DETECTION_CACHE_DIR, DETECTION_CACHE_MAX_BYTES
+from src.utils.detection_cache import DetectionCache
+
+class VideoHandTracker:
+    """
+    HandLandmarker in VIDEO running mode for a single clip.
+    The landmarks found in one frame seed the search in the next one, so palm
+    detection only reruns when tracking is lost.
+    Use one tracker per clip: timestamps must keep increasing and tracking
+    state must not leak from one clip into another.
+    """
+
+    def __init__(self, base_options, num_hands=2, fps=30.0):
+        """
+        Args:
+            base_options: BaseOptions pointing at the hand landmarker model
+            num_hands: maximum number of hands to track
+            fps: frame rate used to derive timestamps when none are given
+        """
+        self.option = vision.HandLandmarkerOptions(base_options=base_options,
+                                                   num_hands=num_hands,
+                                                   running_mode=vision.RunningMode.VIDEO)
+        self.detector = vision.HandLandmarker.create_from_options(self.option)
+        self.frame_interval_ms = 1000.0 / fps if fps and fps > 0 else 1000.0 / 30
+        self._frame_idx = 0
+        self._last_timestamp_ms = -1
+
+    def process(self, img, timestamp_ms=None):
+        """
+        Detects hands in the next frame of the clip.
+
+        Args:
+            img: BGR frame
+            timestamp_ms: frame timestamp, derived from the frame index and fps if omitted
+        Returns:
+            HandLandmarkerResult, same as MediaPipeWrapper.process_from_image
+        """
+        if timestamp_ms is None:
+            timestamp_ms = int(self._frame_idx * self.frame_interval_ms)
+        # MediaPipe rejects timestamps that do not strictly increase
+        timestamp_ms = max(int(timestamp_ms), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        self._frame_idx += 1
+
+        rgb_frame = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        return self.detector.detect_for_video(mp_image, timestamp_ms)
+
+    def close(self):
+        self.detector.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 class MediaPipeWrapper:
-    def __init__(self):
+    def __init__(self, cache_dir=DETECTION_CACHE_DIR):
         """
         Initializes the MediaPipe wrapper for hand detection.
+
+        Args:
+            cache_dir: directory of the persistent detection cache, see DetectionCache.
+                Defaults to the DETECTION_CACHE_DIR setting, None disables the cache.
         """
-        self.base_option = python.BaseOptions(model_asset_path='./hand_landmarker.task')
+        model_path = './hand_landmarker.task'
+        self.base_option = python.BaseOptions(model_asset_path=model_path)
         self.option = vision.HandLandmarkerOptions(base_options=self.base_option,
                                                    num_hands=2)
         self.detector = vision.HandLandmarker.create_from_options(self.option)
         self.num_hands = 2
 
+        self.cache = None
+        if cache_dir:
+            # One cache per process, shared by every wrapper of the worker
+            self.cache = DetectionCache.shared(
+                cache_dir,
+                model_path,
+                settings={
+                    "num_hands": self.option.num_hands,
+                    "min_hand_detection_confidence": self.option.min_hand_detection_confidence,
+                    "min_hand_presence_confidence": self.option.min_hand_presence_confidence,
+                    "min_tracking_confidence": self.option.min_tracking_confidence,
+                },
+                max_bytes=DETECTION_CACHE_MAX_BYTES,
+            )
+
+    def _detect_image(self, frame):
+        """
+        IMAGE mode detection of a BGR frame, served from the detection cache when enabled.
+        """
+        key = None
+        if self.cache is not None:
+            key = self.cache.key(frame)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        result = self.detector.detect(mp_image)
+
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
     def detect_hands(self, frame):
         """
         Detects hands in the image using MediaPipe HandLandmarker (Tasks API).
@@ -22,10 +117,7 @@ class MediaPipeWrapper:
         Args:
             frame: Input image (numpy array, BGR).
         """
-        H, W, _ = frame.shape
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
-        result = self.detector.detect(mp_image)
-        return result
+        return self._detect_image(frame)
 
     def extract_hand_roi(self, frame):
         """
@@ -70,13 +162,20 @@ class MediaPipeWrapper:
         return hand_roi, hand_landmarks, roi
 
     def process_from_image(self, img):
-        # Convert the BGR image to RGB before processing.
-        rgb_frame = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        # Detections of the VIDEO mode tracker depend on the previous frames,
+        # only these IMAGE mode ones are cached.
+        return self._detect_image(img)
 
-        results = self.detector.detect(mp_image)
+    def video_tracker(self, fps=30.0):
+        """
+        Creates a VIDEO mode tracker for one clip, sharing this wrapper's model.
 
-        return results
+        Args:
+            fps: frame rate of the frames that will be fed to the tracker
+        Returns:
+            VideoHandTracker, close it (or use it as a context manager) when the clip ends
+        """
+        return VideoHandTracker(self.base_option, self.num_hands, fps)
 
     def get_landmarks_from_hands(self, detected_hands):
         """
@@ -0,0 +1,216 @@
+import ast
+import csv
+import json
+import os
+import tempfile
+
+import numpy as np
+
+FORMAT_NAME = "static-landmarks"
+FORMAT_VERSION = 1
+INDEX_FILE = "index.json"
+
+
+def write_static_dataset(out_dir, labels, landmarks, encodings, shard_size=65536):
+    """
+    Writes a static landmark dataset in the binary columnar layout read by StaticDataset.
+
+    Layout of out_dir:
+        landmarks-00000.npy  float32 (n, 21, 2) landmarks of the shard
+        labels-00000.npy     int32 (n,) index of every sample's label in index.json "labels"
+        encodings.npy        float32 (num_labels, num_classes) one-hot encoding of every label
+        index.json           shapes, label names and the list of shards, written last
+
+    Args:
+        out_dir: output directory, created if missing
+        labels: label of every sample
+        landmarks: (N, 21, 2) normalized landmarks
+        encodings: one-hot encoding of every sample, (N, num_classes)
+        shard_size: number of samples per shard
+    Returns:
+        path of the index file
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    remove_index(out_dir)
+    landmarks = np.asarray(landmarks, dtype=np.float32)
+    encodings = np.asarray(encodings, dtype=np.float32)
+    labels = [str(label) for label in labels]
+    if not (len(labels) == len(landmarks) == len(encodings)):
+        raise ValueError("labels, landmarks and encodings must have the same length")
+
+    label_names = sorted(set(labels))
+    label_to_index = {label: i for i, label in enumerate(label_names)}
+    label_indices = np.array([label_to_index[label] for label in labels], dtype=np.int32)
+
+    # One encoding row per label, taken from its first sample
+    label_encodings = np.zeros((len(label_names), encodings.shape[1] if encodings.ndim == 2 else 0), dtype=np.float32)
+    seen = set()
+    for i, label_index in enumerate(label_indices):
+        if label_index not in seen:
+            label_encodings[label_index] = encodings[i]
+            seen.add(label_index)
+    np.save(os.path.join(out_dir, "encodings.npy"), label_encodings)
+
+    shards = []
+    for shard_id, start in enumerate(range(0, len(landmarks), shard_size)):
+        end = min(start + shard_size, len(landmarks))
+        landmarks_file = f"landmarks-{shard_id:05d}.npy"
+        labels_file = f"labels-{shard_id:05d}.npy"
+        np.save(os.path.join(out_dir, landmarks_file), landmarks[start:end])
+        np.save(os.path.join(out_dir, labels_file), label_indices[start:end])
+        shards.append({"landmarks": landmarks_file, "labels": labels_file, "start": start, "count": end - start})
+
+    index = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "num_samples": len(landmarks),
+        "landmark_shape": list(landmarks.shape[1:]),
+        "labels": label_names,
+        "encodings": "encodings.npy",
+        "shards": shards,
+    }
+    return write_index(out_dir, index)
+
+
+def write_index(out_dir, index):
+    """
+    Writes index.json atomically. Writers call it last, so a partially
+    written dataset never looks complete.
+    """
+    index_path = os.path.join(out_dir, INDEX_FILE)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def remove_index(out_dir):
+    """
+    Removes the index.json of a previous run. Writers call it first, so a
+    rerun that fails midway leaves the directory unreadable instead of an
+    old index pointing at partly overwritten shards.
+    """
+    try:
+        os.remove(os.path.join(out_dir, INDEX_FILE))
+    except FileNotFoundError:
+        pass
+
+
+class StaticDataset:
+    """
+    Reader of the layout written by write_static_dataset.
+    The shards are memory-mapped, so opening a dataset costs next to nothing
+    and training only pages in the samples it touches.
+    """
+
+    def __init__(self, path, mmap=True):
+        """
+        Args:
+            path: dataset directory
+            mmap: memory-map the shards instead of reading them into memory
+        """
+        self.path = path
+        with open(os.path.join(path, INDEX_FILE), encoding="utf-8") as f:
+            self.index = json.load(f)
+        if self.index.get("format") != FORMAT_NAME or self.index.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} {FORMAT_NAME} dataset")
+
+        mmap_mode = "r" if mmap else None
+        self.label_names = self.index["labels"]
+        self.label_encodings = np.load(os.path.join(path, self.index["encodings"]), mmap_mode=mmap_mode)
+        self._landmarks = [
+            np.load(os.path.join(path, shard["landmarks"]), mmap_mode=mmap_mode) for shard in self.index["shards"]
+        ]
+        self._labels = [
+            np.load(os.path.join(path, shard["labels"]), mmap_mode=mmap_mode) for shard in self.index["shards"]
+        ]
+
+    def __len__(self):
+        return self.index["num_samples"]
+
+    def shards(self):
+        """
+        Yields (landmarks, label indices) of every shard, without copying.
+        """
+        yield from zip(self._landmarks, self._labels)
+
+    @property
+    def landmarks(self):
+        """
+        (N, 21, 2) float32 landmarks. A single shard is returned as its memory map.
+        """
+        if len(self._landmarks) == 1:
+            return self._landmarks[0]
+        if not self._landmarks:
+            return np.zeros((0, *self.index["landmark_shape"]), dtype=np.float32)
+        return np.concatenate(self._landmarks)
+
+    @property
+    def labels(self):
+        """
+        (N,) int32 index of every sample's label in label_names.
+        """
+        if len(self._labels) == 1:
+            return self._labels[0]
+        if not self._labels:
+            return np.zeros(0, dtype=np.int32)
+        return np.concatenate(self._labels)
+
+    @property
+    def encodings(self):
+        """
+        (N, num_classes) one-hot encodings, the same as the CSV 'encoding' column.
+        """
+        return np.asarray(self.label_encodings)[self.labels]
+
+    def arrays(self):
+        """
+        Returns (X, y) like the CSV loading in the training notebooks.
+        """
+        return self.landmarks, self.encodings
+
+
+def _parse_list(text):
+    # The columns hold Python list literals, which are valid JSON unless they contain nan/inf
+    try:
+        return json.loads(text)
+    except ValueError:
+        return ast.literal_eval(text)
+
+
+def read_static_csv(csv_path):
+    """
+    Reads a CSV written by process_and_save_static.
+
+    Returns:
+        (labels, landmarks (N, 21, 2), encodings (N, num_classes))
+    """
+    labels, landmarks, encodings = [], [], []
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            labels.append(row["label"])
+            landmarks.append(_parse_list(row["landmark"]))
+            encodings.append(_parse_list(row["encoding"]))
+    return labels, np.array(landmarks, dtype=np.float32), np.array(encodings, dtype=np.float32)
+
+
+def convert_static_csv(csv_path, out_dir, shard_size=65536):
+    """
+    Converts a CSV written by process_and_save_static to the binary layout.
+    """
+    labels, landmarks, encodings = read_static_csv(csv_path)
+    return write_static_dataset(out_dir, labels, landmarks, encodings, shard_size)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converts static landmark CSVs to the binary layout.")
+    parser.add_argument("csv_path")
+    parser.add_argument("out_dir")
+    parser.add_argument("--shard-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    index_path = convert_static_csv(args.csv_path, args.out_dir, args.shard_size)
+    print(f"Wrote {len(StaticDataset(args.out_dir))} samples to {index_path}")
@@ -0,0 +1,10 @@
+"""
+Makes the server package (app.*) importable next to src.*, so the server
+modules that do not need the API settings can be tested from here as well.
+"""
+import os
+import sys
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "server")
+if SERVER_DIR not in sys.path:
+    sys.path.append(SERVER_DIR)
@@ -0,0 +1,87 @@
+"""
+Smoke tests of src.pipline.input_pipeline on tiny generated datasets.
+Skipped where TensorFlow is not installed. Run from the repository root:
+    python -m pytest tests
+"""
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from src.pipline.input_pipeline import dynamic_input_pipeline, static_input_pipeline  # noqa: E402
+from src.utils.dynamic_dataset import DynamicDataset, DynamicDatasetWriter  # noqa: E402
+from src.utils.static_dataset import write_static_dataset  # noqa: E402
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    labels = ["a", "b", "c"] * 10
+    landmarks = rng.uniform(-1, 1, size=(len(labels), 21, 2)).astype(np.float32)
+    encodings = np.eye(3, dtype=np.float32)[[ord(label) - ord("a") for label in labels]]
+    write_static_dataset(tmp_path / "static", labels, landmarks, encodings, shard_size=8)
+    return str(tmp_path / "static")
+
+
+@pytest.fixture
+def dynamic_dir(tmp_path):
+    rng = np.random.default_rng(0)
+    with DynamicDatasetWriter(str(tmp_path / "dynamic"), num_keyframes=6, shard_size=4) as writer:
+        for i in range(10):
+            frames = 6 if i % 2 else 4
+            writer.add({
+                "landmark": rng.normal(size=(frames, 2, 21, 3)).astype(np.float32),
+                "trajectory": {"left": rng.normal(size=(frames - 1, 3)), "right": np.zeros((0, 3))},
+                "label": f"word{i % 3}",
+            })
+    return str(tmp_path / "dynamic")
+
+
+@pytest.mark.parametrize("augment", [False, True])
+def test_static_pipeline_batches(static_dir, augment):
+    dataset = static_input_pipeline(static_dir, batch_size=8, augment=augment, seed=0, shuffle_buffer=16)
+    batches = list(dataset)
+    assert sum(len(landmarks) for landmarks, _ in batches) == 30
+    landmarks, labels = batches[0]
+    assert landmarks.shape == (8, 21, 2) and labels.shape == (8, 3)
+    assert np.all(np.isfinite(landmarks.numpy()))
+    assert np.allclose(labels.numpy().sum(axis=1), 1.0)
+
+
+def test_static_pipeline_file_cache(static_dir, tmp_path):
+    prefix = str(tmp_path / "cache" / "static")
+    (tmp_path / "cache").mkdir()
+    dataset = static_input_pipeline(static_dir, batch_size=8, augment=False, cache=prefix, shuffle_buffer=0)
+    first = np.concatenate([landmarks.numpy() for landmarks, _ in dataset])
+    second = np.concatenate([landmarks.numpy() for landmarks, _ in dataset])
+    assert any(path.name.startswith("static") for path in (tmp_path / "cache").iterdir())
+    np.testing.assert_array_equal(first, second)
+
+
+def test_dynamic_pipeline_features(dynamic_dir):
+    dataset = dynamic_input_pipeline(dynamic_dir, batch_size=4, seed=0, shuffle_buffer=8)
+    features, labels = next(iter(dataset))
+    assert features.shape == (4, 6, 132) and labels.shape == (4, 3)
+    assert np.all(np.isfinite(features.numpy()))
+
+
+def test_dynamic_pipeline_shares_classes(tmp_path):
+    datasets = {}
+    for name, labels in (("train", ["b", "c", "a"]), ("test", ["c", "a"])):
+        with DynamicDatasetWriter(str(tmp_path / name), num_keyframes=6, shard_size=2) as writer:
+            for label in labels:
+                writer.add({
+                    "landmark": np.zeros((6, 2, 21, 3), np.float32),
+                    "trajectory": {"left": np.zeros((5, 3)), "right": np.zeros((5, 3))},
+                    "label": label,
+                })
+        datasets[name] = DynamicDataset(str(tmp_path / name))
+
+    assert datasets["train"].label_names == ["a", "b", "c"]
+    assert [sample["label"] for sample in datasets["train"].iter_samples()] == ["b", "c", "a"]
+
+    train_labels = datasets["train"].label_names
+    dataset = dynamic_input_pipeline(str(tmp_path / "test"), batch_size=2, augment=False,
+                                     shuffle_buffer=0, label_names=train_labels)
+    _, labels = next(iter(dataset))
+    np.testing.assert_array_equal(labels.numpy(), np.eye(3)[[2, 0]])
@@ -0,0 +1,92 @@
+"""
+Round trips and validation of the LMK1 binary landmark messages of
+app.utils.landmark_codec.
+"""
+import numpy as np
+import pytest
+
+from app.utils.landmark_codec import (
+    HEADER,
+    LandmarkCodecError,
+    decode_dynamic,
+    decode_static,
+    encode_dynamic,
+    encode_static,
+)
+
+
+def dynamic_arrays(rng, frames=5):
+    return (
+        rng.uniform(0, 1, size=(frames, 2, 21, 3)),
+        rng.normal(scale=0.05, size=(frames, 2, 21, 3)),
+        rng.choice([-1, 0, 1], size=(frames, 2)),
+    )
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32])
+def test_static_round_trip(dtype):
+    landmarks = np.random.default_rng(0).uniform(0, 1, size=(3, 21, 2)).astype(dtype)
+    decoded = decode_static(encode_static(landmarks, dtype=dtype))
+    assert decoded.dtype == np.float32
+    np.testing.assert_array_equal(decoded, landmarks.astype(np.float32))
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.float32])
+def test_dynamic_round_trip(dtype):
+    hand_landmarks, world_landmarks, handedness = dynamic_arrays(np.random.default_rng(0))
+    decoded = decode_dynamic(encode_dynamic(hand_landmarks, world_landmarks, handedness, dtype=dtype))
+    np.testing.assert_array_equal(decoded[0], hand_landmarks.astype(dtype).astype(np.float32))
+    np.testing.assert_array_equal(decoded[1], world_landmarks.astype(dtype).astype(np.float32))
+    np.testing.assert_array_equal(decoded[2], handedness)
+
+
+def test_single_hand_static_message():
+    landmarks = np.random.default_rng(0).uniform(0, 1, size=(21, 2)).astype(np.float32)
+    assert decode_static(encode_static(landmarks, dtype=np.float32)).shape == (1, 21, 2)
+
+
+def test_rejects_bad_headers():
+    message = encode_static(np.zeros((1, 21, 2)))
+    with pytest.raises(LandmarkCodecError, match="header"):
+        decode_static(message[:HEADER.size - 1])
+    with pytest.raises(LandmarkCodecError, match="Not a landmark"):
+        decode_static(b"LMK2" + message[4:])
+    with pytest.raises(LandmarkCodecError, match="static"):
+        decode_static(encode_dynamic(*dynamic_arrays(np.random.default_rng(0))))
+    with pytest.raises(LandmarkCodecError, match="dtype"):
+        decode_static(message[:5] + bytes([9]) + message[6:])
+    with pytest.raises(LandmarkCodecError, match="entries"):
+        decode_static(encode_static(np.zeros((0, 21, 2))))
+    with pytest.raises(LandmarkCodecError, match="entries"):
+        decode_static(encode_static(np.zeros((3, 21, 2))), max_hands=2)
+
+
+def test_rejects_wrong_payload_sizes():
+    static = encode_static(np.zeros((2, 21, 2)))
+    dynamic = encode_dynamic(*dynamic_arrays(np.random.default_rng(0)))
+    for decode, message in ((decode_static, static), (decode_dynamic, dynamic)):
+        with pytest.raises(LandmarkCodecError, match="Payload size"):
+            decode(message[:-1])
+        with pytest.raises(LandmarkCodecError, match="Payload size"):
+            decode(message + b"\0")
+
+
+@pytest.mark.parametrize("value", [np.nan, np.inf, -np.inf])
+def test_rejects_non_finite_landmarks(value):
+    landmarks = np.zeros((1, 21, 2))
+    landmarks[0, 3, 1] = value
+    with pytest.raises(LandmarkCodecError, match="finite"):
+        decode_static(encode_static(landmarks))
+
+    hand_landmarks, world_landmarks, handedness = dynamic_arrays(np.random.default_rng(0))
+    world_landmarks[2, 1, 7, 0] = value
+    with pytest.raises(LandmarkCodecError, match="finite"):
+        decode_dynamic(encode_dynamic(hand_landmarks, world_landmarks, handedness))
+
+
+@pytest.mark.parametrize("label", [2, -2, 127])
+def test_rejects_unknown_handedness(label):
+    hand_landmarks, world_landmarks, handedness = dynamic_arrays(np.random.default_rng(0))
+    handedness[1, 0] = label
+    with pytest.raises(LandmarkCodecError, match="handedness"):
+        decode_dynamic(encode_dynamic(hand_landmarks, world_landmarks, handedness))
@@ -0,0 +1,32 @@
+"""
+Batched hand landmark normalization against normalize_hand_landmarks applied
+to one hand at a time, for the src and the server copy.
+"""
+import numpy as np
+import pytest
+
+
+@pytest.fixture(params=["src.preprocessor.normalization", "app.services.normalization"])
+def normalizer(request):
+    return pytest.importorskip(request.param).Normalization()
+
+
+def random_hands(rng, count):
+    hands = rng.uniform(0, 1, size=(count, 21, 2))
+    # Degenerate hands: all joints on one point (scale clamped, max 0) and collapsed MCP joints
+    if count > 2:
+        hands[0] = 0.5
+        hands[1, [5, 9, 13, 17]] = hands[1, 5]
+    return hands
+
+
+def test_batch_matches_single(normalizer):
+    rng = np.random.default_rng(0)
+    for count in (1, 2, 3, 17, 256):
+        hands = random_hands(rng, count)
+        expected = np.stack([normalizer.normalize_hand_landmarks(hand) for hand in hands])
+        np.testing.assert_array_equal(normalizer.normalize_hand_landmarks_batch(hands), expected)
+
+
+def test_empty_batch(normalizer):
+    assert normalizer.normalize_hand_landmarks_batch(np.zeros((0, 21, 2))).shape == (0, 21, 2)
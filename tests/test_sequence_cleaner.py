@@ -0,0 +1,116 @@
+"""
+The vectorized and online key frame extraction of src.preprocessor.sequence_cleaner
+against the original frame-by-frame loop, on random sequences.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from src.preprocessor import sequence_cleaner  # noqa: E402
+from src.utils.mediapipe_wrapper import MediaPipeWrapper  # noqa: E402
+
+
+class _HandPositions:
+    # The position helper of the wrapper, without loading a HandLandmarker
+    hands_spacial_position = MediaPipeWrapper.hands_spacial_position
+
+
+@pytest.fixture
+def cleaner(monkeypatch):
+    monkeypatch.setattr(sequence_cleaner, "MediaPipeWrapper", _HandPositions)
+    return sequence_cleaner.SequenceCleaner()
+
+
+def loop_key_frames(frame_landmarks, frame_handedness, target_len):
+    """
+    extract_key_frames_dual_hand as it was before it was vectorized.
+    """
+    position = _HandPositions().hands_spacial_position
+    full_sequence = []
+    for landmarks, handedness in zip(frame_landmarks, frame_handedness):
+        left_hand = np.zeros((21, 3))
+        right_hand = np.zeros((21, 3))
+        for h_index, hand_label in enumerate(handedness):
+            if hand_label == 0:
+                left_hand = landmarks[h_index]
+            elif hand_label == 1:
+                right_hand = landmarks[h_index]
+        full_sequence.append(np.concatenate([left_hand, right_hand], axis=0))
+
+    positions = [position(frame) for frame in full_sequence]
+    kept = [full_sequence[0]]
+    for i in range(1, len(full_sequence) - 1):
+        if min(np.linalg.norm(positions[i - 1] - positions[i]), np.linalg.norm(positions[i] - positions[i + 1])) > \
+                np.linalg.norm(positions[i - 1] - positions[i + 1]):
+            continue
+        kept.append(full_sequence[i])
+    kept.append(full_sequence[-1])
+
+    displacements = [0]
+    last_pos = position(kept[0])
+    for frame in kept[1:]:
+        pos = position(frame)
+        displacements.append(np.linalg.norm(last_pos - pos))
+        last_pos = pos.copy()
+
+    interval = sum(displacements) / (target_len - 1)
+    running_sum = 0
+    key_frames = [0]
+    for i in range(1, len(kept)):
+        running_sum += displacements[i]
+        if running_sum >= interval:
+            key_frames.append(i)
+            running_sum = 0
+    if len(key_frames) < target_len:
+        key_frames.append(len(kept) - 1)
+    return key_frames
+
+
+def random_sequences(count, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(count):
+        num_frames = int(rng.integers(1, 40))
+        landmarks = [rng.normal(size=(2, 21, 3)) * rng.random() for _ in range(num_frames)]
+        handedness = [rng.choice([-1, 0, 1], size=2) for _ in range(num_frames)]
+        # Repeated and still frames give zero distances and threshold ties
+        for i in range(1, num_frames):
+            if rng.random() < 0.2:
+                landmarks[i], handedness[i] = landmarks[i - 1], handedness[i - 1]
+        yield landmarks, handedness, int(rng.integers(2, 10))
+
+
+def test_batch_matches_loop(cleaner):
+    for landmarks, handedness, target_len in random_sequences(300):
+        expected = loop_key_frames(landmarks, handedness, target_len)
+        assert cleaner.extract_key_frames_dual_hand(landmarks, handedness, target_len) == expected
+
+
+def test_online_matches_batch(cleaner):
+    for landmarks, handedness, target_len in random_sequences(300, seed=1):
+        expected = cleaner.extract_key_frames_dual_hand(landmarks, handedness, target_len)
+        extractor = cleaner.online(target_len)
+        for frame_landmarks, frame_handedness in zip(landmarks, handedness):
+            assert extractor.push(frame_landmarks, frame_handedness) == []
+        assert extractor.finalize() == expected
+
+
+def test_online_fixed_interval_emits_while_pushing(cleaner):
+    for landmarks, handedness, target_len in random_sequences(300, seed=2):
+        # The interval the batch extractor derives from the whole sequence
+        sequence = cleaner._combine_hands(landmarks, handedness)
+        positions = cleaner._positions(sequence)
+        positions = positions[cleaner._non_outlier_indices(positions)]
+        interval = sum(
+            cleaner._distance(positions[i - 1], positions[i]) for i in range(1, len(positions))
+        ) / (target_len - 1)
+        if interval <= 0:
+            continue
+
+        extractor = cleaner.online(target_len, interval=interval)
+        emitted = []
+        for frame_landmarks, frame_handedness in zip(landmarks, handedness):
+            emitted += extractor.push(frame_landmarks, frame_handedness)
+        key_frames = extractor.finalize()
+        assert key_frames == cleaner.extract_key_frames_dual_hand(landmarks, handedness, target_len)
+        assert key_frames[:len(emitted)] == emitted
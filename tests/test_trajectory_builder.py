@@ -0,0 +1,103 @@
+"""
+The array-based GeneralDirectionBuilder of src.preprocessor.trajectory_builder
+against the original loops over frames, hands and axes, on random sequences.
+"""
+import numpy as np
+import pytest
+
+pytest.importorskip("mediapipe")
+
+from src.preprocessor import trajectory_builder  # noqa: E402
+from src.utils.mediapipe_wrapper import MediaPipeWrapper  # noqa: E402
+
+
+class _HandPositions:
+    # The position helper of the wrapper, without loading a HandLandmarker
+    hands_spacial_position = MediaPipeWrapper.hands_spacial_position
+
+
+@pytest.fixture(autouse=True)
+def no_detector(monkeypatch):
+    monkeypatch.setattr(trajectory_builder, "MediaPipeWrapper", _HandPositions)
+
+
+def loop_step(previous, current, zero_precision, use_scaled_zero_precision):
+    if use_scaled_zero_precision:
+        max_displacement = np.max(np.abs(current - previous))
+        if max_displacement > zero_precision * 2:
+            zero_precision = max_displacement / 2
+    directions = []
+    for i in range(3):
+        if previous[i] - zero_precision > current[i]:
+            directions.append(-1)
+        elif previous[i] + zero_precision < current[i]:
+            directions.append(1)
+        else:
+            directions.append(0)
+    return np.array(directions)
+
+
+def loop_trajectory(landmark_sequence, handedness_sequence, zero_precision, use_scaled_zero_precision):
+    """
+    make_trajectory as it was before it worked on arrays.
+    """
+    trajectories = {"left": [], "right": []}
+    last_positions = {"left": None, "right": None}
+    for frame_landmarks, frame_handedness in zip(landmark_sequence, handedness_sequence):
+        positions = _HandPositions().hands_spacial_position(frame_landmarks)
+        for h_index, hand_label in enumerate(frame_handedness):
+            hand_name = "left" if hand_label == 0 else "right"
+            if last_positions[hand_name] is not None:
+                trajectories[hand_name].append(loop_step(
+                    last_positions[hand_name], positions[h_index], zero_precision, use_scaled_zero_precision
+                ))
+            last_positions[hand_name] = positions[h_index]
+    return {hand: np.array(steps) for hand, steps in trajectories.items()}
+
+
+def loop_filter_repeated(trajectory):
+    filtered = []
+    last = None
+    for direction in trajectory:
+        if not np.array_equal(direction, last):
+            filtered.append(direction)
+        last = direction
+    return np.array(filtered)
+
+
+def loop_filter_stationary(trajectory):
+    return np.array([direction for direction in trajectory if not np.array_equal(direction, np.zeros(3))])
+
+
+def assert_same(actual, expected):
+    assert actual.shape == expected.shape
+    assert actual.dtype == expected.dtype
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_make_trajectory_matches_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        num_frames = int(rng.integers(0, 12))
+        zero_precision = float(rng.choice([0.0, 0.05, 0.1]))
+        scaled = bool(rng.random() < 0.7)
+        landmarks = [rng.normal(scale=rng.choice([0.01, 0.2]), size=(2, 21, 3)) for _ in range(num_frames)]
+        handedness = [rng.choice([-1, 0, 1], size=2) for _ in range(num_frames)]
+
+        builder = trajectory_builder.GeneralDirectionBuilder(zero_precision, scaled)
+        actual = builder.make_trajectory(landmarks, handedness)
+        expected = loop_trajectory(landmarks, handedness, zero_precision, scaled)
+        for hand in ("left", "right"):
+            assert_same(actual[hand], expected[hand])
+
+
+def test_filters_match_loop():
+    builder = trajectory_builder.GeneralDirectionBuilder
+    rng = np.random.default_rng(1)
+    for _ in range(500):
+        trajectory = rng.integers(-1, 2, size=(int(rng.integers(0, 10)), 3))
+        if len(trajectory) and rng.random() < 0.5:
+            # Consecutive repeats and all-stationary steps
+            trajectory = np.concatenate([trajectory, trajectory[-1:], np.zeros((2, 3), int)])
+        assert_same(builder.filter_repeated(trajectory), loop_filter_repeated(trajectory))
+        assert_same(builder.filter_stationary(trajectory), loop_filter_stationary(trajectory))